@@ -0,0 +1,198 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+from smax.smax_metrics import Instrumentation
+from tests.mock_server import MockSmaxServer
+from smax.smax_run import Run
+from smax.smax_transport import SmaxTransport
+
+
+def _percentile(values, percentile):
+    if not values:
+        return None
+    values = sorted(values)
+    position = (len(values) - 1) * percentile / 100.0
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+class Benchmark(object):
+    def __init__(self, records=20000, latency=0.01, jitter=0.005, repeat=3, results_path='smax_benchmarks.jsonl',
+                 threshold=0.1):
+        """
+        Benchmarks of list queries, by id lookups and bulk writes against local MockSmaxServer, every run is
+        appended to results file and compared with last stored run of same setup, run it as
+        python -m benchmarks.benchmark
+        :param records: Number of records per entity type on mock server, default is 20000
+        :param latency: Seconds mock server adds to every response, default is 0.01
+        :param jitter: Maximum random seconds added on top of latency, default is 0.005
+        :param repeat: Number of timed runs of each benchmark, best run is kept, peak memory is measured
+        in one more run, default is 3
+        :param results_path: Path of JSON lines file with stored results, default is smax_benchmarks.jsonl
+        :param threshold: Relative slowdown reported as regression, default is 0.1
+        """
+        self.records = records
+        self.latency = latency
+        self.jitter = jitter
+        self.repeat = repeat
+        self.results_path = results_path
+        self.threshold = threshold
+        self.cases = [('list_sequential', self.list_sequential),
+                      ('list_parallel', self.list_parallel),
+                      ('list_sharded', self.list_sharded),
+                      ('list_compact', self.list_compact),
+                      ('by_id', self.by_id),
+                      ('get_many', self.get_many),
+                      ('bulk_create', self.bulk_create)]
+
+    def list_sequential(self, tenant):
+        return sum(1 for _ in tenant.get_incidents('Id,EmsCreationTime,Status,Priority', paginate=True,
+                                                   page_size=1000))
+
+    def list_parallel(self, tenant):
+        return sum(1 for _ in tenant.get_incidents('Id,EmsCreationTime,Status,Priority', paginate=True,
+                                                   page_size=1000, parallel=True, max_in_flight=8))
+
+    def list_sharded(self, tenant):
+        return sum(1 for _ in tenant.get_incidents('Id,EmsCreationTime,Status,Priority', paginate=True,
+                                                   page_size=1000, max_in_flight=8, shard_by='EmsCreationTime'))
+
+    def list_compact(self, tenant):
+        return len(tenant.get_incidents('Id,EmsCreationTime,Status,Priority', paginate=True, page_size=1000,
+                                        parallel=True, max_in_flight=8, compact=True))
+
+    def by_id(self, tenant):
+        for entity_id in range(10000, 10200):
+            tenant.get_incident_by_id(entity_id)
+        return 200
+
+    def get_many(self, tenant):
+        return len(tenant.get_incidents_by_ids([str(10000 + index) for index in range(0, self.records, 7)],
+                                               'Id,Status'))
+
+    def bulk_create(self, tenant):
+        payloads = [{'DisplayLabel': 'Benchmark {}'.format(index), 'Status': 'RequestStatusReady'}
+                    for index in range(2000)]
+        return len(tenant.bulk_create('Incident', payloads, parallel=True, max_in_flight=4))
+
+    def run(self, only=None):
+        """
+        Run benchmarks
+        :param only: List of benchmark names to run, default runs all
+        :return: Dict with setup and list of results
+        """
+        latencies = []
+        instrumentation = Instrumentation()
+        instrumentation.add_hook(end=lambda event: latencies.append(event['seconds']))
+        results = []
+        with MockSmaxServer(records=self.records, latency=self.latency, jitter=self.jitter) as server:
+            transport = SmaxTransport(pool_size=16, instrumentation=instrumentation)
+            tenant = Run(server.url, 'benchmark', 'benchmark', 1, transport=transport)
+            tenant.get_incidents('Id', size=1)
+            for name, case in self.cases:
+                if only and name not in only:
+                    continue
+                best = None
+                for _ in range(self.repeat):
+                    del latencies[:]
+                    started = time.perf_counter()
+                    items = case(tenant)
+                    seconds = time.perf_counter() - started
+                    result = {'name': name, 'seconds': seconds, 'items': items, 'items_per_second': items / seconds,
+                              'calls': len(latencies), 'latency_p50': _percentile(latencies, 50),
+                              'latency_p95': _percentile(latencies, 95), 'latency_p99': _percentile(latencies, 99)}
+                    if best is None or seconds < best['seconds']:
+                        best = result
+                # memory is traced in separate run, tracing slows every allocation down
+                tracemalloc.start()
+                case(tenant)
+                best['peak_memory'] = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                results.append(best)
+            transport.close()
+        return {'time': int(time.time() * 1000), 'revision': self._revision(), 'python': platform.python_version(),
+                'setup': {'records': self.records, 'latency': self.latency, 'jitter': self.jitter,
+                          'repeat': self.repeat},
+                'results': results}
+
+    @staticmethod
+    def _revision():
+        try:
+            return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL,
+                                           cwd=os.path.dirname(os.path.abspath(__file__))).decode('utf-8').strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def previous(self, setup):
+        """
+        Get last stored run of same setup
+        :param setup: Setup of run
+        :return: Stored run, None when there is none
+        """
+        if not os.path.exists(self.results_path):
+            return None
+        previous = None
+        with open(self.results_path) as results_file:
+            for line in results_file:
+                if line.strip():
+                    stored = json.loads(line)
+                    if stored.get('setup') == setup:
+                        previous = stored
+        return previous
+
+    def store(self, run):
+        """
+        Append run to results file
+        :param run: Result of run
+        """
+        with open(self.results_path, 'a') as results_file:
+            results_file.write(json.dumps(run) + '\n')
+
+    def report(self, run, previous=None):
+        """
+        Format results as table, with change against previous run and regressions marked
+        :param run: Result of run
+        :param previous: Stored run to compare with, default is None
+        :return: Report text
+        """
+        before = {result['name']: result for result in (previous or {}).get('results', [])}
+        lines = ['{:<16} {:>9} {:>12} {:>7} {:>9} {:>9} {:>9} {:>10}  {}'.format(
+            'benchmark', 'seconds', 'items/s', 'calls', 'p50 ms', 'p95 ms', 'p99 ms', 'peak MB', 'change')]
+        for result in run['results']:
+            change = ''
+            if result['name'] in before:
+                ratio = result['seconds'] / before[result['name']]['seconds'] - 1
+                change = '{:+.1%}{}'.format(ratio, '  REGRESSION' if ratio > self.threshold else '')
+            lines.append('{:<16} {:>9.3f} {:>12.0f} {:>7} {:>9.2f} {:>9.2f} {:>9.2f} {:>10.1f}  {}'.format(
+                result['name'], result['seconds'], result['items_per_second'], result['calls'],
+                (result['latency_p50'] or 0) * 1000, (result['latency_p95'] or 0) * 1000,
+                (result['latency_p99'] or 0) * 1000, result['peak_memory'] / 1e6, change))
+        return '\n'.join(lines)
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description='Benchmark smax against local mock SMAX server')
+    parser.add_argument('--records', type=int, default=20000, help='Records per entity type')
+    parser.add_argument('--latency', type=float, default=0.01, help='Seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.005, help='Random seconds added on top of latency')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs of each benchmark, best is kept')
+    parser.add_argument('--results', default='smax_benchmarks.jsonl', help='JSON lines file with stored results')
+    parser.add_argument('--threshold', type=float, default=0.1, help='Relative slowdown reported as regression')
+    parser.add_argument('--only', nargs='*', help='Names of benchmarks to run')
+    parser.add_argument('--no-store', action='store_true', help='Do not append results to results file')
+    options = parser.parse_args(arguments)
+    benchmark = Benchmark(records=options.records, latency=options.latency, jitter=options.jitter,
+                          repeat=options.repeat, results_path=options.results, threshold=options.threshold)
+    run = benchmark.run(options.only)
+    print(benchmark.report(run, benchmark.previous(run['setup'])))
+    if not options.no_store:
+        benchmark.store(run)
+
+
+if __name__ == '__main__':
+    main()
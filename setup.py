@@ -1,7 +1,7 @@
 from distutils.core import setup
 setup(
   name = 'smax',
-  packages = ['smax'],
+  packages = ['smax', 'smax.aio'],
     version='v0.2',
   license='MIT',
   description = 'API wrapper for Microfocus SMAX application',
@@ -13,6 +13,9 @@ setup(
   install_requires=[
           'requests'
       ],
+  extras_require={
+          'aio': ['aiohttp']
+      },
   classifiers=[
     'Development Status :: 4 - Beta',
     'Intended Audience :: Developers',
@@ -3,4 +3,23 @@ from smax.smax_run import Run
 from smax.smax_build import Build
 from smax.smax_configuration import Configuration
 from smax.smax_master_data import MasterData
-from smax.smax_admin import SmaxAdmin
\ No newline at end of file
+from smax.smax_admin import SmaxAdmin
+from smax.smax_transport import SmaxTransport
+from smax.smax_errors import SmaxError
+from smax.smax_bulk_writer import BulkWriter
+from smax.smax_cache import ResponseCache
+from smax.smax_single_flight import SingleFlight
+from smax.smax_sync import DeltaSync
+from smax.smax_mirror import Mirror
+from smax.smax_export import Exporter
+from smax.smax_result_set import ResultSet
+from smax.smax_analytics import Aggregation, aggregate, bucket, count_by
+from smax.smax_query import Q, Field, Condition
+from smax.smax_sharding import ShardPlanner
+from smax.smax_rate_limiter import RateLimiter, TokenBucket, ConcurrencyController
+from smax.smax_metrics import Instrumentation, endpoint_template
+from smax.smax_json import dumps, loads, query_decoder
+from smax.smax_tenant_pool import TenantPool
+from smax.smax_admin_inventory import AdminInventory
+from smax.smax_rollout import Rollout
+from smax.smax_operation_history import OperationHistoryReader
@@ -0,0 +1,8 @@
+from smax.aio.smax_transport import SmaxTransport
+from smax.aio.smax_session import SmaxSession
+from smax.aio.smax_auth_wrapper import SmaxTenant
+from smax.aio.smax_run import Run
+from smax.aio.smax_build import Build
+from smax.aio.smax_configuration import Configuration
+from smax.aio.smax_master_data import MasterData
+from smax.aio.smax_admin import SmaxAdmin
@@ -0,0 +1,228 @@
+from smax.smax_json import dumps
+from smax.aio.smax_session import SmaxSession
+
+
+class SmaxAdmin(object):
+    def __init__(self, base_url, user_name, password, account_id, token_lifetime=1500, refresh_margin=60,
+                 transport=None, session=None):
+        """
+        Initiate main async wrapper class and connection details
+        :param base_url: Base url of your SMAX instance
+        :param user_name: user name of admin user
+        :param password: password of admin user
+        :param account_id: Suite ID of your instance
+        :param token_lifetime: Seconds admin token is reused before logging in again, default is 1500
+        :param refresh_margin: Seconds before expiry token is refreshed proactively, default is 60
+        :param transport: Async SmaxTransport with connection pool to use, can be shared between instances,
+        default is new transport
+        :param session: Async SmaxSession of another admin instance to share its token and pool,
+        default is new session
+        """
+        self.base_url = base_url
+        self.user_name = user_name
+        self.password = password
+        self.account_id = str(account_id)
+        self.headers = {'Content-Type': 'application/json'}
+        SMAX_AUTH = '{}/auth/authentication-endpoint/authenticate/login?ACCOUNTID={}'. \
+            format(self.base_url, self.account_id)
+        self.session = session or SmaxSession(SMAX_AUTH, self.user_name, self.password,
+                                              token_lifetime=token_lifetime, refresh_margin=refresh_margin,
+                                              transport=transport)
+
+    @staticmethod
+    def get_help(function):
+        """
+        Get help with specific function
+        :param function: function to display help for
+        :return: Help doc for requested function
+        """
+        return function.__doc__
+
+    async def get_admin_cookie(self):
+        """
+        Get cookie of cached admin session, logs in only when there is no valid token
+        :return: cookie to pass with each subsequent request
+        """
+        return await self.session.get_cookie()
+
+    async def close(self):
+        """
+        Close connections of session
+        """
+        await self.session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def get_users(self):
+        """
+        Get a list of users
+        :return: list of users in json format
+        """
+        query_endpoint = (await self.session.get('{}/bo/rest/entities/user'
+                                                 .format(self.base_url))).json()
+        return query_endpoint
+
+    async def get_user_by_id(self, user_id):
+        """
+        Get specific details of user
+        :param user_id: ID of user to query
+        :return: User details in JSON format
+        """
+        query_endpoint = (await self.session.get('{}/bo/rest/entities/user/{}'
+                                                 .format(self.base_url, user_id))).json()
+        return query_endpoint
+
+    async def attach_user_to_tenant(self, user_id, tenant_id):
+        """
+        Attach user to specified tenant
+        :param user_id: ID of user to attach
+        :param tenant_id: Tenant ID to attach to
+        :return: Result of operation in JSON format
+        """
+        payload = {"tenantId": tenant_id,
+                   "attachEntities":
+                       [{"id": user_id, "entityType": "user"}]}
+        payload_to_put = dumps(payload)
+        attach_request = (await self.session.put('{}/bo/rest/entities/user/attachOrRemove'.format(self.base_url),
+                                                 data=payload_to_put,
+                                                 headers=self.headers)).json()
+        return attach_request
+
+    async def get_accounts(self):
+        """
+        Get a list of accounts
+        :return: list of accounts in json format
+        """
+        query_endpoint = (await self.session.get('{}/bo/rest/entities/account'
+                                                 .format(self.base_url))).json()
+        return query_endpoint
+
+    async def get_customers(self):
+        """
+        Get a list of customers
+        :return: list of customers in json format
+        """
+        query_endpoint = (await self.session.get('{}/bo/rest/entities/customer'
+                                                 .format(self.base_url))).json()
+        return query_endpoint
+
+    async def get_tenants(self):
+        """
+        Get a list of tenants
+        :return: list of tenants in json format
+        """
+        query_endpoint = (await self.session.get('{}/bo/rest/entities/tenant'
+                                                 .format(self.base_url))).json()
+        return query_endpoint
+
+    async def get_tenant_by_id(self, tenant_id):
+        """
+        Get tenant details by ID
+        :param tenant_id: ID of tenant to query
+        :return: Tenant details in JSON format
+        """
+        query_endpoint = (await self.session.get('{}/bo/rest/entities/tenant/{}'
+                                                 .format(self.base_url, tenant_id))).json()
+        return query_endpoint
+
+    async def change_tenant_settings(self, tenant_it, payload):
+        """
+        Change tenant settings, this is sensitive endpoint and best way to go about this is to
+        query tenant you want to modify (using get_tenant_by_id), and take that payload and
+        change setting you want then send it via this function
+        :param tenant_it: ID of tenant you wish to change
+        :param payload: Payload of items to change
+        :return: Result of operation in JSON format
+        """
+        payload_to_put = dumps(payload)
+        request_to_change = (await self.session.put('{}/bo/rest/entities/tenant/{}'.format(self.base_url, tenant_it),
+                                                    data=payload_to_put,
+                                                    headers=self.headers)).json()
+        return request_to_change
+
+    async def delete_tenant(self, tenant_id):
+        """
+        This method will delete the tenant, bear in mind that this operation is not reversible, use with caution!
+        :param tenant_id: ID of tenant to delete
+        :return: Result of operation
+        """
+        payload = [{"id": tenant_id,
+                    "entityType": "tenant"}]
+        delete_payload = dumps(payload)
+        delete_tenant = (await self.session.delete('{}/bo/rest/entities/tenant'.format(self.base_url),
+                                                   data=delete_payload,
+                                                   headers=self.headers)).json()
+        return delete_tenant
+
+    async def get_license_pools(self):
+        """
+        Get a list of license pools
+        :return: list of license pools in json format
+        """
+        query_endpoint = (await self.session.get('{}/bo/rest/entities/licensePool'
+                                                 .format(self.base_url))).json()
+        return query_endpoint
+
+    async def get_licenses(self):
+        """
+        Get a list of licenses
+        :return: list of licenses in json format
+        """
+        query_endpoint = (await self.session.get('{}/bo/rest/entities/license'
+                                                 .format(self.base_url))).json()
+        return query_endpoint
+
+    async def get_license_activity(self):
+        """
+        Get a list of license activities
+        :return: list of license activities in json format
+        """
+        query_endpoint = (await self.session.get('{}/bo/rest/entities/licenseActivity'
+                                                 .format(self.base_url))).json()
+        return query_endpoint
+
+    async def get_configurations(self, config_section):
+        """
+        Get configurations
+        :param config_section: Which configuration to review
+        :return: Current configuration in JSON format
+        """
+        configs = {
+            'security': 'lwsso',
+            'email': 'smtp',
+            'export': 'backup',
+            'ldap': 'ldap',
+            'index': 'idolIndex',
+            'license': 'licenseNotification'
+        }
+        assert (config_section == 'security' or config_section == 'email' or config_section == 'export' or
+                config_section == 'ldap' or config_section == 'index' or config_section == 'license'), \
+            'Please select one of the following\nsecurity, email, export, ldap, index, license'
+        config_section = str(config_section).lower()
+        config_selection = configs.get(config_section, None)
+        query_endpoint = (await self.session.get('{}/bo/rest/entities/configurations/{}'
+                                                 .format(self.base_url, config_selection))).json()
+        return query_endpoint
+
+    async def get_operation_history(self):
+        """
+        Get operation history
+        :return: Operation history in json format
+        """
+        query_endpoint = (await self.session.get('{}/bo/rest/entities/operationHistory'
+                                                 .format(self.base_url))).json()
+        return query_endpoint
+
+    async def get_operation_history_by_id(self, operation_id):
+        """
+        Get specific details of operation
+        :param operation_id: ID of operation to query
+        :return: Operation details in JSON format
+        """
+        query_endpoint = (await self.session.get('{}/bo/rest/entities/operationHistory/{}'
+                                                 .format(self.base_url, operation_id))).json()
+        return query_endpoint
\ No newline at end of file
@@ -0,0 +1,163 @@
+import asyncio
+from smax import smax_auth_wrapper
+from smax.smax_errors import SmaxError
+from smax.aio.smax_session import SmaxSession
+
+
+class SmaxTenant(object):
+    store_output = staticmethod(smax_auth_wrapper.SmaxTenant.store_output)
+    parse_output = staticmethod(smax_auth_wrapper.SmaxTenant.parse_output)
+    fix_url_encode = staticmethod(smax_auth_wrapper.SmaxTenant.fix_url_encode)
+    get_help = staticmethod(smax_auth_wrapper.SmaxTenant.get_help)
+    build_query_url = smax_auth_wrapper.SmaxTenant.build_query_url
+
+    def __init__(self, base_url, user_name, password, tenant_id, token_lifetime=1500, refresh_margin=60,
+                 transport=None, session=None):
+        """
+        Initiate main async wrapper class and connection details
+        :param base_url: Base url of your SMAX instance
+        :param user_name: user name of user/integration user
+        :param password: password of user/integration user
+        :param tenant_id: tenant ID of your instance
+        :param token_lifetime: Seconds token is reused before logging in again, default is 1500
+        :param refresh_margin: Seconds before expiry token is refreshed proactively, default is 60
+        :param transport: Async SmaxTransport with connection pool to use, can be shared between instances,
+        default is new transport
+        :param session: Async SmaxSession of another instance of same tenant to share its token and pool,
+        default is new session
+        """
+        self.base_url = base_url
+        self.user_name = user_name
+        self.password = password
+        self.tenant_id = str(tenant_id)
+        self.headers = {'Content-Type': 'application/json'}
+        SMAX_AUTH = '{}/auth/authentication-endpoint/authenticate/login?TENANTID={}'. \
+            format(self.base_url, self.tenant_id)
+        self.session = session or SmaxSession(SMAX_AUTH, self.user_name, self.password,
+                                              token_lifetime=token_lifetime, refresh_margin=refresh_margin,
+                                              transport=transport)
+
+    async def get_cookie(self):
+        """
+        Get cookie of cached session, logs in only when there is no valid token
+        :return: cookie to pass with each subsequent request
+        """
+        return await self.session.get_cookie()
+
+    async def close(self):
+        """
+        Close connections of session
+        """
+        await self.session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def get_entities(self, entity_type, query_params, filters=None, paginate=False, page_size=500,
+                     order=None, skip=None, size=None, parallel=False, max_in_flight=4, ordered=True):
+        """
+        Run EMS query for any entity type, see smax.SmaxTenant.get_entities
+        :return: Awaitable JSON result of query, or async generator of entities when paginating
+        """
+        if paginate and parallel:
+            return self.iter_entities_parallel(entity_type, query_params, filters, page_size=page_size,
+                                               order=order or 'Id asc', max_in_flight=max_in_flight,
+                                               ordered=ordered)
+        if paginate:
+            return self.iter_entities(entity_type, query_params, filters, page_size=page_size,
+                                      order=order or 'Id asc')
+        return self._get_json(self.build_query_url(entity_type, query_params, filters,
+                                                   order=order, skip=skip, size=size))
+
+    async def _get_json(self, url):
+        return (await self.session.get(url)).json()
+
+    async def get_entities_page(self, entity_type, query_params, filters=None, skip=0, size=500, order='Id asc'):
+        """
+        Get one page of EMS query, fails loudly if SMAX does not complete query
+        :return: JSON result of page query
+        """
+        page = await self._get_json(self.build_query_url(entity_type, query_params, filters,
+                                                         order=order, skip=skip, size=size))
+        meta = page.get('meta', {})
+        if meta.get('completion_status', 'OK') != 'OK':
+            raise SmaxError('Query of {} failed at skip={}: {}'.format(entity_type, skip,
+                                                                      meta.get('errorDetailsList')))
+        return page
+
+    async def iter_entities(self, entity_type, layout, filters=None, page_size=500, order='Id asc', skip=0):
+        """
+        Walk through all pages of EMS query, fetching next page only when previous one is consumed
+        :return: Async generator yielding entities one by one
+        """
+        while True:
+            page = await self.get_entities_page(entity_type, layout, filters, skip=skip, size=page_size,
+                                                order=order)
+            entities = page.get('entities') or []
+            for entity in entities:
+                yield entity
+            skip += len(entities)
+            total_count = page.get('meta', {}).get('total_count')
+            if not entities or (total_count is not None and skip >= total_count) or \
+                    (total_count is None and len(entities) < page_size):
+                return
+
+    async def iter_entities_parallel(self, entity_type, layout, filters=None, page_size=500, order='Id asc',
+                                     max_in_flight=4, ordered=True):
+        """
+        Walk through all pages of EMS query, fetching pages after first one concurrently,
+        at most max_in_flight at a time
+        :return: Async generator yielding entities one by one
+        """
+        assert max_in_flight >= 1, 'max_in_flight must be at least 1'
+        first_page = await self.get_entities_page(entity_type, layout, filters, skip=0, size=page_size,
+                                                  order=order)
+        entities = first_page.get('entities') or []
+        for entity in entities:
+            yield entity
+        total_count = first_page.get('meta', {}).get('total_count')
+        if total_count is None:
+            if len(entities) == page_size:
+                async for entity in self.iter_entities(entity_type, layout, filters, page_size=page_size,
+                                                       order=order, skip=page_size):
+                    yield entity
+            return
+        skips = iter(range(page_size, total_count, page_size))
+        pending = {}
+        finished = {}
+        next_skip = page_size
+
+        def submit():
+            skip = next(skips, None)
+            if skip is None:
+                return False
+            pending[asyncio.ensure_future(self.get_entities_page(entity_type, layout, filters, skip=skip,
+                                                                 size=page_size, order=order))] = skip
+            return True
+
+        try:
+            while len(pending) < max_in_flight and len(pending) + len(finished) < 2 * max_in_flight and submit():
+                pass
+            while pending:
+                done, _ = await asyncio.wait(list(pending), return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    skip = pending.pop(future)
+                    page_entities = future.result().get('entities') or []
+                    if ordered:
+                        finished[skip] = page_entities
+                        continue
+                    for entity in page_entities:
+                        yield entity
+                while next_skip in finished:
+                    for entity in finished.pop(next_skip):
+                        yield entity
+                    next_skip += page_size
+                while len(pending) < max_in_flight and len(pending) + len(finished) < 2 * max_in_flight and \
+                        submit():
+                    pass
+        finally:
+            for future in pending:
+                future.cancel()
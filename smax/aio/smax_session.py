@@ -0,0 +1,105 @@
+import asyncio
+import time
+from smax.smax_errors import SmaxError
+from smax.smax_json import dumps
+from smax.aio.smax_transport import SmaxTransport
+
+
+class SmaxSession(object):
+    def __init__(self, auth_url, user_name, password, token_lifetime=1500, refresh_margin=60, transport=None):
+        """
+        Async authenticated session, logs in once and keeps LWSSO token until it is about to expire,
+        safe to share between any number of coroutines
+        :param auth_url: Full url of authentication endpoint, including TENANTID or ACCOUNTID
+        :param user_name: user name of user/integration user
+        :param password: password of user/integration user
+        :param token_lifetime: Seconds token is considered valid after login, default is 1500
+        :param refresh_margin: Seconds before expiry token is refreshed proactively, default is 60
+        :param transport: Async SmaxTransport to send requests through, default is new transport
+        """
+        self.auth_url = auth_url
+        self.user_name = user_name
+        self.password = password
+        self.token_lifetime = token_lifetime
+        self.refresh_margin = refresh_margin
+        self.transport = transport or SmaxTransport()
+        self._token = None
+        self._expires_at = 0
+        self._lock = None
+
+    async def login(self):
+        """
+        Authenticate against authentication endpoint
+        :return: New LWSSO token
+        """
+        payload = {'Login': '{}'.format(self.user_name), 'Password': '{}'.format(self.password)}
+        payload = dumps(payload)
+        smax_token = await self.transport.request('POST', self.auth_url, data=payload)
+        if smax_token.status_code >= 400:
+            raise SmaxError('Login failed with status {}'.format(smax_token.status_code))
+        return str(smax_token.content.decode("utf-8"))
+
+    async def get_token(self, stale_token=None):
+        """
+        Get cached token, logging in again only when token is missing, about to expire
+        or when token passed as stale is still the cached one
+        :param stale_token: Token rejected by SMAX, default is None
+        :return: Valid LWSSO token
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            expired = time.monotonic() >= self._expires_at - self.refresh_margin
+            if self._token is None or expired or (stale_token is not None and stale_token == self._token):
+                self._token = await self.login()
+                self._expires_at = time.monotonic() + self.token_lifetime
+            return self._token
+
+    def invalidate(self):
+        """
+        Drop cached token, next call will log in again
+        """
+        self._token = None
+        self._expires_at = 0
+
+    async def close(self):
+        """
+        Close connections of underlying transport
+        """
+        await self.transport.close()
+
+    async def get_cookie(self, token=None):
+        """
+        Get cookie holding current token
+        :param token: Token to wrap, default is currently cached token
+        :return: cookie to pass with each subsequent request
+        """
+        return {'LWSSO_COOKIE_KEY': '{0}'.format(token or await self.get_token())}
+
+    async def request(self, method, url, **kwargs):
+        """
+        Send request with session cookie, if SMAX rejects token with 401 it is refreshed
+        and request is sent once more
+        :param method: HTTP method
+        :param url: Full url to call
+        :param kwargs: Any other argument accepted by aiohttp
+        :return: SmaxResponse object
+        """
+        token = await self.get_token()
+        response = await self.transport.request(method, url, cookies=await self.get_cookie(token), **kwargs)
+        if response.status_code == 401:
+            token = await self.get_token(stale_token=token)
+            response = await self.transport.request(method, url, cookies=await self.get_cookie(token), **kwargs)
+        return response
+
+    async def get(self, url, **kwargs):
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url, data=None, **kwargs):
+        return await self.request('POST', url, data=data, **kwargs)
+
+    async def put(self, url, data=None, **kwargs):
+        return await self.request('PUT', url, data=data, **kwargs)
+
+    async def delete(self, url, **kwargs):
+        return await self.request('DELETE', url, **kwargs)
@@ -0,0 +1,86 @@
+import asyncio
+from smax.smax_json import loads
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class SmaxResponse(object):
+    def __init__(self, status_code, content, headers):
+        """
+        Response of async call, body is already read so it can be used outside of event loop
+        :param status_code: HTTP status of response
+        :param content: Body of response in bytes
+        :param headers: Headers of response
+        """
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+
+    def json(self):
+        """
+        Decode body of response
+        :return: Body in JSON format
+        """
+        return loads(self.content)
+
+
+class SmaxTransport(object):
+    IDEMPOTENT_METHODS = ('GET', 'PUT', 'DELETE', 'HEAD', 'OPTIONS')
+
+    def __init__(self, pool_size=100, timeout=60, retries=3, backoff_factor=0.5,
+                 retry_statuses=(502, 503, 504)):
+        """
+        Pooled async HTTP transport, one instance can be shared by any number of async classes
+        running on same event loop
+        :param pool_size: Maximum number of connections kept open, default is 100
+        :param timeout: Seconds to wait for whole call, default is 60, None waits forever
+        :param retries: Number of retries of failed idempotent calls, default is 3
+        :param backoff_factor: Backoff factor between retries in seconds, default is 0.5
+        :param retry_statuses: HTTP statuses that are retried, default is 502, 503, 504
+        """
+        assert aiohttp is not None, 'aiohttp is required for smax.aio, install it with pip install aiohttp'
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.retry_statuses = retry_statuses
+        self.session = None
+
+    def _get_session(self):
+        # aiohttp session has to be created inside running event loop
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.pool_size),
+                                                 timeout=aiohttp.ClientTimeout(total=self.timeout),
+                                                 cookie_jar=aiohttp.DummyCookieJar())
+        return self.session
+
+    async def request(self, method, url, **kwargs):
+        """
+        Send request over pooled connection
+        :param method: HTTP method
+        :param url: Full url to call
+        :param kwargs: Any other argument accepted by aiohttp
+        :return: SmaxResponse object
+        """
+        retries = self.retries if method.upper() in self.IDEMPOTENT_METHODS else 0
+        attempt = 0
+        while True:
+            try:
+                async with self._get_session().request(method, url, **kwargs) as response:
+                    content = await response.read()
+                    if response.status not in self.retry_statuses or attempt >= retries:
+                        return SmaxResponse(response.status, content, response.headers)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt >= retries:
+                    raise
+            await asyncio.sleep(self.backoff_factor * (2 ** attempt))
+            attempt += 1
+
+    async def close(self):
+        """
+        Close all pooled connections
+        """
+        if self.session is not None:
+            await self.session.close()
@@ -1,21 +1,36 @@
-import json
-import requests
+import functools
+import urllib.parse
+from collections import OrderedDict
+from smax.smax_errors import SmaxError
+from smax.smax_json import dumps, loads
+from smax.smax_rollout import Rollout
+from smax.smax_session import SmaxSession
 
 
 class SmaxAdmin(object):
-    def __init__(self, base_url, user_name, password, account_id):
+    def __init__(self, base_url, user_name, password, account_id, token_lifetime=1500, refresh_margin=60,
+                 transport=None):
         """
         Initiate main wrapper class and connection details
         :param base_url: Base url of your SMAX instance
         :param user_name: user name of admin user
         :param password: password of admin user
         :param account_id: Suite ID of your instance
+        :param token_lifetime: Seconds admin token is reused before logging in again, default is 1500
+        :param refresh_margin: Seconds before expiry token is refreshed proactively, default is 60
+        :param transport: SmaxTransport with connection pool to use, can be shared between instances,
+        default is new transport
         """
         self.base_url = base_url
         self.user_name = user_name
         self.password = password
         self.account_id = str(account_id)
         self.headers = {'Content-Type': 'application/json'}
+        SMAX_AUTH = '{}/auth/authentication-endpoint/authenticate/login?ACCOUNTID={}'. \
+            format(self.base_url, self.account_id)
+        self.session = SmaxSession(SMAX_AUTH, self.user_name, self.password,
+                                   token_lifetime=token_lifetime, refresh_margin=refresh_margin,
+                                   transport=transport)
 
     @staticmethod
     def get_help(function):
@@ -28,26 +43,18 @@ class SmaxAdmin(object):
 
     def get_admin_cookie(self):
         """
-        Authenticate calls against authentication endpoint
+        Get cookie of cached admin session, logs in only when there is no valid token
         :return: cookie to pass with each subsequent request
         """
-        SMAX_AUTH = '{}/auth/authentication-endpoint/authenticate/login?ACCOUNTID={}'. \
-            format(self.base_url, self.account_id)
-        payload = {'Login': '{}'.format(self.user_name), 'Password': '{}'.format(self.password)}
-        payload = json.dumps(payload)
-        smax_token = requests.post(SMAX_AUTH, data=payload)
-        auth_c = str(smax_token.content.decode("utf-8"))
-        cookie_smax = {'LWSSO_COOKIE_KEY': '{0}'.format(auth_c)}
-        return cookie_smax
+        return self.session.get_cookie()
 
     def get_users(self):
         """
         Get a list of users
         :return: list of users in json format
         """
-        query_endpoint = requests.get('{}/bo/rest/entities/user'
-                                      .format(self.base_url),
-                                      cookies=self.get_admin_cookie()).json()
+        query_endpoint = loads(self.session.get('{}/bo/rest/entities/user'
+                                                .format(self.base_url)).content)
         return query_endpoint
 
     def get_user_by_id(self, user_id):
@@ -56,9 +63,8 @@ class SmaxAdmin(object):
         :param user_id: ID of user to query
         :return: User details in JSON format
         """
-        query_endpoint = requests.get('{}/bo/rest/entities/user/{}'
-                                      .format(self.base_url, user_id),
-                                      cookies=self.get_admin_cookie()).json()
+        query_endpoint = loads(self.session.get('{}/bo/rest/entities/user/{}'
+                                                .format(self.base_url, user_id)).content)
         return query_endpoint
 
     def attach_user_to_tenant(self, user_id, tenant_id):
@@ -71,20 +77,74 @@ class SmaxAdmin(object):
         payload = {"tenantId": tenant_id,
                    "attachEntities":
                        [{"id": user_id, "entityType": "user"}]}
-        payload_to_put = json.dumps(payload)
-        attach_request = requests.put('{}/bo/rest/entities/user/attachOrRemove'.format(self.base_url),
-                                      cookies=self.get_admin_cookie(), data=payload_to_put,
-                                      headers=self.headers).json()
+        payload_to_put = dumps(payload)
+        attach_request = loads(self.session.put('{}/bo/rest/entities/user/attachOrRemove'.format(self.base_url),
+                                                data=payload_to_put,
+                                                headers=self.headers).content)
         return attach_request
 
+    def attach_users_to_tenants(self, assignments, chunk_size=100, max_in_flight=4, progress_path=None):
+        """
+        Attach many users to tenants, users of each tenant are packed into attachOrRemove calls of up to
+        chunk_size users and calls are sent concurrently
+        :param assignments: Dict of tenant ID to iterable of user IDs, or iterable of (user ID, tenant ID) pairs
+        :param chunk_size: Maximum number of users attached in one call, default is 100
+        :param max_in_flight: Maximum number of calls sent at once, default is 4
+        :param progress_path: Path of progress file, rollout interrupted and started again with same path
+        skips users already attached, see Rollout, default is None
+        :return: List of dicts with user_id, tenant_id, completion_status and error of every user,
+        users attached by previous run are left out
+        """
+        assert chunk_size >= 1, 'chunk_size must be at least 1'
+        if isinstance(assignments, dict):
+            assignments = [(user_id, tenant_id) for tenant_id, user_ids in assignments.items() for user_id in user_ids]
+        rollout = Rollout(progress_path, max_in_flight)
+        items = OrderedDict()
+        tenants = OrderedDict()
+        for user_id, tenant_id in assignments:
+            key = 'attach/{}/{}'.format(tenant_id, user_id)
+            if key not in rollout.completed and key not in items:
+                items[key] = (user_id, tenant_id)
+                tenants.setdefault(tenant_id, []).append(key)
+        batches = []
+        for tenant_id, keys in tenants.items():
+            for start in range(0, len(keys), chunk_size):
+                chunk = keys[start:start + chunk_size]
+                batches.append((chunk, functools.partial(self._attach_chunk, tenant_id,
+                                                         OrderedDict((key, items[key][0]) for key in chunk))))
+        return [dict(result, user_id=items[key][0], tenant_id=items[key][1]) for key, result in rollout.run(batches)]
+
+    def _attach_chunk(self, tenant_id, users):
+        payload = {"tenantId": tenant_id,
+                   "attachEntities": [{"id": user_id, "entityType": "user"} for user_id in users.values()]}
+        response = self.session.put('{}/bo/rest/entities/user/attachOrRemove'.format(self.base_url),
+                                    data=dumps(payload), headers=self.headers)
+        if response.status_code >= 400:
+            raise SmaxError('Attach to tenant {} failed with {}: {}'.format(tenant_id, response.status_code,
+                                                                            response.text[:500]))
+        attach_result = loads(response.content)
+        keys = {str(user_id): key for key, user_id in users.items()}
+        item_results = attach_result.get('entity_result_list') if isinstance(attach_result, dict) else None
+        if not item_results:
+            # no per user results, status of whole call applies to every user
+            status = attach_result.get('meta', {}).get('completion_status', 'OK') \
+                if isinstance(attach_result, dict) else 'OK'
+            return {key: {'completion_status': status, 'error': None} for key in users}
+        results = {}
+        for item in item_results:
+            key = keys.get(str((item.get('entity') or {}).get('id')))
+            if key is not None:
+                results[key] = {'completion_status': item.get('completion_status'),
+                                'error': item.get('errorDetails')}
+        return results
+
     def get_accounts(self):
         """
         Get a list of accounts
         :return: list of accounts in json format
         """
-        query_endpoint = requests.get('{}/bo/rest/entities/account'
-                                      .format(self.base_url),
-                                      cookies=self.get_admin_cookie()).json()
+        query_endpoint = loads(self.session.get('{}/bo/rest/entities/account'
+                                                .format(self.base_url)).content)
         return query_endpoint
 
     def get_customers(self):
@@ -92,9 +152,8 @@ class SmaxAdmin(object):
         Get a list of customers
         :return: list of customers in json format
         """
-        query_endpoint = requests.get('{}/bo/rest/entities/customer'
-                                      .format(self.base_url),
-                                      cookies=self.get_admin_cookie()).json()
+        query_endpoint = loads(self.session.get('{}/bo/rest/entities/customer'
+                                                .format(self.base_url)).content)
         return query_endpoint
 
     def get_tenants(self):
@@ -102,9 +161,8 @@ class SmaxAdmin(object):
         Get a list of tenants
         :return: list of tenants in json format
         """
-        query_endpoint = requests.get('{}/bo/rest/entities/tenant'
-                                      .format(self.base_url),
-                                      cookies=self.get_admin_cookie()).json()
+        query_endpoint = loads(self.session.get('{}/bo/rest/entities/tenant'
+                                                .format(self.base_url)).content)
         return query_endpoint
 
     def get_tenant_by_id(self, tenant_id):
@@ -113,9 +171,8 @@ class SmaxAdmin(object):
         :param tenant_id: ID of tenant to query
         :return: Tenant details in JSON format
         """
-        query_endpoint = requests.get('{}/bo/rest/entities/tenant/{}'
-                                      .format(self.base_url, tenant_id),
-                                      cookies=self.get_admin_cookie()).json()
+        query_endpoint = loads(self.session.get('{}/bo/rest/entities/tenant/{}'
+                                                .format(self.base_url, tenant_id)).content)
         return query_endpoint
 
     def change_tenant_settings(self, tenant_it, payload):
@@ -127,12 +184,40 @@ class SmaxAdmin(object):
         :param payload: Payload of items to change
         :return: Result of operation in JSON format
         """
-        payload_to_put = json.dumps(payload)
-        request_to_change = requests.put('{}/bo/rest/entities/tenant/{}'.format(self.base_url, tenant_it),
-                                         cookies=self.get_admin_cookie(), data=payload_to_put,
-                                         headers=self.headers).json()
+        payload_to_put = dumps(payload)
+        request_to_change = loads(self.session.put('{}/bo/rest/entities/tenant/{}'.format(self.base_url, tenant_it),
+                                                   data=payload_to_put,
+                                                   headers=self.headers).content)
         return request_to_change
 
+    def change_settings_of_tenants(self, settings, max_in_flight=4, progress_path=None):
+        """
+        Change settings of many tenants concurrently, see change_tenant_settings for how to build payloads
+        :param settings: Dict of tenant ID to payload
+        :param max_in_flight: Maximum number of tenants changed at once, default is 4
+        :param progress_path: Path of progress file, rollout interrupted and started again with same path
+        skips tenants already changed, see Rollout, default is None
+        :return: List of dicts with tenant_id, completion_status, result and error of every tenant,
+        tenants changed by previous run are left out
+        """
+        rollout = Rollout(progress_path, max_in_flight)
+        items = OrderedDict(('settings/{}'.format(tenant_id), tenant_id) for tenant_id in settings)
+        batches = [([key], functools.partial(self._change_settings, key, tenant_id, settings[tenant_id]))
+                   for key, tenant_id in items.items() if key not in rollout.completed]
+        return [dict(result, tenant_id=items[key]) for key, result in rollout.run(batches)]
+
+    def _change_settings(self, key, tenant_id, payload):
+        response = self.session.put('{}/bo/rest/entities/tenant/{}'.format(self.base_url, tenant_id),
+                                    data=dumps(payload), headers=self.headers)
+        try:
+            change_result = loads(response.content) if response.content else None
+        except ValueError:
+            change_result = response.text
+        if response.status_code >= 400:
+            return {key: {'completion_status': 'FAILED', 'result': change_result,
+                          'error': 'HTTP {}'.format(response.status_code)}}
+        return {key: {'completion_status': 'OK', 'result': change_result, 'error': None}}
+
     def delete_tenant(self, tenant_id):
         """
         This method will delete the tenant, bear in mind that this operation is not reversible, use with caution!
@@ -141,10 +226,10 @@ class SmaxAdmin(object):
         """
         payload = [{"id": tenant_id,
                     "entityType": "tenant"}]
-        delete_payload = json.dumps(payload)
-        delete_tenant = requests.delete('{}/bo/rest/entities/tenant'.format(self.base_url),
-                                        cookies=self.get_admin_cookie(), data=delete_payload,
-                                        headers=self.headers).json()
+        delete_payload = dumps(payload)
+        delete_tenant = loads(self.session.delete('{}/bo/rest/entities/tenant'.format(self.base_url),
+                                                  data=delete_payload,
+                                                  headers=self.headers).content)
         return delete_tenant
 
     def get_license_pools(self):
@@ -152,9 +237,8 @@ class SmaxAdmin(object):
         Get a list of license pools
         :return: list of license pools in json format
         """
-        query_endpoint = requests.get('{}/bo/rest/entities/licensePool'
-                                      .format(self.base_url),
-                                      cookies=self.get_admin_cookie()).json()
+        query_endpoint = loads(self.session.get('{}/bo/rest/entities/licensePool'
+                                                .format(self.base_url)).content)
         return query_endpoint
 
     def get_licenses(self):
@@ -162,9 +246,8 @@ class SmaxAdmin(object):
         Get a list of licenses
         :return: list of licenses in json format
         """
-        query_endpoint = requests.get('{}/bo/rest/entities/license'
-                                      .format(self.base_url),
-                                      cookies=self.get_admin_cookie()).json()
+        query_endpoint = loads(self.session.get('{}/bo/rest/entities/license'
+                                                .format(self.base_url)).content)
         return query_endpoint
 
     def get_license_activity(self):
@@ -172,9 +255,8 @@ class SmaxAdmin(object):
         Get a list of license activities
         :return: list of license activities in json format
         """
-        query_endpoint = requests.get('{}/bo/rest/entities/licenseActivity'
-                                      .format(self.base_url),
-                                      cookies=self.get_admin_cookie()).json()
+        query_endpoint = loads(self.session.get('{}/bo/rest/entities/licenseActivity'
+                                                .format(self.base_url)).content)
         return query_endpoint
 
     def get_configurations(self, config_section):
@@ -196,18 +278,24 @@ class SmaxAdmin(object):
             'Please select one of the following\nsecurity, email, export, ldap, index, license'
         config_section = str(config_section).lower()
         config_selection = configs.get(config_section, None)
-        query_endpoint = requests.get('{}/bo/rest/entities/configurations/{}'.format(self.base_url, config_selection),
-                                      cookies=self.get_admin_cookie()).json()
+        query_endpoint = loads(self.session.get('{}/bo/rest/entities/configurations/{}'
+                                                .format(self.base_url, config_selection)).content)
         return query_endpoint
 
-    def get_operation_history(self):
+    def get_operation_history(self, skip=None, size=None, filters=None):
         """
-        Get operation history
+        Get operation history, whole collection unless page or filter is passed, see OperationHistoryReader
+        for paged and incremental reading
+        :param skip: Number of operations to skip, default is None
+        :param size: Number of operations to return, default is None
+        :param filters: Filter of operations, e.g. 'time >= 1560294000000', default is None
         :return: Operation history in json format
         """
-        query_endpoint = requests.get('{}/bo/rest/entities/operationHistory'
-                                      .format(self.base_url),
-                                      cookies=self.get_admin_cookie()).json()
+        params = [(name, value) for name, value in (('skip', skip), ('size', size), ('filter', filters))
+                  if value is not None]
+        query_endpoint = loads(self.session.get('{}/bo/rest/entities/operationHistory{}'
+                                                .format(self.base_url, '?' + urllib.parse.urlencode(params)
+                                                        if params else '')).content)
         return query_endpoint
 
     def get_operation_history_by_id(self, operation_id):
@@ -216,7 +304,6 @@ class SmaxAdmin(object):
         :param operation_id: ID of operation to query
         :return: Operation details in JSON format
         """
-        query_endpoint = requests.get('{}/bo/rest/entities/operationHistory/{}'
-                                      .format(self.base_url, operation_id),
-                                      cookies=self.get_admin_cookie()).json()
+        query_endpoint = loads(self.session.get('{}/bo/rest/entities/operationHistory/{}'
+                                                .format(self.base_url, operation_id)).content)
         return query_endpoint
\ No newline at end of file
@@ -0,0 +1,138 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+class AdminInventory(object):
+    COLLECTIONS = (('tenants', 'get_tenants'),
+                   ('users', 'get_users'),
+                   ('accounts', 'get_accounts'),
+                   ('customers', 'get_customers'),
+                   ('license_pools', 'get_license_pools'),
+                   ('licenses', 'get_licenses'),
+                   ('license_activity', 'get_license_activity'))
+    DETAILS = {'tenants': 'get_tenant_by_id', 'users': 'get_user_by_id'}
+
+    def __init__(self, admin, max_in_flight=8, ttl=300, details=('tenants', 'users')):
+        """
+        Crawler of Suite Admin inventory, fetches all collections at once on session of admin, fans out
+        by ID detail calls as soon as their collection arrives and joins everything into snapshot of
+        tenant to users, licenses and license pools, snapshot is kept for ttl seconds
+        :param admin: SmaxAdmin to crawl with, transport pool of admin should hold max_in_flight connections
+        :param max_in_flight: Maximum number of calls sent at once, default is 8
+        :param ttl: Seconds snapshot is served before crawling again, default is 300
+        :param details: Collections whose items are replaced by their by ID details, tenants and/or users,
+        default is both
+        """
+        assert max_in_flight >= 1, 'max_in_flight must be at least 1'
+        assert set(details) <= set(self.DETAILS), 'details must be tenants and/or users'
+        self.admin = admin
+        self.max_in_flight = max_in_flight
+        self.ttl = ttl
+        self.details = tuple(details)
+        self.calls = 0
+        self._snapshot = None
+        self._expires_at = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def items(result):
+        """
+        Get items of Suite Admin collection
+        :param result: JSON result of collection call, list or dict holding entities
+        :return: List of items
+        """
+        if isinstance(result, dict):
+            return result.get('entities') or []
+        return list(result or [])
+
+    def crawl(self):
+        """
+        Fetch collections and details of their items
+        :return: Tuple of dict of collection name to list of items and dict of failed call to exception
+        """
+        collections = {}
+        details = {name: {} for name in self.details}
+        errors = {}
+        pending = {}
+        executor = ThreadPoolExecutor(max_workers=self.max_in_flight)
+        try:
+            for name, method in self.COLLECTIONS:
+                pending[executor.submit(getattr(self.admin, method))] = name, None
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name, item_id = pending.pop(future)
+                    self.calls += 1
+                    try:
+                        result = future.result()
+                    except Exception as error:
+                        errors[name if item_id is None else '{}/{}'.format(name, item_id)] = error
+                        continue
+                    if item_id is not None:
+                        details[name][item_id] = result
+                        continue
+                    collections[name] = self.items(result)
+                    if name in details:
+                        method = getattr(self.admin, self.DETAILS[name])
+                        for item in collections[name]:
+                            if item.get('id') is not None:
+                                pending[executor.submit(method, item['id'])] = name, item['id']
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+        for name, found in details.items():
+            collections[name] = [found.get(item.get('id')) or item for item in collections.get(name, [])]
+        return collections, errors
+
+    @staticmethod
+    def _tenant_ids(item):
+        tenant_ids = item.get('tenantIds')
+        if tenant_ids is None:
+            tenant_ids = [item['tenantId']] if item.get('tenantId') is not None else []
+        return [str(tenant_id) for tenant_id in tenant_ids]
+
+    def join(self, collections, errors=None):
+        """
+        Join collections into snapshot
+        :param collections: Dict of collection name to list of items, see crawl
+        :param errors: Dict of failed call to exception, default is None
+        :return: Dict with time, tenants (tenant ID to dict of tenant, users, licenses and license_pools),
+        unassigned (users, licenses and license pools without known tenant), accounts, customers,
+        license_activity and errors
+        """
+        tenants = {str(tenant['id']): {'tenant': tenant, 'users': [], 'licenses': [], 'license_pools': []}
+                   for tenant in collections.get('tenants', []) if tenant.get('id') is not None}
+        unassigned = {'users': [], 'licenses': [], 'license_pools': []}
+        for name in unassigned:
+            for item in collections.get(name, []):
+                tenant_ids = [tenant_id for tenant_id in self._tenant_ids(item) if tenant_id in tenants]
+                for tenant_id in tenant_ids:
+                    tenants[tenant_id][name].append(item)
+                if not tenant_ids:
+                    unassigned[name].append(item)
+        return {'time': int(time.time() * 1000), 'tenants': tenants, 'unassigned': unassigned,
+                'accounts': collections.get('accounts', []), 'customers': collections.get('customers', []),
+                'license_activity': collections.get('license_activity', []), 'errors': dict(errors or {})}
+
+    def snapshot(self, refresh=False):
+        """
+        Get joined inventory, crawls only when cached snapshot is older than ttl, concurrent callers
+        wait for one crawl
+        :param refresh: Set to True to crawl even when cached snapshot is fresh, default is False
+        :return: Snapshot, see join
+        """
+        with self._lock:
+            if refresh or self._snapshot is None or time.monotonic() >= self._expires_at:
+                self._snapshot = self.join(*self.crawl())
+                self._expires_at = time.monotonic() + self.ttl
+            return self._snapshot
+
+    def invalidate(self):
+        """
+        Drop cached snapshot, next call crawls again
+        """
+        with self._lock:
+            self._snapshot = None
+            self._expires_at = 0
@@ -0,0 +1,260 @@
+import itertools
+from smax.smax_result_set import ResultSet
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+HOUR = 3600 * 1000
+DAY = 24 * HOUR
+WEEK = 7 * DAY
+# 1970-01-01 was Thursday, weeks are shifted by 3 days so they start on Monday
+WEEK_SHIFT = 3 * DAY
+
+
+def bucket(timestamps, unit='day', offset=0):
+    """
+    Round SMAX epoch millisecond timestamps down to start of their time bucket
+    :param timestamps: Array or list of epoch milliseconds
+    :param unit: 'hour', 'day', 'week' (starting Monday), 'month' or bucket length in milliseconds, default is 'day'
+    :param offset: Milliseconds added to UTC before bucketing, e.g. 2 * HOUR for UTC+2, default is 0
+    :return: numpy.ndarray of bucket starts in epoch milliseconds (UTC)
+    """
+    assert numpy is not None, 'numpy is required, install it with pip install numpy'
+    local = numpy.asarray(timestamps, dtype=numpy.int64) + offset
+    if unit == 'month':
+        months = local.astype('datetime64[ms]').astype('datetime64[M]')
+        return months.astype('datetime64[ms]').astype(numpy.int64) - offset
+    if unit == 'week':
+        return (local + WEEK_SHIFT) // WEEK * WEEK - WEEK_SHIFT - offset
+    length = {'hour': HOUR, 'day': DAY}.get(unit, unit)
+    assert isinstance(length, int) and length > 0, 'unit must be hour, day, week, month or milliseconds'
+    return local // length * length - offset
+
+
+class _Columns(object):
+    def __init__(self, records):
+        # records are ResultSet or list of entities, columns are converted once and only when asked for
+        self.records = records
+        self._numeric = {}
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, field):
+        if field not in self._numeric:
+            if isinstance(self.records, ResultSet):
+                values = self.records.to_numpy(field)
+                values = values.astype(numpy.float64) if values.dtype != object else \
+                    numpy.array([numpy.nan if value is None else value for value in values], dtype=numpy.float64)
+            else:
+                values = numpy.array([numpy.nan if value is None else value for value in self.labels(field)],
+                                     dtype=numpy.float64)
+            self._numeric[field] = values
+        return self._numeric[field]
+
+    def labels(self, field):
+        if isinstance(self.records, ResultSet):
+            return self.records.column(field)
+        return [entity.get('properties', entity).get(field) for entity in self.records]
+
+
+class Aggregation(object):
+    def __init__(self, group_by=(), value=None, time_field=None, unit='day', offset=0, percentiles=(50, 90),
+                 threshold=None):
+        """
+        NumPy backed group-by over EMS query results, records are added page by page and only per group
+        totals are kept, so it runs over results larger than memory. Percentiles need every value, they keep
+        one float per measured record, leave percentiles empty for constant memory per group
+        :param group_by: List of FieldIDs to group by, e.g. ['Priority', 'RegisteredForActualService'], default is ()
+        :param value: FieldID or function to measure, function gets columns mapping of FieldID to float array,
+        e.g. lambda c: c['CloseTime'] - c['EmsCreationTime'] for time to resolve, default is None (counts only)
+        :param time_field: FieldID with epoch milliseconds to bucket records by, e.g. EmsCreationTime, default is None
+        :param unit: Time bucket, see bucket, default is 'day'
+        :param offset: Milliseconds added to UTC before bucketing, see bucket, default is 0
+        :param percentiles: Percentiles of value to compute, default is (50, 90)
+        :param threshold: Count values lower or equal to threshold, e.g. SLA target in milliseconds, default is None
+        """
+        assert numpy is not None, 'numpy is required, install it with pip install numpy'
+        self.group_by = [group_by] if isinstance(group_by, str) else list(group_by)
+        self.value = value
+        self.time_field = time_field
+        self.unit = unit
+        self.offset = offset
+        self.percentiles = tuple(percentiles) if value is not None else ()
+        self.threshold = threshold
+        self.records = 0
+        self.skipped = 0
+        self._groups = {}
+
+    @property
+    def keys(self):
+        return self.group_by + (['bucket'] if self.time_field else [])
+
+    def add(self, records):
+        """
+        Add page of records
+        :param records: ResultSet, JSON result of EMS query or list of entities
+        :return: Aggregation itself, so calls can be chained
+        """
+        if isinstance(records, dict):
+            records = records.get('entities') or []
+        if not isinstance(records, ResultSet):
+            records = list(records)
+        if not len(records):
+            return self
+        columns = _Columns(records)
+        self.records += len(records)
+        selected = numpy.ones(len(records), dtype=bool)
+        codes, uniques = [], []
+        if self.time_field:
+            times = columns[self.time_field]
+            selected &= ~numpy.isnan(times)
+            buckets = numpy.zeros(len(records), dtype=numpy.int64)
+            buckets[selected] = bucket(times[selected].astype(numpy.int64), self.unit, self.offset)
+        for field in self.group_by:
+            code, unique = self._factorize(columns.labels(field))
+            codes.append(code)
+            uniques.append(unique)
+        if self.time_field:
+            unique, code = numpy.unique(buckets, return_inverse=True)
+            codes.append(code.reshape(-1))
+            uniques.append([int(start) for start in unique])
+        self.skipped += int((~selected).sum())
+        if not selected.any():
+            return self
+        if codes:
+            combined = numpy.ravel_multi_index([code[selected] for code in codes],
+                                               [len(unique) for unique in uniques])
+            group_codes, groups = numpy.unique(combined, return_inverse=True)
+            groups = groups.reshape(-1)
+        else:
+            group_codes = numpy.zeros(1, dtype=numpy.int64)
+            groups = numpy.zeros(int(selected.sum()), dtype=numpy.int64)
+        size = len(group_codes)
+        counts = numpy.bincount(groups, minlength=size)
+        totals = None
+        if self.value is not None:
+            values = (self.value(columns) if callable(self.value) else columns[self.value])[selected]
+            measured = ~numpy.isnan(values)
+            measured_groups, values = groups[measured], values[measured]
+            totals = {'measured': numpy.bincount(measured_groups, minlength=size),
+                      'sum': numpy.bincount(measured_groups, weights=values, minlength=size),
+                      'min': numpy.full(size, numpy.inf), 'max': numpy.full(size, -numpy.inf)}
+            numpy.minimum.at(totals['min'], measured_groups, values)
+            numpy.maximum.at(totals['max'], measured_groups, values)
+            if self.threshold is not None:
+                totals['within_threshold'] = numpy.bincount(measured_groups[values <= self.threshold], minlength=size)
+            if self.percentiles:
+                order = numpy.argsort(measured_groups, kind='stable')
+                totals['values'] = numpy.split(values[order], numpy.cumsum(totals['measured'])[:-1])
+        group_keys = numpy.unravel_index(group_codes, [len(unique) for unique in uniques]) if codes else []
+        for position in range(size):
+            key = tuple(unique[int(indexes[position])] for unique, indexes in zip(uniques, group_keys))
+            self._merge(key, int(counts[position]), totals, position)
+        return self
+
+    def add_stream(self, entities, page_size=5000):
+        """
+        Add records from generator, e.g. get_entities(..., paginate=True), page_size records at a time
+        :param entities: Iterable of entities
+        :param page_size: Number of records aggregated at once, default is 5000
+        :return: Aggregation itself, so calls can be chained
+        """
+        entities = iter(entities)
+        while True:
+            page = list(itertools.islice(entities, page_size))
+            if not page:
+                return self
+            self.add(page)
+
+    @staticmethod
+    def _factorize(labels):
+        index = {}
+        codes = numpy.fromiter((index.setdefault(label, len(index)) for label in labels),
+                               dtype=numpy.int64, count=len(labels))
+        return codes, list(index)
+
+    def _merge(self, key, count, totals, position):
+        group = self._groups.setdefault(key, {'count': 0, 'measured': 0, 'sum': 0.0, 'min': numpy.inf,
+                                              'max': -numpy.inf, 'within_threshold': 0, 'values': []})
+        group['count'] += count
+        if totals is None:
+            return
+        group['measured'] += int(totals['measured'][position])
+        group['sum'] += float(totals['sum'][position])
+        group['min'] = min(group['min'], float(totals['min'][position]))
+        group['max'] = max(group['max'], float(totals['max'][position]))
+        if 'within_threshold' in totals:
+            group['within_threshold'] += int(totals['within_threshold'][position])
+        if 'values' in totals and len(totals['values'][position]):
+            group['values'].append(totals['values'][position])
+
+    @staticmethod
+    def _sort_key(key):
+        return tuple((2, 0, '') if part is None else (0, part, '') if isinstance(part, (int, float))
+                     else (1, 0, str(part)) for part in key)
+
+    def result(self):
+        """
+        Get aggregated groups
+        :return: List of dicts with group fields, bucket start when time_field is set, count and, when value
+        is set, measured, sum, mean, min, max, p<percentile> and within_threshold
+        """
+        rows = []
+        for key in sorted(self._groups, key=self._sort_key):
+            group = self._groups[key]
+            row = dict(zip(self.keys, key))
+            row['count'] = group['count']
+            if self.value is not None:
+                measured = group['measured']
+                row['measured'] = measured
+                row['sum'] = group['sum']
+                row['mean'] = group['sum'] / measured if measured else None
+                row['min'] = group['min'] if measured else None
+                row['max'] = group['max'] if measured else None
+                if self.percentiles:
+                    values = numpy.concatenate(group['values']) if group['values'] else None
+                    for percentile in self.percentiles:
+                        row['p{}'.format(percentile)] = float(numpy.percentile(values, percentile)) \
+                            if values is not None else None
+                if self.threshold is not None:
+                    row['within_threshold'] = group['within_threshold']
+            rows.append(row)
+        return rows
+
+    def to_pandas(self):
+        """
+        Get aggregated groups as pandas DataFrame
+        :return: pandas.DataFrame
+        """
+        try:
+            import pandas
+        except ImportError:
+            raise AssertionError('pandas is required, install it with pip install pandas')
+        return pandas.DataFrame(self.result())
+
+
+def aggregate(records, group_by=(), **kwargs):
+    """
+    Group records in one call
+    :param records: ResultSet, JSON result of EMS query, list or generator of entities
+    :param group_by: List of FieldIDs to group by
+    :param kwargs: Options of Aggregation, e.g. value='Priority', time_field='EmsCreationTime', unit='week'
+    :return: List of dicts, see Aggregation.result
+    """
+    aggregation = Aggregation(group_by, **kwargs)
+    if isinstance(records, (dict, list, ResultSet)):
+        return aggregation.add(records).result()
+    return aggregation.add_stream(records).result()
+
+
+def count_by(records, group_by, **kwargs):
+    """
+    Count records per group, e.g. incidents per RegisteredForActualService
+    :param records: ResultSet, JSON result of EMS query, list or generator of entities
+    :param group_by: FieldID or list of FieldIDs to group by
+    :param kwargs: Time bucketing options of Aggregation, e.g. time_field='EmsCreationTime', unit='month'
+    :return: List of dicts with group fields and count
+    """
+    return aggregate(records, group_by, **kwargs)
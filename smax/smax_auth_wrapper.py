@@ -1,36 +1,431 @@
-import json
+import functools
 import re
-import requests
+import time
+import urllib.parse
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from smax.smax_bulk_writer import BulkWriter
+from smax.smax_export import Exporter
+from smax.smax_query import Condition, encode
+from smax.smax_errors import SmaxError
+from smax.smax_executor import run_jobs
+from smax.smax_json import dumps, loads, query_decoder
+from smax.smax_result_set import ResultSet
+from smax.smax_session import SmaxSession
+from smax.smax_sharding import ShardPlanner
 
 
 class SmaxTenant(object):
-    def __init__(self, base_url, user_name, password, tenant_id):
+    ENTITY_TYPES = None
+
+    def __init__(self, base_url, user_name, password, tenant_id, token_lifetime=1500, refresh_margin=60,
+                 transport=None, cache=None, single_flight=None):
         """
         Initiate main wrapper class and connection details
         :param base_url: Base url of your SMAX instance
         :param user_name: user name of user/integration user
         :param password: password of user/integration user
         :param tenant_id: tenant ID of your instance
+        :param token_lifetime: Seconds token is reused before logging in again, default is 1500
+        :param refresh_margin: Seconds before expiry token is refreshed proactively, default is 60
+        :param transport: SmaxTransport with connection pool to use, can be shared between instances,
+        default is new transport
+        :param cache: ResponseCache for metadata, forms, templates and workflows, can be shared between
+        instances, default is None meaning no caching
+        :param single_flight: SingleFlight coalescing concurrent identical GET calls into one,
+        default is None meaning every call is sent
         """
         self.base_url = base_url
         self.user_name = user_name
         self.password = password
         self.tenant_id = str(tenant_id)
         self.headers = {'Content-Type': 'application/json'}
+        SMAX_AUTH = '{}/auth/authentication-endpoint/authenticate/login?TENANTID={}'. \
+            format(self.base_url, self.tenant_id)
+        self.session = SmaxSession(SMAX_AUTH, self.user_name, self.password,
+                                   token_lifetime=token_lifetime, refresh_margin=refresh_margin,
+                                   transport=transport)
+        self.cache = cache
+        self.single_flight = single_flight
 
     def get_cookie(self):
         """
-        Authenticate calls against authentication endpoint
+        Get cookie of cached session, logs in only when there is no valid token
         :return: cookie to pass with each subsequent request
         """
-        SMAX_AUTH = '{}/auth/authentication-endpoint/authenticate/login?TENANTID={}'. \
-            format(self.base_url, self.tenant_id)
-        payload = {'Login': '{}'.format(self.user_name), 'Password': '{}'.format(self.password)}
-        payload = json.dumps(payload)
-        smax_token = requests.post(SMAX_AUTH, data=payload)
-        auth_c = str(smax_token.content.decode("utf-8"))
-        cookie_smax = {'LWSSO_COOKIE_KEY': '{0}'.format(auth_c)}
-        return cookie_smax
+        return self.session.get_cookie()
+
+    def get_json(self, url, cached=False, decoder=None):
+        """
+        Get JSON result of url
+        :param url: Full url to call
+        :param cached: Set to True to serve result from response cache when tenant has one, default is False
+        :param decoder: Function decoding response bytes, default is loads of fastest JSON library installed
+        :return: JSON result of call
+        """
+        decoder = decoder or loads
+        cache = self.cache if cached else None
+        content = cache.get(url) if cache is not None else None
+        instrumentation = self.session.transport.instrumentation
+        if instrumentation is not None and cache is not None:
+            instrumentation.count_cache(content is not None)
+        if content is None:
+            status_code, content = self._get_content(url)
+            if cache is not None and status_code == 200:
+                cache.put(url, content)
+        if instrumentation is None:
+            return decoder(content)
+        started = time.perf_counter()
+        result = decoder(content)
+        instrumentation.observe_decode(url, time.perf_counter() - started)
+        return result
+
+    def _get_content(self, url):
+        def fetch():
+            response = self.session.get(url)
+            return response.status_code, response.content
+        if self.single_flight is None:
+            return fetch()
+        return self.single_flight.do(url, fetch)
+
+    def build_query_url(self, entity_type, query_params, filters=None, order=None, skip=None, size=None):
+        """
+        Build url of EMS query
+        :param entity_type: Entity type to query
+        :param query_params: FieldIDs you want to query, encased in quotes, comma separated
+        :param filters: Filters you'd like to apply, comma separated and encased in quotes, or Condition
+        built with Q.field, default is None
+        :param order: Order of results, e.g. 'Id asc', default is None
+        :param skip: Number of records to skip, default is None
+        :param size: Number of records to return, default is None
+        :return: Full url of query
+        """
+        assert type(query_params) == str, 'Query params must be in string form'
+        query_params = str(query_params).replace(' ', '')
+        url = '{}/rest/{}/ems/{}?layout={}'.format(self.base_url, self.tenant_id, entity_type, query_params)
+        if isinstance(filters, Condition):
+            url += '&filter={}'.format(filters.encode()) if filters else ''
+        elif filters:
+            assert type(filters) == str, 'Filter params must be in string form'
+            url += '&filter={}'.format(encode(filters))
+        if order:
+            url += '&order={}'.format(urllib.parse.quote_plus(order))
+        if skip is not None:
+            url += '&skip={}'.format(skip)
+        if size is not None:
+            url += '&size={}'.format(size)
+        return url
+
+    def get_entities(self, entity_type, query_params, filters=None, paginate=False, page_size=500,
+                     order=None, skip=None, size=None, parallel=False, max_in_flight=4, ordered=True,
+                     cached=False, compact=False, shard_by=None, shard_size=5000, typed=False):
+        """
+        Run EMS query for any entity type, returns single page as SMAX hands it back
+        unless paginate is set
+        :param entity_type: Entity type to query
+        :param query_params: FieldIDs you want to query, encased in quotes, comma separated
+        :param filters: Filters you'd like to apply, comma separated and encased in quotes, default is None
+        :param paginate: Set to True to get generator yielding entities of all pages, default is False
+        :param page_size: Number of records fetched per page when paginating, default is 500
+        :param order: Order of results, e.g. 'DisplayLabel asc', default is None
+        :param skip: Number of records to skip, ignored when paginating, default is None
+        :param size: Number of records to return, ignored when paginating, default is None
+        :param parallel: Set to True to fetch pages concurrently when paginating, default is False
+        :param max_in_flight: Maximum number of pages fetched at once when parallel, default is 4
+        :param ordered: Set to False to get entities of parallel pages as they arrive, default is True
+        :param cached: Set to True to serve single page from response cache when tenant has one, default is False
+        :param compact: Set to True to get ResultSet holding layout fields column-wise instead of dicts,
+        all pages are loaded into it when paginating, default is False
+        :param shard_by: Split paginated query into time windows of EmsCreationTime or LastUpdateTime fetched
+        concurrently instead of deep skip offsets, see ShardPlanner, default is None
+        :param shard_size: Wanted number of records per time window, default is 5000
+        :param typed: Set to True to decode single page straight into msgspec structs built from layout,
+        fields outside layout are skipped while decoding, see query_decoder, default is False
+        :return: Returns JSON result of query, or generator of entities when paginating
+        """
+        if compact:
+            if paginate:
+                return ResultSet(query_params, self.get_entities(
+                    entity_type, query_params, filters, paginate=True, page_size=page_size, order=order,
+                    parallel=parallel, max_in_flight=max_in_flight, ordered=ordered, shard_by=shard_by,
+                    shard_size=shard_size))
+            return ResultSet.from_query(self.get_entities(entity_type, query_params, filters, order=order,
+                                                          skip=skip, size=size, cached=cached), query_params)
+        if paginate and shard_by:
+            return ShardPlanner(self, shard_by, shard_size=shard_size, max_in_flight=max_in_flight).iter_entities(
+                entity_type, query_params, filters, page_size=page_size, order=order or 'Id asc', ordered=ordered)
+        if paginate and parallel:
+            return self.iter_entities_parallel(entity_type, query_params, filters, page_size=page_size,
+                                               order=order or 'Id asc', max_in_flight=max_in_flight,
+                                               ordered=ordered)
+        if paginate:
+            return self.iter_entities(entity_type, query_params, filters, page_size=page_size,
+                                      order=order or 'Id asc')
+        query_endpoint = self.get_json(self.build_query_url(entity_type, query_params, filters,
+                                                            order=order, skip=skip, size=size), cached=cached,
+                                       decoder=query_decoder(entity_type, query_params) if typed else None)
+        return query_endpoint
+
+    def query(self, query, validate=True, **kwargs):
+        """
+        Run query built with Q, e.g. query(Q('Incident').layout('Id').where(Q.field('Status') == 'Open'))
+        :param query: Q query
+        :param validate: Set to False to skip check of fields against entity metadata, default is True
+        :param kwargs: Paging options, e.g. paginate=True, parallel=True, see get_entities
+        :return: Returns JSON result of query, or generator of entities when paginating
+        """
+        if validate:
+            query.validate(self)
+        if not kwargs.get('paginate'):
+            kwargs.setdefault('skip', query.start)
+            kwargs.setdefault('size', query.limit)
+        return self.get_entities(query.entity_type, query.layout_string, query.condition, order=query.sort, **kwargs)
+
+    def get_entities_page(self, entity_type, query_params, filters=None, skip=0, size=500, order='Id asc'):
+        """
+        Get one page of EMS query, fails loudly if SMAX does not complete query
+        :param entity_type: Entity type to query
+        :param query_params: FieldIDs you want to query, encased in quotes, comma separated
+        :param filters: Filters you'd like to apply, comma separated and encased in quotes, default is None
+        :param skip: Number of records to skip, default is 0
+        :param size: Number of records on page, default is 500
+        :param order: Order of results, stable order keeps pages from overlapping, default is 'Id asc'
+        :return: JSON result of page query
+        """
+        page = self.get_json(self.build_query_url(entity_type, query_params, filters,
+                                                  order=order, skip=skip, size=size))
+        meta = page.get('meta', {})
+        if meta.get('completion_status', 'OK') != 'OK':
+            raise SmaxError('Query of {} failed at skip={}: {}'.format(entity_type, skip,
+                                                                      meta.get('errorDetailsList')))
+        return page
+
+    def iter_entities(self, entity_type, layout, filters=None, page_size=500, order='Id asc', skip=0):
+        """
+        Walk through all pages of EMS query, fetching next page only when previous one is consumed
+        :param entity_type: Entity type to query
+        :param layout: FieldIDs you want to query, encased in quotes, comma separated
+        :param filters: Filters you'd like to apply, comma separated and encased in quotes, default is None
+        :param page_size: Number of records fetched per page, default is 500
+        :param order: Order of results, stable order keeps pages from overlapping, default is 'Id asc'
+        :param skip: Number of records to skip before first page, default is 0
+        :return: Generator yielding entities one by one
+        """
+        while True:
+            page = self.get_entities_page(entity_type, layout, filters, skip=skip, size=page_size, order=order)
+            entities = page.get('entities') or []
+            for entity in entities:
+                yield entity
+            skip += len(entities)
+            total_count = page.get('meta', {}).get('total_count')
+            if not entities or (total_count is not None and skip >= total_count) or \
+                    (total_count is None and len(entities) < page_size):
+                return
+
+    def iter_entities_parallel(self, entity_type, layout, filters=None, page_size=500, order='Id asc',
+                               max_in_flight=4, ordered=True):
+        """
+        Walk through all pages of EMS query, reading total count from first page and fetching
+        remaining pages concurrently, at most max_in_flight at a time. Records created while
+        walking may be missed, same as with sequential paging
+        :param entity_type: Entity type to query
+        :param layout: FieldIDs you want to query, encased in quotes, comma separated
+        :param filters: Filters you'd like to apply, comma separated and encased in quotes, default is None
+        :param page_size: Number of records fetched per page, default is 500
+        :param order: Order of results, stable order keeps pages from overlapping, default is 'Id asc'
+        :param max_in_flight: Maximum number of pages fetched at once, default is 4
+        :param ordered: Set to False to yield pages as they arrive instead of in query order, default is True
+        :return: Generator yielding entities one by one
+        """
+        assert max_in_flight >= 1, 'max_in_flight must be at least 1'
+        first_page = self.get_entities_page(entity_type, layout, filters, skip=0, size=page_size, order=order)
+        entities = first_page.get('entities') or []
+        for entity in entities:
+            yield entity
+        total_count = first_page.get('meta', {}).get('total_count')
+        if total_count is None:
+            if len(entities) == page_size:
+                yield from self.iter_entities(entity_type, layout, filters, page_size=page_size,
+                                              order=order, skip=page_size)
+            return
+        jobs = ((skip, functools.partial(self.get_entities_page, entity_type, layout, filters, skip=skip,
+                                         size=page_size, order=order))
+                for skip in range(page_size, total_count, page_size))
+        for _, page in run_jobs(jobs, max_in_flight=max_in_flight, ordered=ordered):
+            for entity in page.get('entities') or []:
+                yield entity
+
+    def export(self, entity_type, query_params, filters, path, **kwargs):
+        """
+        Stream EMS query into file page by page without holding whole result in memory
+        :param entity_type: Entity type to export
+        :param query_params: FieldIDs you want to export, encased in quotes, comma separated
+        :param filters: Filters you'd like to apply, comma separated and encased in quotes, None exports all
+        :param path: Path of output file
+        :param kwargs: Export options, e.g. format='csv', compress='gzip', resume=True, see Exporter
+        :return: Number of records exported
+        """
+        return Exporter(self, entity_type, query_params, path, filters=filters, **kwargs).run()
+
+    def get_many(self, entity_type, ids, layout, chunk_size=500, max_url_length=4000, max_in_flight=4):
+        """
+        Get many entities by ID with few EMS queries, IDs are deduplicated and packed into
+        'Id in (...)' filters small enough to keep url under max_url_length, queries run concurrently
+        :param entity_type: Entity type to query
+        :param ids: Iterable of entity IDs
+        :param layout: FieldIDs you want to query, encased in quotes, comma separated, Id is always added
+        :param chunk_size: Maximum number of IDs in one query, default is 500
+        :param max_url_length: Maximum length of query url, default is 4000
+        :param max_in_flight: Maximum number of queries run at once, default is 4
+        :return: Dict of entity ID to entity, IDs that were not found map to None
+        """
+        assert type(layout) == str, 'Query params must be in string form'
+        fields = [field for field in layout.replace(' ', '').split(',') if field]
+        if 'Id' not in fields:
+            fields.insert(0, 'Id')
+        layout = ','.join(fields)
+        wanted = list(OrderedDict.fromkeys(str(entity_id) for entity_id in ids))
+        base_length = len(self.build_query_url(entity_type, layout, 'Id in ()', order='Id asc',
+                                               skip=0, size=chunk_size))
+        chunks, chunk, length = [], [], base_length
+        for entity_id in wanted:
+            id_length = len(urllib.parse.quote_plus(entity_id)) + 1
+            if chunk and (len(chunk) >= chunk_size or length + id_length > max_url_length):
+                chunks.append(chunk)
+                chunk, length = [], base_length
+            chunk.append(entity_id)
+            length += id_length
+        if chunk:
+            chunks.append(chunk)
+
+        def fetch(chunk_ids):
+            return list(self.iter_entities(entity_type, layout, 'Id in ({})'.format(','.join(chunk_ids)),
+                                           page_size=len(chunk_ids)))
+
+        found = OrderedDict((entity_id, None) for entity_id in wanted)
+        with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+            for entities in executor.map(fetch, chunks):
+                for entity in entities:
+                    found[str(entity['properties']['Id'])] = entity
+        return found
+
+    def bulk_create(self, entity_type, entity_payloads, **kwargs):
+        """
+        Create many entities of one type through /ems/bulk
+        :param entity_type: Define entity type to create
+        :param entity_payloads: Iterable of payloads, one per entity
+        :param kwargs: Batching options, e.g. chunk_size=200, parallel=True, see bulk_write
+        :return: List of per entity results in same order as payloads, see bulk_write
+        """
+        return self.bulk_write((('CREATE', entity_type, payload) for payload in entity_payloads), **kwargs)
+
+    def bulk_update(self, entity_type, entity_payloads, **kwargs):
+        """
+        Update many entities of one type through /ems/bulk
+        :param entity_type: Define entity type to update
+        :param entity_payloads: Iterable of payloads, each one must hold Id of entity to update
+        :param kwargs: Batching options, e.g. chunk_size=200, parallel=True, see bulk_write
+        :return: List of per entity results in same order as payloads, see bulk_write
+        """
+        return self.bulk_write((('UPDATE', entity_type, payload) for payload in entity_payloads), **kwargs)
+
+    def bulk_write(self, operations, chunk_size=100, parallel=False, max_in_flight=4, completed=None):
+        """
+        Send many create and update operations through /ems/bulk, consecutive operations of same kind
+        are packed into one call of up to chunk_size entities
+        :param operations: Iterable of (operation, entity_type, payload) tuples, operation is CREATE or UPDATE
+        :param chunk_size: Maximum number of entities sent in one call, default is 100
+        :param parallel: Set to True to send chunks concurrently, default is False
+        :param max_in_flight: Maximum number of chunks sent at once when parallel, default is 4
+        :param completed: Empty dict filled with operation index to result as chunks are answered, so caller
+        knows which operations went through when call raises part way, default is None
+        :return: List of per entity results in same order as operations, each result is a dict holding
+        operation, entity_type, properties sent, completion_status, entity returned by SMAX and errorDetails
+        """
+        assert chunk_size >= 1, 'chunk_size must be at least 1'
+        results = completed if completed is not None else {}
+        if parallel:
+            executor = ThreadPoolExecutor(max_workers=max_in_flight)
+            pending = set()
+            error = None
+            try:
+                for chunk in self._bulk_chunks(operations, chunk_size):
+                    if len(pending) >= max_in_flight:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        error = self._collect_chunks(done, results)
+                        if error is not None:
+                            break
+                    pending.add(executor.submit(self._send_bulk_chunk, *chunk))
+            finally:
+                executor.shutdown(wait=True)
+                # chunks in flight when another one failed went through too, their results are kept
+                error = self._collect_chunks(pending, results) or error
+            if error is not None:
+                raise error
+        else:
+            for chunk in self._bulk_chunks(operations, chunk_size):
+                results.update(self._send_bulk_chunk(*chunk))
+        return [results[index] for index in range(len(results))]
+
+    def bulk_writer(self, **kwargs):
+        """
+        Get write-behind buffer that queues create and update operations and sends them
+        through /ems/bulk in batches, use as context manager
+        :param kwargs: Buffering options, e.g. flush_size=200, flush_interval=2, see BulkWriter
+        :return: BulkWriter writing through this tenant
+        """
+        return BulkWriter(self, **kwargs)
+
+    def _bulk_chunks(self, operations, chunk_size):
+        operation, items = None, []
+        for index, (entity_operation, entity_type, payload) in enumerate(operations):
+            assert entity_operation in ('CREATE', 'UPDATE'), 'operation must be CREATE or UPDATE'
+            assert type(payload) == dict, 'Payload must be a dict'
+            assert self.ENTITY_TYPES is None or entity_type in self.ENTITY_TYPES, \
+                'entity type must be one of the following:\n{}'.format(', '.join(self.ENTITY_TYPES))
+            if entity_operation == 'UPDATE':
+                assert 'Id' in payload, 'Update payload must hold entity Id'
+            if items and (entity_operation != operation or len(items) >= chunk_size):
+                yield operation, items
+                items = []
+            operation = entity_operation
+            items.append((index, entity_type, payload))
+        if items:
+            yield operation, items
+
+    @staticmethod
+    def _collect_chunks(futures, results):
+        error = None
+        for future in futures:
+            if future.exception() is not None:
+                error = error or future.exception()
+            else:
+                results.update(future.result())
+        return error
+
+    def _send_bulk_chunk(self, operation, items):
+        base_payload = {"entities": [{"entity_type": "{}".format(entity_type), "properties": payload}
+                                     for _, entity_type, payload in items],
+                        "operation": operation}
+        response = self.session.post('{}/rest/{}/ems/bulk'.format(self.base_url, self.tenant_id),
+                                     data=dumps(base_payload), headers=self.headers)
+        try:
+            bulk_result = loads(response.content)
+        except ValueError:
+            bulk_result = {}
+        entity_results = bulk_result.get('entity_result_list') or []
+        chunk_error = bulk_result.get('meta', {}).get('errorDetailsList') or \
+            'HTTP {} without result for entity'.format(response.status_code)
+        results = {}
+        for position, (index, entity_type, payload) in enumerate(items):
+            entity_result = entity_results[position] if position < len(entity_results) else {}
+            results[index] = {'operation': operation,
+                              'entity_type': entity_type,
+                              'properties': payload,
+                              'completion_status': entity_result.get('completion_status', 'FAILED'),
+                              'entity': entity_result.get('entity'),
+                              'errorDetails': entity_result.get('errorDetails') if entity_result else chunk_error}
+        return results
 
     @staticmethod
     def store_output(function):
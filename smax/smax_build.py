@@ -1,33 +1,22 @@
-import json
-import urllib.parse
-import requests
+from smax.smax_json import dumps, loads
 from smax.smax_auth_wrapper import SmaxTenant
 
 
 class Build(SmaxTenant):
-    def __init__(self, base_url, user_name, password, tenant_id):
-        super().__init__(base_url, user_name, password, tenant_id)
+    ENTITY_TYPES = ('Change', 'Release', 'EntityModel', 'Article', 'ServiceDefinition', 'ActualService')
 
-    def get_changes(self, query_params, filters=None):
+    def __init__(self, base_url, user_name, password, tenant_id, **kwargs):
+        super().__init__(base_url, user_name, password, tenant_id, **kwargs)
+
+    def get_changes(self, query_params, filters=None, **kwargs):
         """
         Get changes based on params passed
         :param query_params: FieldIDs you want to query, encased in quotes, comma separated
         :param filters: Filters you'd like to apply, comma separated and encased in quotes, default is None
+        :param kwargs: Paging options, e.g. paginate=True, page_size=1000, see SmaxTenant.get_entities
         :return: Returns JSON result of change query
         """
-        assert type(query_params) == str, 'Query params must be in string form'
-        query_params = str(query_params).replace(' ', '')
-        if filters:
-            assert type(filters) == str, 'Filter params must be in string form'
-            filters = SmaxTenant.fix_url_encode(urllib.parse.quote_plus(filters))
-            query_endpoint = requests.get('{}/rest/{}/ems/Change/?layout={}&filter={}'
-                                          .format(self.base_url, self.tenant_id, query_params, filters),
-                                          cookies=self.get_cookie()).json()
-            return query_endpoint
-        query_endpoint = requests.get('{}/rest/{}/ems/Change/?layout={}'
-                                      .format(self.base_url, self.tenant_id, query_params),
-                                      cookies=self.get_cookie()).json()
-        return query_endpoint
+        return self.get_entities('Change', query_params, filters, **kwargs)
 
     def get_change_by_id(self, change_id):
         """
@@ -35,18 +24,26 @@ class Build(SmaxTenant):
         :param change_id: ID of change to query
         :return: Returns JSON result of change query
         """
-        query_endpoint = requests.get('{}/rest/{}/entity-page/initializationData/Change/{}'
-                                      .format(self.base_url, self.tenant_id, change_id),
-                                      cookies=self.get_cookie()).json()
+        query_endpoint = self.get_json('{}/rest/{}/entity-page/initializationData/Change/{}'
+                                       .format(self.base_url, self.tenant_id, change_id))
         return query_endpoint
 
+    def get_changes_by_ids(self, ids, query_params, **kwargs):
+        """
+        Get many changes by ID in few queries
+        :param ids: Iterable of change IDs
+        :param query_params: FieldIDs you want to query, encased in quotes, comma separated
+        :param kwargs: Batching options, e.g. chunk_size=200, see SmaxTenant.get_many
+        :return: Dict of change ID to change, IDs that were not found map to None
+        """
+        return self.get_many('Change', ids, query_params, **kwargs)
+
     def get_change_form(self):
         """
         Gets change form, showing all available fields and data types in them
         :return: JSON result of change form
         """
-        query = requests.get('{}/rest/{}/forms/Change'.format(self.base_url, self.tenant_id),
-                             cookies=self.get_cookie()).json()
+        query = self.get_json('{}/rest/{}/forms/Change'.format(self.base_url, self.tenant_id), cached=True)
         return query
 
     def get_change_templates(self):
@@ -54,9 +51,8 @@ class Build(SmaxTenant):
         Returns the list of all change templates
         :return: JSON of all change templates
         """
-        query_endpoint = requests.get('{}/rest/{}/rms/EntityTemplate?filter=(EntityType+%3D+%27Change%27)'
-                                      .format(self.base_url, self.tenant_id),
-                                      cookies=self.get_cookie()).json()
+        query_endpoint = self.get_json('{}/rest/{}/rms/EntityTemplate?filter=(EntityType+%3D+%27Change%27)'
+                                       .format(self.base_url, self.tenant_id), cached=True)
         return query_endpoint
 
     def get_change_model_by_id(self, change_model_id):
@@ -65,32 +61,20 @@ class Build(SmaxTenant):
         :param change_model_id: ID of change model
         :return: Change model details in JSON format
         """
-        query = requests.get('{}/rest/{}/entity-page/initializationData/EntityModel/{}'.format(self.base_url,
-                                                                                               self.tenant_id,
-                                                                                               change_model_id),
-                             cookies=self.get_cookie()).json()
+        query = self.get_json('{}/rest/{}/entity-page/initializationData/EntityModel/{}'.format(self.base_url,
+                                                                                                self.tenant_id,
+                                                                                                change_model_id))
         return query
 
-    def get_releases(self, query_params, filters=None):
+    def get_releases(self, query_params, filters=None, **kwargs):
         """
         Get releases based on params passed
         :param query_params: FieldIDs you want to query, encased in quotes, comma separated
         :param filters: Filters you'd like to apply, comma separated and encased in quotes, default is None
+        :param kwargs: Paging options, e.g. paginate=True, page_size=1000, see SmaxTenant.get_entities
         :return: Returns JSON result of release query
         """
-        assert type(query_params) == str, 'Query params must be in string form'
-        query_params = str(query_params).replace(' ', '')
-        if filters:
-            assert type(filters) == str, 'Filter params must be in string form'
-            filters = SmaxTenant.fix_url_encode(urllib.parse.quote_plus(filters))
-            query_endpoint = requests.get('{}/rest/{}/ems/Release/?layout={}&filter={}'
-                                          .format(self.base_url, self.tenant_id, query_params, filters),
-                                          cookies=self.get_cookie()).json()
-            return query_endpoint
-        query_endpoint = requests.get('{}/rest/{}/ems/Release/?layout={}'
-                                      .format(self.base_url, self.tenant_id, query_params),
-                                      cookies=self.get_cookie()).json()
-        return query_endpoint
+        return self.get_entities('Release', query_params, filters, **kwargs)
 
     def get_release_by_id(self, release_id):
         """
@@ -98,22 +82,30 @@ class Build(SmaxTenant):
         :param release_id: ID of release
         :return: Release details in JSON format
         """
-        query = requests.get('{}/rest/{}/entity-page/initializationData/Release/{}'.format(self.base_url,
-                                                                                           self.tenant_id,
-                                                                                           release_id),
-                             cookies=self.get_cookie()).json()
+        query = self.get_json('{}/rest/{}/entity-page/initializationData/Release/{}'.format(self.base_url,
+                                                                                            self.tenant_id,
+                                                                                            release_id))
         return query
 
+    def get_releases_by_ids(self, ids, query_params, **kwargs):
+        """
+        Get many releases by ID in few queries
+        :param ids: Iterable of release IDs
+        :param query_params: FieldIDs you want to query, encased in quotes, comma separated
+        :param kwargs: Batching options, e.g. chunk_size=200, see SmaxTenant.get_many
+        :return: Dict of release ID to release, IDs that were not found map to None
+        """
+        return self.get_many('Release', ids, query_params, **kwargs)
+
     def get_release_model_by_id(self, release_model_id):
         """
         Get release model by ID
         :param release_model_id: ID of change model
         :return: Release model details in JSON format
         """
-        query = requests.get('{}/rest/{}/entity-page/initializationData/EntityModel/{}'.format(self.base_url,
-                                                                                               self.tenant_id,
-                                                                                               release_model_id),
-                             cookies=self.get_cookie()).json()
+        query = self.get_json('{}/rest/{}/entity-page/initializationData/EntityModel/{}'.format(self.base_url,
+                                                                                                self.tenant_id,
+                                                                                                release_model_id))
         return query
 
     def get_article_form(self):
@@ -121,30 +113,18 @@ class Build(SmaxTenant):
         Gets article form with all fields and data types
         :return: JSON result of article form
         """
-        query = requests.get('{}/rest/{}/forms/Article'.format(self.base_url, self.tenant_id),
-                             cookies=self.get_cookie()).json()
+        query = self.get_json('{}/rest/{}/forms/Article'.format(self.base_url, self.tenant_id), cached=True)
         return query
 
-    def get_knowledge_articles(self, query_params, filters=None):
+    def get_knowledge_articles(self, query_params, filters=None, **kwargs):
         """
         Get knowledge articles on params passed
         :param query_params: FieldIDs you want to query, encased in quotes, comma separated
         :param filters: Filters you'd like to apply, comma separated and encased in quotes, default is None
+        :param kwargs: Paging options, e.g. paginate=True, page_size=1000, see SmaxTenant.get_entities
         :return: Returns JSON result of knowledge articles
         """
-        assert type(query_params) == str, 'Query params must be in string form'
-        query_params = str(query_params).replace(' ', '')
-        if filters:
-            assert type(filters) == str, 'Filter params must be in string form'
-            filters = SmaxTenant.fix_url_encode(urllib.parse.quote_plus(filters))
-            query_endpoint = requests.get('{}/rest/{}/ems/Article/?layout={}&filter={}'
-                                          .format(self.base_url, self.tenant_id, query_params, filters),
-                                          cookies=self.get_cookie()).json()
-            return query_endpoint
-        query_endpoint = requests.get('{}/rest/{}/ems/Article/?layout={}'
-                                      .format(self.base_url, self.tenant_id, query_params),
-                                      cookies=self.get_cookie()).json()
-        return query_endpoint
+        return self.get_entities('Article', query_params, filters, **kwargs)
 
     def get_knowledge_article_by_id(self, article_id, parse_html=False):
         """
@@ -155,10 +135,9 @@ class Build(SmaxTenant):
         :return: Knowledge base article details in JSON format
         """
 
-        query = requests.get('{}/rest/{}/entity-page/initializationData/Article/{}'.format(self.base_url,
-                                                                                           self.tenant_id,
-                                                                                           article_id),
-                             cookies=self.get_cookie()).json()
+        query = self.get_json('{}/rest/{}/entity-page/initializationData/Article/{}'.format(self.base_url,
+                                                                                            self.tenant_id,
+                                                                                            article_id))
         if parse_html:
             for k, v in query.items():
                 new_value = SmaxTenant.parse_output(str(v))
@@ -172,32 +151,20 @@ class Build(SmaxTenant):
         :param knowledge_model_id: ID of change model
         :return: Knowledge model details in JSON format
         """
-        query = requests.get('{}/rest/{}/entity-page/initializationData/EntityModel/{}'.format(self.base_url,
-                                                                                               self.tenant_id,
-                                                                                               knowledge_model_id),
-                             cookies=self.get_cookie()).json()
+        query = self.get_json('{}/rest/{}/entity-page/initializationData/EntityModel/{}'.format(self.base_url,
+                                                                                                self.tenant_id,
+                                                                                                knowledge_model_id))
         return query
 
-    def get_service_definitions(self, query_params, filters=None):
+    def get_service_definitions(self, query_params, filters=None, **kwargs):
         """
         Get service definitions on params passed
         :param query_params: FieldIDs you want to query, encased in quotes, comma separated
         :param filters: Filters you'd like to apply, comma separated and encased in quotes, default is None
+        :param kwargs: Paging options, e.g. paginate=True, page_size=1000, see SmaxTenant.get_entities
         :return: Returns JSON result of service definitions
         """
-        assert type(query_params) == str, 'Query params must be in string form'
-        query_params = str(query_params).replace(' ', '')
-        if filters:
-            assert type(filters) == str, 'Filter params must be in string form'
-            filters = SmaxTenant.fix_url_encode(urllib.parse.quote_plus(filters))
-            query_endpoint = requests.get('{}/rest/{}/ems/ServiceDefinition/?layout={}&filter={}'
-                                          .format(self.base_url, self.tenant_id, query_params, filters),
-                                          cookies=self.get_cookie()).json()
-            return query_endpoint
-        query_endpoint = requests.get('{}/rest/{}/ems/ServiceDefinition/?layout={}'
-                                      .format(self.base_url, self.tenant_id, query_params),
-                                      cookies=self.get_cookie()).json()
-        return query_endpoint
+        return self.get_entities('ServiceDefinition', query_params, filters, **kwargs)
 
     def get_service_definition_by_id(self, service_definition_id):
         """
@@ -205,10 +172,9 @@ class Build(SmaxTenant):
         :param service_definition_id: ID of service definition
         :return: Servie definition details in JSON format
         """
-        query = requests.get('{}/rest/{}/entity-page/initializationData/ServiceDefinition/{}'.format(self.base_url,
-                                                                                                     self.tenant_id,
-                                                                                                     service_definition_id),
-                             cookies=self.get_cookie()).json()
+        query = self.get_json('{}/rest/{}/entity-page/initializationData/ServiceDefinition/{}'.format(self.base_url,
+                                                                                                      self.tenant_id,
+                                                                                                      service_definition_id))
         return query
 
     def get_service_definition_form(self):
@@ -216,30 +182,19 @@ class Build(SmaxTenant):
         Gets service definition form with all fields and data types
         :return: JSON result of all fields in service definition form
         """
-        query = requests.get('{}/rest/{}/forms/ServiceDefinition'.format(self.base_url, self.tenant_id),
-                             cookies=self.get_cookie()).json()
+        query = self.get_json('{}/rest/{}/forms/ServiceDefinition'.format(self.base_url, self.tenant_id),
+                              cached=True)
         return query
 
-    def get_actual_services(self, query_params, filters=None):
+    def get_actual_services(self, query_params, filters=None, **kwargs):
         """
         Get actual services on params passed
         :param query_params: FieldIDs you want to query, encased in quotes, comma separated
         :param filters: Filters you'd like to apply, comma separated and encased in quotes, default is None
+        :param kwargs: Paging options, e.g. paginate=True, page_size=1000, see SmaxTenant.get_entities
         :return: Returns JSON result of actual services
         """
-        assert type(query_params) == str, 'Query params must be in string form'
-        query_params = str(query_params).replace(' ', '')
-        if filters:
-            assert type(filters) == str, 'Filter params must be in string form'
-            filters = SmaxTenant.fix_url_encode(urllib.parse.quote_plus(filters))
-            query_endpoint = requests.get('{}/rest/{}/ems/ActualService/?layout={}&filter={}'
-                                          .format(self.base_url, self.tenant_id, query_params, filters),
-                                          cookies=self.get_cookie()).json()
-            return query_endpoint
-        query_endpoint = requests.get('{}/rest/{}/ems/ActualService/?layout={}'
-                                      .format(self.base_url, self.tenant_id, query_params),
-                                      cookies=self.get_cookie()).json()
-        return query_endpoint
+        return self.get_entities('ActualService', query_params, filters, **kwargs)
 
     def get_actual_service_by_id(self, actual_service_id):
         """
@@ -247,19 +202,28 @@ class Build(SmaxTenant):
         :param actual_service_id: ID of actual service
         :return: Actual service details in JSON format
         """
-        query = requests.get('{}/rest/{}/entity-page/initializationData/ActualService/{}'.format(self.base_url,
-                                                                                                 self.tenant_id,
-                                                                                                 actual_service_id),
-                             cookies=self.get_cookie()).json()
+        query = self.get_json('{}/rest/{}/entity-page/initializationData/ActualService/{}'.format(self.base_url,
+                                                                                                  self.tenant_id,
+                                                                                                  actual_service_id))
         return query
 
+    def get_actual_services_by_ids(self, ids, query_params, **kwargs):
+        """
+        Get many actual services by ID in few queries
+        :param ids: Iterable of actual service IDs
+        :param query_params: FieldIDs you want to query, encased in quotes, comma separated
+        :param kwargs: Batching options, e.g. chunk_size=200, see SmaxTenant.get_many
+        :return: Dict of actual service ID to actual service, IDs that were not found map to None
+        """
+        return self.get_many('ActualService', ids, query_params, **kwargs)
+
     def get_actual_services_form(self):
         """
         Gets actual services form with all fields and data types
         :return: JSON result of actual service form
         """
-        query = requests.get('{}/rest/{}/forms/ActualService'.format(self.base_url, self.tenant_id),
-                             cookies=self.get_cookie()).json()
+        query = self.get_json('{}/rest/{}/forms/ActualService'.format(self.base_url, self.tenant_id),
+                              cached=True)
         return query
 
     def create_entity(self, entity_type, entity_payload):
@@ -288,10 +252,10 @@ class Build(SmaxTenant):
             "operation": "CREATE"
         }
         base_payload['entities'][0]['properties'] = entity_payload
-        entity_creation_payload = json.dumps(base_payload)
-        entity_creation = requests.post('{}/rest/{}/ems/bulk'.format(self.base_url, self.tenant_id),
-                                        cookies=self.get_cookie(), data=entity_creation_payload,
-                                        headers=header).json()
+        entity_creation_payload = dumps(base_payload)
+        entity_creation = loads(self.session.post('{}/rest/{}/ems/bulk'.format(self.base_url, self.tenant_id),
+                                                  data=entity_creation_payload,
+                                                  headers=header).content)
         return entity_creation
 
     def update_entity(self, entity_id, entity_type, entity_payload):
@@ -323,10 +287,10 @@ class Build(SmaxTenant):
         }
         base_payload['entities'][0]['properties'] = {'Id': entity_id}
         base_payload['entities'][0]['properties'].update(entity_payload)
-        entity_update_payload = json.dumps(base_payload)
-        entity_update = requests.post('{}/rest/{}/ems/bulk'.format(self.base_url, self.tenant_id),
-                                      cookies=self.get_cookie(), data=entity_update_payload,
-                                      headers=header).json()
+        entity_update_payload = dumps(base_payload)
+        entity_update = loads(self.session.post('{}/rest/{}/ems/bulk'.format(self.base_url, self.tenant_id),
+                                                data=entity_update_payload,
+                                                headers=header).content)
         return entity_update
 
 
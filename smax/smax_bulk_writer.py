@@ -0,0 +1,197 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class BulkWriter(object):
+    def __init__(self, tenant, flush_size=500, flush_interval=5.0, max_queue=5000, chunk_size=100,
+                 parallel=False, max_in_flight=4, on_result=None):
+        """
+        Write-behind buffer of create and update operations, queued operations are sent through
+        /ems/bulk by background thread once flush_size operations are queued or oldest one is
+        flush_interval seconds old. Repeated updates of same entity Id are merged, last value of
+        field wins. Use as context manager so last operations are flushed on exit
+        :param tenant: SmaxTenant (Run, Build, MasterData) to write through
+        :param flush_size: Number of queued operations that triggers flush, default is 500
+        :param flush_interval: Seconds after which oldest queued operation is flushed, default is 5.0
+        :param max_queue: Number of queued operations at which create and update block until
+        queue is flushed, default is 5000
+        :param chunk_size: Maximum number of entities sent in one call, default is 100
+        :param parallel: Set to True to send chunks of one flush concurrently, default is False
+        :param max_in_flight: Maximum number of chunks sent at once when parallel, default is 4
+        :param on_result: Function called with result of each flushed operation, see SmaxTenant.bulk_write,
+        default is None
+        """
+        assert max_queue >= flush_size, 'max_queue must not be smaller than flush_size'
+        self.tenant = tenant
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.chunk_size = chunk_size
+        self.parallel = parallel
+        self.max_in_flight = max_in_flight
+        self.on_result = on_result
+        self.sent = 0
+        self.failed = []
+        self._creates = []
+        self._updates = OrderedDict()
+        self._oldest = None
+        self._error = None
+        self._closing = False
+        self._condition = threading.Condition()
+        # one batch in flight at a time, so older update of Id never lands after newer one
+        self._send_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='smax-bulk-writer', daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def create(self, entity_type, entity_payload):
+        """
+        Queue creation of entity
+        :param entity_type: Define entity type to create
+        :param entity_payload: Payload of create request
+        """
+        assert type(entity_payload) == dict, 'Payload must be a dict'
+        with self._condition:
+            self._wait_for_room()
+            self._creates.append((entity_type, dict(entity_payload)))
+            self._queued()
+
+    def update(self, entity_id, entity_type, entity_payload):
+        """
+        Queue update of entity, merged with update of same entity that is still queued
+        :param entity_id: entity ID of entity to update
+        :param entity_type: Define entity type to update
+        :param entity_payload: Payload of update request
+        """
+        assert type(entity_payload) == dict, 'Payload must be a dict'
+        key = (entity_type, str(entity_id))
+        with self._condition:
+            if key in self._updates:
+                self._raise_error()
+                self._updates[key].update(entity_payload)
+                return
+            self._wait_for_room()
+            self._updates[key] = {'Id': entity_id}
+            self._updates[key].update(entity_payload)
+            self._queued()
+
+    def flush(self):
+        """
+        Send all queued operations now, when sending fails operations SMAX did not answer are queued again
+        and error is raised, so flush can be called again to retry
+        """
+        self._drain()
+        with self._condition:
+            # operations of failed background send were queued again and are sent by now
+            self._error = None
+            self._condition.notify_all()
+
+    def close(self):
+        """
+        Stop background thread and send remaining operations
+        """
+        with self._condition:
+            self._closing = True
+            self._condition.notify_all()
+        self._thread.join()
+        self.flush()
+
+    def _size(self):
+        return len(self._creates) + len(self._updates)
+
+    def _raise_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def _wait_for_room(self):
+        self._raise_error()
+        assert not self._closing, 'BulkWriter is closed'
+        while self._size() >= self.max_queue:
+            self._condition.wait()
+            self._raise_error()
+
+    def _queued(self):
+        # wake background thread so it starts timing first operation or flushes full queue
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+            self._condition.notify_all()
+        elif self._size() >= self.flush_size:
+            self._condition.notify_all()
+
+    def _due(self):
+        return self._size() >= self.flush_size or \
+            (self._oldest is not None and time.monotonic() - self._oldest >= self.flush_interval)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                # after failed send background thread waits until caller saw error before sending again
+                while not self._closing and (self._error is not None or not self._due()):
+                    timeout = None
+                    if self._oldest is not None and self._error is None:
+                        timeout = max(0, self._oldest + self.flush_interval - time.monotonic())
+                    self._condition.wait(timeout)
+                if self._closing:
+                    return
+            try:
+                self._drain()
+            except Exception as error:
+                with self._condition:
+                    self._error = error
+                    self._condition.notify_all()
+
+    def _drain(self):
+        with self._send_lock:
+            with self._condition:
+                operations = [('CREATE', entity_type, payload) for entity_type, payload in self._creates]
+                operations += [('UPDATE', entity_type, payload)
+                               for (entity_type, _), payload in self._updates.items()]
+                self._creates = []
+                self._updates = OrderedDict()
+                self._oldest = None
+                self._condition.notify_all()
+            if not operations:
+                return
+            completed = {}
+            try:
+                results = self.tenant.bulk_write(operations, chunk_size=self.chunk_size, parallel=self.parallel,
+                                                 max_in_flight=self.max_in_flight, completed=completed)
+            except Exception:
+                # only operations of chunks SMAX never answered are queued again, sending others twice
+                # would create their entities twice
+                self._requeue([operation for index, operation in enumerate(operations) if index not in completed])
+                self._handle([completed[index] for index in sorted(completed)])
+                raise
+            self._handle(results)
+
+    def _requeue(self, operations):
+        with self._condition:
+            self._creates = [(entity_type, payload) for operation, entity_type, payload in operations
+                             if operation == 'CREATE'] + self._creates
+            updates = OrderedDict(((entity_type, str(payload['Id'])), payload)
+                                  for operation, entity_type, payload in operations if operation == 'UPDATE')
+            # updates queued while failed batch was in flight are newer, their fields win
+            for key, payload in self._updates.items():
+                if key in updates:
+                    updates[key].update(payload)
+                else:
+                    updates[key] = payload
+            self._updates = updates
+            if self._oldest is None and self._size():
+                self._oldest = time.monotonic()
+            self._condition.notify_all()
+
+    def _handle(self, results):
+        with self._condition:
+            self.sent += len(results)
+            self.failed.extend(result for result in results if result['completion_status'] != 'OK')
+        if self.on_result:
+            for result in results:
+                self.on_result(result)
@@ -0,0 +1,120 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResponseCache(object):
+    DEFAULT_TTLS = (('/metadata/', 3600),
+                    ('/workflow/', 3600),
+                    ('/forms/', 3600),
+                    ('/rms/EntityTemplate', 900),
+                    ('/ems/ITProcessRecordCategory', 900))
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, default_ttl=300, ttls=None, path=None):
+        """
+        Cache of raw responses of near static endpoints (metadata, forms, templates, workflows),
+        entries expire after TTL of their endpoint and least recently used ones are evicted
+        once cache grows over max_bytes, safe to share between threads and tenants
+        :param max_bytes: Maximum size of cached responses in bytes, default is 64 MB
+        :param default_ttl: Seconds response is kept when no TTL policy matches its url, default is 300
+        :param ttls: Dict of url part to TTL in seconds, checked before DEFAULT_TTLS, TTL of 0 disables
+        caching of matching urls, default is None
+        :param path: Path of SQLite file to persist cache to so it survives restarts, default is None
+        """
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.ttls = tuple((ttls or {}).items()) + self.DEFAULT_TTLS
+        self.path = path
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute('CREATE TABLE IF NOT EXISTS responses '
+                             '(url TEXT PRIMARY KEY, expires_at REAL, content BLOB)')
+            self._db.execute('DELETE FROM responses WHERE expires_at <= ?', (time.time(),))
+            self._db.commit()
+            for url, expires_at, content in self._db.execute('SELECT url, expires_at, content FROM responses'):
+                self._store(url, expires_at, bytes(content))
+
+    def ttl_for(self, url):
+        """
+        Get TTL policy of url
+        :param url: Url of request
+        :return: Seconds response of url is kept
+        """
+        for url_part, ttl in self.ttls:
+            if url_part in url:
+                return ttl
+        return self.default_ttl
+
+    def get(self, url):
+        """
+        Get cached response
+        :param url: Url of request
+        :return: Raw content of response, None if url is not cached or entry expired
+        """
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None or entry[0] <= time.time():
+                if entry is not None:
+                    self._remove(url)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(url)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, url, content):
+        """
+        Store response
+        :param url: Url of request
+        :param content: Raw content of response
+        """
+        ttl = self.ttl_for(url)
+        if ttl <= 0 or len(content) > self.max_bytes:
+            return
+        expires_at = time.time() + ttl
+        with self._lock:
+            self._store(url, expires_at, content)
+            if self._db is not None:
+                self._db.execute('INSERT OR REPLACE INTO responses VALUES (?, ?, ?)',
+                                 (url, expires_at, sqlite3.Binary(content)))
+                self._db.commit()
+
+    def invalidate(self, url_part=None):
+        """
+        Drop cached responses
+        :param url_part: Drop only urls containing this part, e.g. '/forms/Change', default drops everything
+        """
+        with self._lock:
+            for url in [url for url in self._entries if url_part is None or url_part in url]:
+                self._remove(url)
+
+    def close(self):
+        """
+        Close persistent store
+        """
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _store(self, url, expires_at, content):
+        if url in self._entries:
+            self._remove(url, persist=False)
+        self._entries[url] = (expires_at, content)
+        self.size += len(content)
+        while self.size > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, url, persist=True):
+        _, content = self._entries.pop(url)
+        self.size -= len(content)
+        if persist and self._db is not None:
+            self._db.execute('DELETE FROM responses WHERE url = ?', (url,))
+            self._db.commit()
@@ -1,10 +1,9 @@
-import requests
 from smax.smax_auth_wrapper import SmaxTenant
 
 
 class Configuration(SmaxTenant):
-    def __init__(self, base_url, user_name, password, tenant_id):
-        super().__init__(base_url, user_name, password, tenant_id)
+    def __init__(self, base_url, user_name, password, tenant_id, **kwargs):
+        super().__init__(base_url, user_name, password, tenant_id, **kwargs)
 
     def get_records_fields(self, entity_type):
         """
@@ -12,9 +11,8 @@ class Configuration(SmaxTenant):
         :param entity_type: Entity type of fields to query
         :return: JSON output of all fields for specified entity
         """
-        query_endpoint = requests.get('{}/rest/{}/metadata/ui/entity-descriptors/{}'
-                                      .format(self.base_url, self.tenant_id, entity_type),
-                                      cookies=self.get_cookie()).json()
+        query_endpoint = self.get_json('{}/rest/{}/metadata/ui/entity-descriptors/{}'
+                                       .format(self.base_url, self.tenant_id, entity_type), cached=True)
         return query_endpoint
 
     def get_workflows(self, entity_type):
@@ -23,7 +21,6 @@ class Configuration(SmaxTenant):
         :param entity_type: Type of entity to query
         :return: JSON configuration of workflows
         """
-        query_endpoint = requests.get('{}/rest/{}/workflow/full/{}'
-                                      .format(self.base_url, self.tenant_id, entity_type),
-                                      cookies=self.get_cookie()).json()
+        query_endpoint = self.get_json('{}/rest/{}/workflow/full/{}'
+                                       .format(self.base_url, self.tenant_id, entity_type), cached=True)
         return query_endpoint
@@ -0,0 +1,4 @@
+class SmaxError(Exception):
+    """
+    Raised when SMAX reports failure of a call
+    """
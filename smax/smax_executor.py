@@ -0,0 +1,51 @@
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+def run_jobs(jobs, max_in_flight=4, ordered=True):
+    """
+    Run jobs on thread pool, at most max_in_flight at a time, next job is taken from jobs only once
+    slot is free, so jobs may be generated lazily. Failure of job stops run and is raised, jobs still
+    waiting are cancelled, same as when generator is closed early
+    :param jobs: Iterable of (key, function) pairs, function takes no arguments
+    :param max_in_flight: Maximum number of jobs running at once, default is 4
+    :param ordered: Set to False to yield results as they finish instead of in order of jobs, default is True
+    :return: Generator yielding (key, result) pairs
+    """
+    assert max_in_flight >= 1, 'max_in_flight must be at least 1'
+    jobs = enumerate(jobs)
+    pending = {}
+    finished = {}
+    next_index = 0
+    executor = ThreadPoolExecutor(max_workers=max_in_flight)
+
+    def submit():
+        index, job = next(jobs, (None, None))
+        if job is None:
+            return False
+        key, function = job
+        pending[executor.submit(function)] = index, key
+        return True
+
+    def fill():
+        # ordered mode may hold results that arrived early, cap them so memory stays bounded
+        while len(pending) < max_in_flight and len(pending) + len(finished) < 2 * max_in_flight and submit():
+            pass
+
+    try:
+        fill()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, key = pending.pop(future)
+                if ordered:
+                    finished[index] = key, future.result()
+                    continue
+                yield key, future.result()
+            while next_index in finished:
+                yield finished.pop(next_index)
+                next_index += 1
+            fill()
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
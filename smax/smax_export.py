@@ -0,0 +1,169 @@
+import csv
+import gzip
+import io
+import json
+import os
+
+
+class Exporter(object):
+    FORMATS = ('ndjson', 'csv', 'parquet', 'arrow')
+    CODECS = {'ndjson': ('gzip',), 'csv': ('gzip',), 'arrow': ('lz4', 'zstd')}
+
+    def __init__(self, tenant, entity_type, layout, path, filters=None, format='ndjson', compress=None,
+                 page_size=500, resume=False):
+        """
+        Export EMS query to file page by page, each page is decoded, written and flushed before
+        next one is fetched, so memory stays bounded by page size. Progress is kept in
+        <path>.progress so interrupted NDJSON and CSV exports can be resumed
+        :param tenant: SmaxTenant (Run, Build, MasterData) to query
+        :param entity_type: Entity type to export
+        :param layout: FieldIDs you want to export, encased in quotes, comma separated
+        :param path: Path of output file
+        :param filters: Filters you'd like to apply, comma separated and encased in quotes, default is None
+        :param format: One of ndjson, csv, parquet, arrow, last two require pyarrow, default is ndjson
+        :param compress: 'gzip' for NDJSON and CSV, any pyarrow codec (snappy, zstd, gzip) for parquet,
+        lz4 or zstd for arrow, default is None
+        :param page_size: Number of records fetched and written at once, default is 500
+        :param resume: Set to True to continue export of same query from last page written, default is False
+        """
+        assert type(layout) == str, 'Query params must be in string form'
+        assert format in self.FORMATS, 'format must be one of the following:\n{}'.format(', '.join(self.FORMATS))
+        if format in ('parquet', 'arrow'):
+            self._pyarrow()
+        assert compress is None or format == 'parquet' or compress in self.CODECS[format], \
+            'Compression of {} must be one of the following:\n{}'.format(format, ', '.join(self.CODECS[format]))
+        assert not resume or format in ('ndjson', 'csv'), 'Only ndjson and csv exports can be resumed'
+        self.tenant = tenant
+        self.entity_type = entity_type
+        self.fields = [field for field in layout.replace(' ', '').split(',') if field]
+        self.layout = ','.join(self.fields)
+        self.path = path
+        self.filters = filters
+        self.format = format
+        self.compress = compress
+        self.page_size = page_size
+        self.resume = resume
+        self.progress_path = '{}.progress'.format(path)
+
+    def run(self):
+        """
+        Run export
+        :return: Number of records in file
+        """
+        query = {'entity_type': self.entity_type, 'layout': self.layout, 'filters': str(self.filters or '') or None,
+                 'format': self.format, 'compress': self.compress, 'page_size': self.page_size}
+        progress = {'skip': 0, 'rows': 0, 'offset': 0}
+        if self.resume and os.path.exists(self.progress_path):
+            with open(self.progress_path) as progress_file:
+                saved = json.load(progress_file)
+            assert saved['query'] == query, 'Progress file belongs to different export, remove it or set resume=False'
+            progress = saved['progress']
+        if self.format in ('parquet', 'arrow'):
+            return self._run_columnar()
+        with open(self.path, 'r+b' if progress['offset'] else 'wb') as output:
+            # drop anything written after last saved page so resumed export does not duplicate rows
+            output.truncate(progress['offset'])
+            output.seek(progress['offset'])
+            if not progress['offset'] and self.format == 'csv':
+                output.write(self._encode(self._csv_lines([self.fields])))
+            for entities in self._pages(progress['skip']):
+                output.write(self._encode(self._lines(entities)))
+                output.flush()
+                progress = {'skip': progress['skip'] + len(entities), 'rows': progress['rows'] + len(entities),
+                            'offset': output.tell()}
+                self._save_progress(query, progress)
+        if os.path.exists(self.progress_path):
+            os.remove(self.progress_path)
+        return progress['rows']
+
+    def _lines(self, entities):
+        if self.format == 'ndjson':
+            return ''.join(json.dumps(entity) + '\n' for entity in entities)
+        return self._csv_lines([self._value(entity['properties'].get(field)) for field in self.fields]
+                               for entity in entities)
+
+    @staticmethod
+    def _csv_lines(rows):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue()
+
+    @staticmethod
+    def _value(value):
+        if isinstance(value, (dict, list)):
+            return json.dumps(value)
+        return value
+
+    def _encode(self, text):
+        # every page becomes its own gzip member, concatenated members are valid gzip file
+        data = text.encode('utf-8')
+        return gzip.compress(data) if self.compress == 'gzip' else data
+
+    def _save_progress(self, query, progress):
+        temporary_path = '{}.tmp'.format(self.progress_path)
+        with open(temporary_path, 'w') as progress_file:
+            json.dump({'query': query, 'progress': progress}, progress_file)
+        os.replace(temporary_path, self.progress_path)
+
+    @staticmethod
+    def _pyarrow():
+        # imported on first columnar export only, so import smax does not pay for loading pyarrow
+        try:
+            import pyarrow
+            import pyarrow.ipc
+            import pyarrow.parquet
+        except ImportError:
+            raise AssertionError('pyarrow is required for parquet and arrow export, install it with '
+                                 'pip install pyarrow')
+        return pyarrow
+
+    def _schema(self, pyarrow, table):
+        # columns empty on first page can not be typed, SMAX times are epoch milliseconds and the rest
+        # are kept as strings
+        return pyarrow.schema([pyarrow.field(field.name, pyarrow.int64() if field.name.endswith('Time') else
+                                             pyarrow.string()) if pyarrow.types.is_null(field.type) else field
+                               for field in table.schema])
+
+    def _writer(self, pyarrow, schema):
+        if self.format == 'parquet':
+            return pyarrow.parquet.ParquetWriter(self.path, schema, compression=self.compress or 'snappy')
+        return pyarrow.ipc.new_file(self.path, schema,
+                                    options=pyarrow.ipc.IpcWriteOptions(compression=self.compress))
+
+    def _run_columnar(self):
+        pyarrow = self._pyarrow()
+        writer, schema, rows = None, None, 0
+        try:
+            for page in self._pages(0):
+                columns = {field: [self._value(entity['properties'].get(field)) for entity in page]
+                           for field in self.fields}
+                if schema is None:
+                    schema = self._schema(pyarrow, pyarrow.table(columns))
+                    writer = self._writer(pyarrow, schema)
+                for field in schema:
+                    if pyarrow.types.is_string(field.type):
+                        # later pages may hold other values in column typed as string by first page
+                        columns[field.name] = [value if value is None or isinstance(value, str) else str(value)
+                                               for value in columns[field.name]]
+                writer.write_table(pyarrow.table(columns, schema=schema))
+                rows += len(page)
+            if writer is None:
+                writer = self._writer(pyarrow, pyarrow.schema([pyarrow.field(field, pyarrow.string())
+                                                               for field in self.fields]))
+        finally:
+            if writer is not None:
+                writer.close()
+        return rows
+
+    def _pages(self, skip):
+        while True:
+            page = self.tenant.get_entities_page(self.entity_type, self.layout, self.filters,
+                                                 skip=skip, size=self.page_size)
+            entities = page.get('entities') or []
+            if entities:
+                yield entities
+            skip += len(entities)
+            total_count = page.get('meta', {}).get('total_count')
+            if not entities or (total_count is not None and skip >= total_count) or \
+                    (total_count is None and len(entities) < self.page_size):
+                return
@@ -0,0 +1,77 @@
+import functools
+import json
+from typing import Any, Dict, List, Optional
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+if orjson is not None:
+    BACKEND = 'orjson'
+elif msgspec is not None:
+    BACKEND = 'msgspec'
+else:
+    BACKEND = 'json'
+
+
+def loads(data):
+    """
+    Decode JSON with fastest library installed, orjson, msgspec or json from standard library
+    :param data: JSON as bytes or string
+    :return: Decoded JSON
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    if msgspec is not None:
+        try:
+            return msgspec.json.decode(data)
+        except msgspec.DecodeError as error:
+            # same error type as json and orjson raise, callers catch ValueError
+            raise ValueError(str(error))
+    return json.loads(data.decode('utf-8') if isinstance(data, (bytes, bytearray)) else data)
+
+
+def dumps(payload):
+    """
+    Encode payload as JSON with fastest library installed, falls back to json from standard library
+    for payloads fast libraries refuse, e.g. dicts with non string keys
+    :param payload: Payload to encode
+    :return: JSON string
+    """
+    try:
+        if orjson is not None:
+            return orjson.dumps(payload).decode('utf-8')
+        if msgspec is not None:
+            return msgspec.json.encode(payload).decode('utf-8')
+    except TypeError:
+        pass
+    return json.dumps(payload)
+
+
+@functools.lru_cache(maxsize=256)
+def query_decoder(entity_type, layout):
+    """
+    Get decoder turning EMS query response straight into typed structs built from layout, fields
+    not in layout are skipped while decoding, fields ending with Time are decoded as integers.
+    Requires msgspec
+    :param entity_type: Entity type of query
+    :param layout: FieldIDs of query, comma separated
+    :return: Function decoding response bytes into struct with meta and entities, each entity has
+    entity_type, properties struct and related_properties
+    """
+    assert msgspec is not None, 'msgspec is required for typed decoding, install it with pip install msgspec'
+    fields = [field for field in layout.replace(' ', '').split(',') if field and field.isidentifier()]
+    properties = msgspec.defstruct('{}Properties'.format(entity_type),
+                                   [(field, Optional[int] if field.endswith('Time') else Any, None)
+                                    for field in dict.fromkeys(fields)],
+                                   omit_defaults=True)
+    entity = msgspec.defstruct('{}Entity'.format(entity_type),
+                               [('properties', properties), ('entity_type', str, entity_type),
+                                ('related_properties', Dict[str, Any], {})])
+    result = msgspec.defstruct('{}Result'.format(entity_type),
+                               [('meta', Dict[str, Any], {}), ('entities', List[entity], [])])
+    return msgspec.json.Decoder(result, strict=False).decode
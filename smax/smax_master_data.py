@@ -1,35 +1,23 @@
-import json
-import urllib.parse
-
-import requests
+from smax.smax_json import dumps, loads
 
 from smax.smax_auth_wrapper import SmaxTenant
 
 
 class MasterData(SmaxTenant):
-    def __init__(self, base_url, user_name, password, tenant_id):
-        super().__init__(base_url, user_name, password, tenant_id)
+    ENTITY_TYPES = ('Person', 'PersonGroup', 'Location')
+
+    def __init__(self, base_url, user_name, password, tenant_id, **kwargs):
+        super().__init__(base_url, user_name, password, tenant_id, **kwargs)
 
-    def get_people(self, query_params, filters=None):
+    def get_people(self, query_params, filters=None, **kwargs):
         """
         Get list of people based on params provided
         :param query_params: FieldIDs you want to query, encased in quotes, comma separated
         :param filters: Filters you'd like to apply, comma separated and encased in quotes, default is None
+        :param kwargs: Paging options, e.g. paginate=True, page_size=1000, see SmaxTenant.get_entities
         :return: Returns JSON result of people
         """
-        assert type(query_params) == str, 'Query params must be in string form'
-        query_params = str(query_params).replace(' ', '')
-        if filters:
-            assert type(filters) == str, 'Filter params must be in string form'
-            filters = SmaxTenant.fix_url_encode(urllib.parse.quote_plus(filters))
-            query_endpoint = requests.get('{}/rest/{}/ems/Person/?layout={}&filters={}'
-                                          .format(self.base_url, self.tenant_id, query_params, filters),
-                                          cookies=self.get_cookie()).json()
-            return query_endpoint
-        query_endpoint = requests.get('{}/rest/{}/ems/Person/?layout={}'
-                                      .format(self.base_url, self.tenant_id, query_params),
-                                      cookies=self.get_cookie()).json()
-        return query_endpoint
+        return self.get_entities('Person', query_params, filters, **kwargs)
 
     def get_person_by_id(self, person_id, fields_to_display):
         """
@@ -40,33 +28,31 @@ class MasterData(SmaxTenant):
         """
         assert type(fields_to_display) == str, 'Fields must be in string format'
         fields_to_display.replace(' ', '')
-        query = requests.get('{}/rest/{}/ems/Person/{}?layout={}'.format(self.base_url,
-                                                                         self.tenant_id,
-                                                                         person_id,
-                                                                         fields_to_display),
-                             cookies=self.get_cookie()).json()
+        query = self.get_json('{}/rest/{}/ems/Person/{}?layout={}'.format(self.base_url,
+                                                                          self.tenant_id,
+                                                                          person_id,
+                                                                          fields_to_display))
         return query
 
-    def get_groups(self, query_params, filters=None):
+    def get_people_by_ids(self, ids, query_params, **kwargs):
+        """
+        Get many people by ID in few queries
+        :param ids: Iterable of person IDs
+        :param query_params: FieldIDs you want to query, encased in quotes, comma separated
+        :param kwargs: Batching options, e.g. chunk_size=200, see SmaxTenant.get_many
+        :return: Dict of person ID to person, IDs that were not found map to None
+        """
+        return self.get_many('Person', ids, query_params, **kwargs)
+
+    def get_groups(self, query_params, filters=None, **kwargs):
         """
         Get list of groups based on params provided
         :param query_params: FieldIDs you want to query, encased in quotes, comma separated
         :param filters: Filters you'd like to apply, comma separated and encased in quotes, default is None
+        :param kwargs: Paging options, e.g. paginate=True, page_size=1000, see SmaxTenant.get_entities
         :return: Returns JSON result of groups
         """
-        assert type(query_params) == str, 'Query params must be in string form'
-        query_params = str(query_params).replace(' ', '')
-        if filters:
-            assert type(filters) == str, 'Filter params must be in string form'
-            filters = SmaxTenant.fix_url_encode(urllib.parse.quote_plus(filters))
-            query_endpoint = requests.get('{}/rest/{}/ems/PersonGroup/?layout={}&filters={}'
-                                          .format(self.base_url, self.tenant_id, query_params, filters),
-                                          cookies=self.get_cookie()).json()
-            return query_endpoint
-        query_endpoint = requests.get('{}/rest/{}/ems/PersonGroup/?layout={}'
-                                      .format(self.base_url, self.tenant_id, query_params),
-                                      cookies=self.get_cookie()).json()
-        return query_endpoint
+        return self.get_entities('PersonGroup', query_params, filters, **kwargs)
 
     def get_group_by_id(self, group_id, fields_to_display):
         """
@@ -77,33 +63,31 @@ class MasterData(SmaxTenant):
         """
         assert type(fields_to_display) == str, 'Fields must be in string format'
         fields_to_display.replace(' ', '')
-        query = requests.get('{}/rest/{}/ems/PersonGroup/{}?layout={}'.format(self.base_url,
-                                                                              self.tenant_id,
-                                                                              group_id,
-                                                                              fields_to_display),
-                             cookies=self.get_cookie()).json()
+        query = self.get_json('{}/rest/{}/ems/PersonGroup/{}?layout={}'.format(self.base_url,
+                                                                               self.tenant_id,
+                                                                               group_id,
+                                                                               fields_to_display))
         return query
 
-    def get_locations(self, query_params, filters=None):
+    def get_groups_by_ids(self, ids, query_params, **kwargs):
+        """
+        Get many groups by ID in few queries
+        :param ids: Iterable of group IDs
+        :param query_params: FieldIDs you want to query, encased in quotes, comma separated
+        :param kwargs: Batching options, e.g. chunk_size=200, see SmaxTenant.get_many
+        :return: Dict of group ID to group, IDs that were not found map to None
+        """
+        return self.get_many('PersonGroup', ids, query_params, **kwargs)
+
+    def get_locations(self, query_params, filters=None, **kwargs):
         """
         Get list of groups based on params provided
         :param query_params: FieldIDs you want to query, encased in quotes, comma separated
         :param filters: Filters you'd like to apply, comma separated and encased in quotes, default is None
+        :param kwargs: Paging options, e.g. paginate=True, page_size=1000, see SmaxTenant.get_entities
         :return: Returns JSON result of groups
         """
-        assert type(query_params) == str, 'Query params must be in string form'
-        query_params = str(query_params).replace(' ', '')
-        if filters:
-            assert type(filters) == str, 'Filter params must be in string form'
-            filters = SmaxTenant.fix_url_encode(urllib.parse.quote_plus(filters))
-            query_endpoint = requests.get('{}/rest/{}/ems/Location/?layout={}&filters={}'
-                                          .format(self.base_url, self.tenant_id, query_params, filters),
-                                          cookies=self.get_cookie()).json()
-            return query_endpoint
-        query_endpoint = requests.get('{}/rest/{}/ems/Location/?layout={}'
-                                      .format(self.base_url, self.tenant_id, query_params),
-                                      cookies=self.get_cookie()).json()
-        return query_endpoint
+        return self.get_entities('Location', query_params, filters, **kwargs)
 
     def get_location_by_id(self, location_id):
         """
@@ -111,39 +95,38 @@ class MasterData(SmaxTenant):
         :param location_id: ID of location
         :return: Location details in JSON format
         """
-        query = requests.get('{}/rest/{}/entity-page/initializationData/Location/{}'.format(self.base_url,
-                                                                                            self.tenant_id,
-                                                                                            location_id),
-                             cookies=self.get_cookie()).json()
+        query = self.get_json('{}/rest/{}/entity-page/initializationData/Location/{}'.format(self.base_url,
+                                                                                             self.tenant_id,
+                                                                                             location_id))
         return query
 
-    def get_categories(self, parent_category_id=None):
+    def get_locations_by_ids(self, ids, query_params, **kwargs):
+        """
+        Get many locations by ID in few queries
+        :param ids: Iterable of location IDs
+        :param query_params: FieldIDs you want to query, encased in quotes, comma separated
+        :param kwargs: Batching options, e.g. chunk_size=200, see SmaxTenant.get_many
+        :return: Dict of location ID to location, IDs that were not found map to None
+        """
+        return self.get_many('Location', ids, query_params, **kwargs)
+
+    def get_categories(self, parent_category_id=None, **kwargs):
         """
         Get a list of categories
         :param parent_category_id: ID of parent category if looking for subcategories, default is none
+        :param kwargs: Paging options, e.g. paginate=True to walk all categories instead of first 1000,
+        cached=False to bypass response cache, see SmaxTenant.get_entities
         :return: List of categories
         """
-        if parent_category_id:
-            query_with_id = requests.get(
-                '{}/rest/{}/ems/ITProcessRecordCategory?filter=(Level1ParentId+%3D+{})&layout=Level2'
-                'Parent,PhaseId,IsDeleted,DataDomains,Level1Parent,IsActive,ExplicitStakeholders,Name,'
-                'DisplayLabel,AllStakeholders,Lifetime,Expire,Level1ParentId,LastUpdateTime,'
-                'EmsCreationTime,Level2ParentId,Id,'
-                'ProcessId&order=DisplayLabel+asc&size=1000'.format(self.base_url,
-                                                                    self.tenant_id,
-                                                                    parent_category_id),
-                cookies=self.get_cookie()).json()
-            return query_with_id
-        else:
-            query = requests.get('{}/rest/{}/ems/ITProcessRecordCategory?filter=(Level1ParentId+%3D+null)&layout=Level2'
-                                 'Parent,PhaseId,IsDeleted,DataDomains,Level1Parent,IsActive,ExplicitStakeholders,Name,'
-                                 'DisplayLabel,AllStakeholders,Lifetime,Expire,Level1ParentId,LastUpdateTime,'
-                                 'EmsCreationTime,Level2ParentId,Id,'
-                                 'ProcessId&order=DisplayLabel+asc&size=1000'.format(self.base_url,
-                                                                                     self.tenant_id,
-                                                                                     parent_category_id),
-                                 cookies=self.get_cookie()).json()
-            return query
+        kwargs.setdefault('order', 'DisplayLabel asc')
+        kwargs.setdefault('cached', True)
+        if not kwargs.get('paginate'):
+            kwargs.setdefault('size', 1000)
+        return self.get_entities('ITProcessRecordCategory',
+                                 'Level2Parent,PhaseId,IsDeleted,DataDomains,Level1Parent,IsActive,'
+                                 'ExplicitStakeholders,Name,DisplayLabel,AllStakeholders,Lifetime,Expire,'
+                                 'Level1ParentId,LastUpdateTime,EmsCreationTime,Level2ParentId,Id,ProcessId',
+                                 '(Level1ParentId = {})'.format(parent_category_id or 'null'), **kwargs)
 
     def create_entity(self, entity_type, entity_payload):
         """
@@ -166,10 +149,10 @@ class MasterData(SmaxTenant):
             "operation": "CREATE"
         }
         base_payload['entities'][0]['properties'] = entity_payload
-        entity_creation_payload = json.dumps(base_payload)
-        entity_creation = requests.post('{}/rest/{}/ems/bulk'.format(self.base_url, self.tenant_id),
-                                        cookies=self.get_cookie(), data=entity_creation_payload,
-                                        headers=header).json()
+        entity_creation_payload = dumps(base_payload)
+        entity_creation = loads(self.session.post('{}/rest/{}/ems/bulk'.format(self.base_url, self.tenant_id),
+                                                  data=entity_creation_payload,
+                                                  headers=header).content)
         return entity_creation
 
     def update_entity(self, entity_id, entity_type, entity_payload):
@@ -196,8 +179,8 @@ class MasterData(SmaxTenant):
         }
         base_payload['entities'][0]['properties'] = {'Id': entity_id}
         base_payload['entities'][0]['properties'].update(entity_payload)
-        entity_update_payload = json.dumps(base_payload)
-        entity_update = requests.post('{}/rest/{}/ems/bulk'.format(self.base_url, self.tenant_id),
-                                      cookies=self.get_cookie(), data=entity_update_payload,
-                                      headers=header).json()
+        entity_update_payload = dumps(base_payload)
+        entity_update = loads(self.session.post('{}/rest/{}/ems/bulk'.format(self.base_url, self.tenant_id),
+                                                data=entity_update_payload,
+                                                headers=header).content)
         return entity_update
\ No newline at end of file
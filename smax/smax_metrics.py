@@ -0,0 +1,259 @@
+import re
+import threading
+import time
+try:
+    from opentelemetry import trace
+except ImportError:
+    trace = None
+
+_TEMPLATES = ((re.compile(r'/authenticate/login'), lambda match: 'auth/login'),
+              (re.compile(r'/rest/[^/]+/ems/bulk'), lambda match: 'ems/bulk'),
+              (re.compile(r'/rest/[^/]+/ems/(\w+)/[^/]+$'), lambda match: 'ems/{}/{{id}}'.format(match.group(1))),
+              (re.compile(r'/rest/[^/]+/ems/(\w+)'), lambda match: 'ems/{}'.format(match.group(1))),
+              (re.compile(r'/rest/[^/]+/entity-page/initializationData/(\w+)'),
+               lambda match: 'entity-page/initializationData/{}'.format(match.group(1))),
+              (re.compile(r'/bo/rest/entities/(\w+)'), lambda match: 'bo/rest/entities/{}'.format(match.group(1))))
+_VARIABLE_SEGMENT = re.compile(r'/(?=[^/]*\d)[^/]+')
+
+
+def endpoint_template(url):
+    """
+    Get template of url that groups calls of same endpoint, ids and tenant are replaced by placeholders
+    :param url: Full url of call
+    :return: Template, e.g. ems/Incident, ems/bulk, entity-page/initializationData/Change, bo/rest/entities/tenant
+    """
+    path = url.split('?', 1)[0].split('://', 1)[-1]
+    path = path[path.find('/'):] if '/' in path else '/'
+    for pattern, template in _TEMPLATES:
+        match = pattern.search(path)
+        if match:
+            return template(match)
+    path = re.sub(r'^/rest/[^/]+', '/rest', path)
+    return _VARIABLE_SEGMENT.sub('/{id}', path).strip('/')
+
+
+class Histogram(object):
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+    def __init__(self, buckets=BUCKETS):
+        """
+        Cumulative histogram in Prometheus style
+        :param buckets: Upper bounds of buckets in seconds
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        """
+        Get cumulative counts
+        :return: List of (upper bound, count) pairs, last bound is +Inf
+        """
+        total, result = 0, []
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+class Instrumentation(object):
+    COUNTERS = ('requests', 'errors', 'bytes_in', 'bytes_out', 'retries', 'first_byte_seconds',
+                'decode_seconds', 'decodes')
+
+    def __init__(self, tracing=False, buckets=Histogram.BUCKETS):
+        """
+        Metrics of calls sent through SmaxTransport, pass it to transport to measure every SmaxTenant and
+        SmaxAdmin using it. Calls are grouped by endpoint template and method, each group keeps latency
+        histogram, bytes in and out, retries, time to first byte and JSON decode time. Cache hits and
+        misses and auth refreshes are counted too. Transport without instrumentation skips all of it
+        :param tracing: Set to True to send every call as OpenTelemetry span, needs opentelemetry-api, default is False
+        :param buckets: Upper bounds of latency buckets in seconds, default is Histogram.BUCKETS
+        """
+        assert not tracing or trace is not None, \
+            'opentelemetry-api is required for tracing, install it with pip install opentelemetry-api'
+        self.buckets = buckets
+        self.tracer = trace.get_tracer('smax') if tracing else None
+        self.endpoints = {}
+        self.statuses = {}
+        self.cache = {'hits': 0, 'misses': 0}
+        self.auth_refreshes = 0
+        self._start_hooks = []
+        self._end_hooks = []
+        self._lock = threading.Lock()
+
+    def add_hook(self, start=None, end=None):
+        """
+        Register functions called around every call
+        :param start: Function called with event dict (method, url, endpoint, started) before call is sent
+        :param end: Function called with same event dict completed with status, seconds, first_byte_seconds,
+        bytes_in, bytes_out, retries and error after call finished
+        """
+        if start:
+            self._start_hooks.append(start)
+        if end:
+            self._end_hooks.append(end)
+
+    def _endpoint(self, endpoint, method):
+        key = (endpoint, method)
+        group = self.endpoints.get(key)
+        if group is None:
+            group = self.endpoints[key] = dict({counter: 0 for counter in self.COUNTERS},
+                                               latency=Histogram(self.buckets))
+        return group
+
+    def start(self, method, url, kwargs):
+        """
+        Mark start of call, used by SmaxTransport
+        :param method: HTTP method
+        :param url: Full url of call
+        :param kwargs: Arguments of call
+        :return: Event dict to pass to end
+        """
+        data = kwargs.get('data')
+        event = {'method': method, 'url': url, 'endpoint': endpoint_template(url), 'started': time.time(),
+                 'bytes_out': len(data.encode('utf-8') if isinstance(data, str) else data) if data else 0,
+                 'retries': 0, 'stream': kwargs.get('stream', False), '_started': time.perf_counter()}
+        for hook in self._start_hooks:
+            hook(event)
+        return event
+
+    def end(self, event, response=None, error=None):
+        """
+        Mark end of call, used by SmaxTransport
+        :param event: Event returned by start
+        :param response: Response, None when call failed
+        :param error: Exception raised by call, default is None
+        """
+        if response is not None:
+            retries = getattr(getattr(response.raw, 'retries', None), 'history', None)
+            event['retries'] += len(retries or ())
+            event['status'] = response.status_code
+            event['first_byte_seconds'] = response.elapsed.total_seconds()
+            event['bytes_in'] = int(response.headers.get('Content-Length', 0)) if event['stream'] else \
+                len(response.content)
+        else:
+            event.update(status=None, first_byte_seconds=None, bytes_in=0)
+        event['seconds'] = time.perf_counter() - event.pop('_started')
+        event['error'] = error
+        with self._lock:
+            group = self._endpoint(event['endpoint'], event['method'])
+            group['requests'] += 1
+            group['errors'] += 1 if error is not None or (event['status'] or 0) >= 400 else 0
+            group['bytes_in'] += event['bytes_in']
+            group['bytes_out'] += event['bytes_out']
+            group['retries'] += event['retries']
+            group['first_byte_seconds'] += event['first_byte_seconds'] or 0
+            group['latency'].observe(event['seconds'])
+            status_key = (event['endpoint'], event['method'], event['status'])
+            self.statuses[status_key] = self.statuses.get(status_key, 0) + 1
+        if self.tracer is not None:
+            self._span(event)
+        for hook in self._end_hooks:
+            hook(event)
+
+    def _span(self, event):
+        started = int(event['started'] * 1e9)
+        span = self.tracer.start_span('{} {}'.format(event['method'], event['endpoint']), start_time=started,
+                                      kind=trace.SpanKind.CLIENT)
+        span.set_attribute('http.request.method', event['method'])
+        span.set_attribute('url.full', event['url'].split('?', 1)[0])
+        span.set_attribute('smax.endpoint', event['endpoint'])
+        span.set_attribute('smax.retries', event['retries'])
+        if event['status'] is not None:
+            span.set_attribute('http.response.status_code', event['status'])
+        if event['error'] is not None:
+            span.record_exception(event['error'])
+        span.end(end_time=started + int(event['seconds'] * 1e9))
+
+    def observe_decode(self, url, seconds):
+        """
+        Record JSON decode time of response
+        :param url: Full url of call
+        :param seconds: Seconds decode took
+        """
+        with self._lock:
+            group = self._endpoint(endpoint_template(url), 'GET')
+            group['decodes'] += 1
+            group['decode_seconds'] += seconds
+
+    def count_cache(self, hit):
+        """
+        Record response cache lookup
+        :param hit: True when response was served from cache
+        """
+        with self._lock:
+            self.cache['hits' if hit else 'misses'] += 1
+
+    def count_auth_refresh(self):
+        """
+        Record login of session
+        """
+        with self._lock:
+            self.auth_refreshes += 1
+
+    def snapshot(self):
+        """
+        Get current metrics
+        :return: Dict with endpoints (list of dicts per endpoint and method), cache and auth_refreshes
+        """
+        with self._lock:
+            endpoints = []
+            for (endpoint, method), group in sorted(self.endpoints.items()):
+                item = {counter: group[counter] for counter in self.COUNTERS}
+                item.update(endpoint=endpoint, method=method, seconds=group['latency'].sum,
+                            latency_buckets=group['latency'].cumulative())
+                endpoints.append(item)
+            return {'endpoints': endpoints, 'cache': dict(self.cache), 'auth_refreshes': self.auth_refreshes}
+
+    @staticmethod
+    def _labels(**labels):
+        return ','.join('{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"'))
+                        for name, value in labels.items())
+
+    def prometheus_text(self):
+        """
+        Get metrics in Prometheus text exposition format, serve it on /metrics of any web framework
+        :return: Metrics text
+        """
+        lines = ['# TYPE smax_request_duration_seconds histogram']
+        with self._lock:
+            groups = sorted(self.endpoints.items())
+            for (endpoint, method), group in groups:
+                labels = self._labels(endpoint=endpoint, method=method)
+                for bound, count in group['latency'].cumulative():
+                    lines.append('smax_request_duration_seconds_bucket{{{},le="{}"}} {}'.format(
+                        labels, '+Inf' if bound == float('inf') else bound, count))
+                lines.append('smax_request_duration_seconds_sum{{{}}} {}'.format(labels, group['latency'].sum))
+                lines.append('smax_request_duration_seconds_count{{{}}} {}'.format(labels, group['latency'].count))
+            for name, counter in (('smax_request_bytes_total', 'bytes_out'),
+                                  ('smax_response_bytes_total', 'bytes_in'),
+                                  ('smax_retries_total', 'retries'),
+                                  ('smax_request_errors_total', 'errors'),
+                                  ('smax_first_byte_seconds_total', 'first_byte_seconds'),
+                                  ('smax_json_decode_seconds_total', 'decode_seconds'),
+                                  ('smax_json_decodes_total', 'decodes')):
+                lines.append('# TYPE {} counter'.format(name))
+                for (endpoint, method), group in groups:
+                    lines.append('{}{{{}}} {}'.format(name, self._labels(endpoint=endpoint, method=method),
+                                                      group[counter]))
+            lines.append('# TYPE smax_requests_total counter')
+            for (endpoint, method, status), count in sorted(self.statuses.items(), key=str):
+                lines.append('smax_requests_total{{{}}} {}'.format(
+                    self._labels(endpoint=endpoint, method=method, status=status or 'error'), count))
+            lines.append('# TYPE smax_cache_lookups_total counter')
+            for result, count in sorted(self.cache.items()):
+                lines.append('smax_cache_lookups_total{{{}}} {}'.format(self._labels(result=result), count))
+            lines.append('# TYPE smax_auth_refreshes_total counter')
+            lines.append('smax_auth_refreshes_total {}'.format(self.auth_refreshes))
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,190 @@
+import json
+import re
+import sqlite3
+import threading
+from smax.smax_sync import DeltaSync
+
+
+class Mirror(object):
+    def __init__(self, tenant, path, lag=60, batch_size=1000):
+        """
+        Local SQLite copy of chosen entity types, kept fresh by incremental syncs so reports
+        can be answered locally instead of paging through tenant
+        :param tenant: SmaxTenant (Run, Build, MasterData) to copy from
+        :param path: Path of SQLite database, sync watermarks are kept next to it in <path>.sync.json
+        :param lag: Seconds of lag of each sync, see DeltaSync, default is 60
+        :param batch_size: Number of records written in one transaction, default is 1000
+        """
+        self.tenant = tenant
+        self.path = path
+        self.batch_size = batch_size
+        self.sync_state = DeltaSync(tenant, '{}.sync.json'.format(path), lag=lag)
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute('CREATE TABLE IF NOT EXISTS _smax_mirror '
+                         '(entity_type TEXT PRIMARY KEY, layout TEXT, filters TEXT)')
+        self._db.commit()
+
+    @staticmethod
+    def _name(identifier):
+        assert re.match(r'^[A-Za-z_][A-Za-z0-9_]*$', identifier), \
+            'Entity types and fields must be plain identifiers, got {}'.format(identifier)
+        return '"{}"'.format(identifier)
+
+    def add_entity(self, entity_type, layout, indexes=None, filters=None):
+        """
+        Register entity type to mirror, table is created or extended with new layout fields,
+        new fields of records already mirrored are filled by next sync with full=True
+        :param entity_type: Entity type to mirror, e.g. Incident, Person
+        :param layout: FieldIDs to mirror, encased in quotes, comma separated, Id and LastUpdateTime are always added
+        :param indexes: Fields to index, default indexes every layout field
+        :param filters: Filters limiting mirrored records, default is None
+        """
+        fields = [field for field in layout.replace(' ', '').split(',') if field and field != 'Id']
+        if 'LastUpdateTime' not in fields:
+            fields.append('LastUpdateTime')
+        table = self._name(entity_type)
+        with self._lock:
+            self._db.execute('CREATE TABLE IF NOT EXISTS {} (Id TEXT PRIMARY KEY)'.format(table))
+            existing = {row['name'] for row in self._db.execute('PRAGMA table_info({})'.format(table))}
+            for field in fields:
+                if field not in existing:
+                    self._db.execute('ALTER TABLE {} ADD COLUMN {}'.format(table, self._name(field)))
+            for field in (fields if indexes is None else indexes):
+                self._db.execute('CREATE INDEX IF NOT EXISTS {} ON {} ({})'.format(
+                    self._name('ix_{}_{}'.format(entity_type, field)), table, self._name(field)))
+            self._db.execute('INSERT OR REPLACE INTO _smax_mirror VALUES (?, ?, ?)',
+                             (entity_type, ','.join(fields), str(filters) if filters else None))
+            self._db.commit()
+
+    def entities(self):
+        """
+        Get registered entity types
+        :return: List of mirrored entity types
+        """
+        with self._lock:
+            return [row['entity_type'] for row in self._db.execute('SELECT entity_type FROM _smax_mirror')]
+
+    def sync(self, entity_type=None, full=False, page_size=500):
+        """
+        Bring mirror up to date with records changed since last sync
+        :param entity_type: Entity type to sync, default syncs all registered types
+        :param full: Set to True to drop local rows and copy everything again, this is only way
+        to get rid of records deleted in SMAX, default is False
+        :param page_size: Number of records fetched per page, default is 500
+        :return: Dict of entity type to number of records written
+        """
+        written = {}
+        for mirrored_type in ([entity_type] if entity_type else self.entities()):
+            with self._lock:
+                row = self._db.execute('SELECT layout, filters FROM _smax_mirror WHERE entity_type = ?',
+                                       (mirrored_type,)).fetchone()
+            assert row is not None, 'Entity type {} is not mirrored, add it first'.format(mirrored_type)
+            fields = row['layout'].split(',')
+            if full:
+                self.sync_state.reset(mirrored_type)
+                with self._lock:
+                    self._db.execute('DELETE FROM {}'.format(self._name(mirrored_type)))
+                    self._db.commit()
+            statement = 'INSERT OR REPLACE INTO {} (Id, {}) VALUES ({})'.format(
+                self._name(mirrored_type), ', '.join(self._name(field) for field in fields),
+                ', '.join('?' * (len(fields) + 1)))
+            batch = []
+            written[mirrored_type] = 0
+            for entity in self.sync_state.changes(mirrored_type, row['layout'], row['filters'],
+                                                         page_size=page_size):
+                properties = entity['properties']
+                batch.append([str(properties['Id'])] + [self._value(properties.get(field)) for field in fields])
+                if len(batch) >= self.batch_size:
+                    written[mirrored_type] += self._write(statement, batch)
+                    batch = []
+            written[mirrored_type] += self._write(statement, batch)
+        return written
+
+    def compare(self, entity_type=None):
+        """
+        Count mirrored records against tenant, counts differ while records created or deleted in SMAX
+        since last sync are not mirrored, deleted ones stay until sync with full=True
+        :param entity_type: Entity type to count, default counts all registered types
+        :return: Dict of entity type to dict with mirror and tenant counts
+        """
+        counts = {}
+        for mirrored_type in ([entity_type] if entity_type else self.entities()):
+            with self._lock:
+                row = self._db.execute('SELECT filters FROM _smax_mirror WHERE entity_type = ?',
+                                       (mirrored_type,)).fetchone()
+                mirror_count = self._db.execute('SELECT COUNT(*) FROM {}'.format(self._name(mirrored_type))) \
+                    .fetchone()[0]
+            assert row is not None, 'Entity type {} is not mirrored, add it first'.format(mirrored_type)
+            page = self.tenant.get_entities_page(mirrored_type, 'Id', row['filters'], skip=0, size=1)
+            counts[mirrored_type] = {'mirror': mirror_count, 'tenant': page.get('meta', {}).get('total_count')}
+        return counts
+
+    @staticmethod
+    def _value(value):
+        if isinstance(value, (dict, list)):
+            return json.dumps(value)
+        return value
+
+    def _write(self, statement, batch):
+        if batch:
+            with self._lock:
+                self._db.executemany(statement, batch)
+                self._db.commit()
+        return len(batch)
+
+    def query(self, entity_type, where=None, params=(), columns=None, order_by=None, limit=None):
+        """
+        Query mirrored records
+        :param entity_type: Mirrored entity type
+        :param where: SQL condition, use ? placeholders for values, e.g. 'Status = ? AND Priority = ?'
+        :param params: Values of placeholders, default is ()
+        :param columns: List of fields to return, default returns all
+        :param order_by: SQL order, e.g. 'LastUpdateTime DESC', default is None
+        :param limit: Maximum number of records to return, default is None
+        :return: List of records as dicts
+        """
+        sql = 'SELECT {} FROM {}'.format(', '.join(self._name(column) for column in columns) if columns else '*',
+                                         self._name(entity_type))
+        if where:
+            sql += ' WHERE {}'.format(where)
+        if order_by:
+            sql += ' ORDER BY {}'.format(order_by)
+        if limit is not None:
+            sql += ' LIMIT {}'.format(int(limit))
+        return self.execute(sql, params)
+
+    def aggregate(self, entity_type, group_by, aggregates='COUNT(*) AS count', where=None, params=()):
+        """
+        Group mirrored records and aggregate them
+        :param entity_type: Mirrored entity type
+        :param group_by: List of fields to group by
+        :param aggregates: SQL aggregate expressions, default is 'COUNT(*) AS count'
+        :param where: SQL condition, use ? placeholders for values, default is None
+        :param params: Values of placeholders, default is ()
+        :return: List of groups as dicts
+        """
+        groups = ', '.join(self._name(field) for field in group_by)
+        sql = 'SELECT {}, {} FROM {}'.format(groups, aggregates, self._name(entity_type))
+        if where:
+            sql += ' WHERE {}'.format(where)
+        sql += ' GROUP BY {}'.format(groups)
+        return self.execute(sql, params)
+
+    def execute(self, sql, params=()):
+        """
+        Run any SQL against mirror
+        :param sql: SQL statement
+        :param params: Values of placeholders, default is ()
+        :return: List of result rows as dicts
+        """
+        with self._lock:
+            return [dict(row) for row in self._db.execute(sql, params)]
+
+    def close(self):
+        """
+        Close database
+        """
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,153 @@
+import json
+import os
+import time
+
+
+class OperationHistoryReader(object):
+    def __init__(self, admin, page_size=500, time_field='time', since=None, server_filter=True, state_path=None):
+        """
+        Incremental reader of Suite Admin operation history, pages through operationHistory and remembers
+        time and ID of last operation it handed out, so every read returns only operations added since.
+        Operations are filtered by time on server, and locally too in case server ignores filter or paging
+        :param admin: SmaxAdmin to read with
+        :param page_size: Number of operations fetched per call, default is 500
+        :param time_field: Field holding time of operation in ms, default is 'time'
+        :param since: Time in ms of oldest operation of first read, default is None meaning whole history
+        :param server_filter: Set to False to filter by time only locally, default is True
+        :param state_path: Path of JSON file checkpoint is kept in, so reading resumes after restart,
+        default is None
+        """
+        assert page_size >= 1, 'page_size must be at least 1'
+        self.admin = admin
+        self.page_size = page_size
+        self.time_field = time_field
+        self.server_filter = server_filter
+        self.state_path = state_path
+        self.last_time = since - 1 if since is not None else None
+        self.last_ids = []
+        self.last_id = None
+        if state_path and os.path.exists(state_path):
+            with open(state_path) as state_file:
+                state = json.load(state_file)
+            self.last_time, self.last_ids, self.last_id = state['last_time'], state['last_ids'], state['last_id']
+
+    @staticmethod
+    def _numeric_id(operation):
+        operation_id = str(operation.get('id', ''))
+        return int(operation_id) if operation_id.isdecimal() else None
+
+    @staticmethod
+    def _identity(operation):
+        operation_id = operation.get('id')
+        return str(operation_id) if operation_id is not None else json.dumps(operation, sort_keys=True, default=str)
+
+    def checkpoint(self):
+        """
+        Get current checkpoint
+        :return: Tuple of last time, IDs of operations at last time and last numeric ID
+        """
+        return self.last_time, frozenset(self.last_ids), self.last_id
+
+    def is_new(self, operation, checkpoint=None):
+        """
+        Check if operation was not handed out yet
+        :param operation: Operation of history
+        :param checkpoint: Checkpoint to compare with, default is current one
+        :return: True when operation is newer than checkpoint
+        """
+        last_time, last_ids, last_id = checkpoint or self.checkpoint()
+        operation_time = operation.get(self.time_field)
+        if operation_time is not None and last_time is not None:
+            return operation_time > last_time or \
+                (operation_time == last_time and str(operation.get('id')) not in last_ids)
+        operation_id = self._numeric_id(operation)
+        if operation_id is not None and last_id is not None:
+            return operation_id > last_id
+        return True
+
+    def _advance(self, operation):
+        operation_time = operation.get(self.time_field)
+        if operation_time is not None:
+            # ids seen at last time are kept, so operations of same millisecond are not handed out twice
+            if self.last_time is None or operation_time > self.last_time:
+                self.last_time, self.last_ids = operation_time, []
+            if operation_time == self.last_time:
+                self.last_ids.append(str(operation.get('id')))
+        operation_id = self._numeric_id(operation)
+        if operation_id is not None and (self.last_id is None or operation_id > self.last_id):
+            self.last_id = operation_id
+
+    def _page(self, skip, filters):
+        result = self.admin.get_operation_history(skip=skip, size=self.page_size, filters=filters)
+        if filters is not None and isinstance(result, dict) and 'entities' not in result:
+            # server refused filter, keep filtering locally only
+            self.server_filter = False
+            result = self.admin.get_operation_history(skip=skip, size=self.page_size)
+        if isinstance(result, list):
+            return result, None
+        return result.get('entities') or [], result.get('meta', {}).get('total_count')
+
+    def read(self):
+        """
+        Read operations added since last read, checkpoint moves as operations are handed out and
+        is saved to state_path once read finished, pages may come in any order so all of them are
+        compared with checkpoint of start of read, operations already seen on earlier pages of read
+        are skipped and read stops once page brings nothing not seen before
+        :return: Generator yielding operations sorted by time within each page
+        """
+        start = self.checkpoint()
+        # same filter for every page, otherwise skip of later pages would point into different result
+        filters = '{} >= {}'.format(self.time_field, start[0]) \
+            if self.server_filter and start[0] is not None else None
+        skip = 0
+        seen = set()
+        while True:
+            operations, total_count = self._page(skip, filters)
+            if filters is not None and not self.server_filter:
+                filters = None
+            skip += len(operations)
+            unseen = []
+            for operation in operations:
+                identity = self._identity(operation)
+                if identity not in seen:
+                    seen.add(identity)
+                    unseen.append(operation)
+            new = sorted((operation for operation in unseen if self.is_new(operation, start)),
+                         key=lambda operation: (operation.get(self.time_field) or 0,
+                                                self._numeric_id(operation) or 0))
+            for operation in new:
+                self._advance(operation)
+                yield operation
+            # page of only seen operations means server ignored skip and would send it forever, without
+            # total count, page longer than page_size means server ignored paging and returned everything at once
+            if not unseen or (total_count is not None and skip >= total_count) or \
+                    (total_count is None and len(operations) != self.page_size):
+                self.save()
+                return
+
+    def watch(self, interval=30, stop=None):
+        """
+        Tail operation history, reading new operations every interval seconds
+        :param interval: Seconds between reads, default is 30
+        :param stop: threading.Event ending watch once set, default is None meaning watch runs until
+        generator is closed
+        :return: Generator yielding new operations as they appear
+        """
+        while stop is None or not stop.is_set():
+            for operation in self.read():
+                yield operation
+            if stop is not None:
+                stop.wait(interval)
+            else:
+                time.sleep(interval)
+
+    def save(self):
+        """
+        Save checkpoint to state_path
+        """
+        if not self.state_path:
+            return
+        temporary_path = '{}.tmp'.format(self.state_path)
+        with open(temporary_path, 'w') as state_file:
+            json.dump({'last_time': self.last_time, 'last_ids': self.last_ids, 'last_id': self.last_id}, state_file)
+        os.replace(temporary_path, self.state_path)
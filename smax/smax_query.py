@@ -0,0 +1,296 @@
+import functools
+import re
+import threading
+import urllib.parse
+
+_IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)*$')
+
+
+def literal(value):
+    """
+    Render value the way EMS filter expects it
+    :param value: String, number, bool or list of them
+    :return: Filter literal, e.g. 'Open', 1560294000000, ('1','2')
+    """
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (int, float)):
+        return str(value)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return '({})'.format(','.join(literal(item) for item in value))
+    assert isinstance(value, str), 'Filter values must be strings, numbers or bools, got {}'.format(type(value))
+    return "'{}'".format(value.replace("'", "\\'"))
+
+
+@functools.lru_cache(maxsize=1024)
+def encode(text):
+    """
+    URL encode part of filter the way SMAX accepts it, results are memoized
+    :param text: Filter or its part
+    :return: Encoded text
+    """
+    return urllib.parse.quote_plus(text).replace('%28', '(').replace('%2C', ',').replace('%29', ')')
+
+
+class Condition(object):
+    PLACEHOLDER = '?'
+
+    def __init__(self, template, params=(), fields=(), operator=None):
+        """
+        Part of EMS filter kept as template with ? in place of values, so encoded template is reused
+        and only values are encoded when same condition shape is built again
+        :param template: Filter with ? placeholders, e.g. 'Status = ?'
+        :param params: Values of placeholders
+        :param fields: FieldIDs used by condition
+        :param operator: 'and' or 'or' when condition joins other conditions, default is None
+        """
+        self.template = template
+        self.params = tuple(params)
+        self.fields = tuple(fields)
+        self.operator = operator
+
+    def _join(self, other, operator):
+        assert isinstance(other, Condition), 'Conditions can only be joined with other conditions'
+        parts = []
+        for condition in (self, other):
+            template = condition.template
+            if condition.operator not in (None, operator):
+                template = '({})'.format(template)
+            parts.append(template)
+        return Condition(' {} '.format(operator).join(parts), self.params + other.params,
+                         self.fields + other.fields, operator)
+
+    def __and__(self, other):
+        return self._join(other, 'and')
+
+    def __or__(self, other):
+        return self._join(other, 'or')
+
+    def and_(self, *others):
+        return functools.reduce(lambda left, right: left._join(right, 'and'), others, self)
+
+    def or_(self, *others):
+        return functools.reduce(lambda left, right: left._join(right, 'or'), others, self)
+
+    def __str__(self):
+        parts = self.template.split(self.PLACEHOLDER)
+        return ''.join(part + (literal(param) if index < len(self.params) else '')
+                       for index, (part, param) in enumerate(zip(parts, self.params + (None,))))
+
+    def __repr__(self):
+        return 'Condition({})'.format(self)
+
+    def __bool__(self):
+        return bool(self.template)
+
+    def encode(self):
+        """
+        Get URL encoded filter, encoded template is memoized, only values are encoded on each call
+        :return: Encoded filter
+        """
+        parts = _encode_template(self.template)
+        return ''.join(part + (encode(literal(param)) if index < len(self.params) else '')
+                       for index, (part, param) in enumerate(zip(parts, self.params + (None,))))
+
+
+@functools.lru_cache(maxsize=1024)
+def _encode_template(template):
+    return tuple(encode(part) for part in template.split(Condition.PLACEHOLDER))
+
+
+class Field(object):
+    __hash__ = None
+
+    def __init__(self, name):
+        """
+        Field of EMS query used to build conditions, e.g. Field('Status') == 'Open'
+        :param name: FieldID, related fields are joined by dot, e.g. RegisteredForActualService.DisplayLabel
+        """
+        assert _IDENTIFIER.match(name), 'Invalid field name {}'.format(name)
+        self.name = name
+
+    def _compare(self, operator, value):
+        return Condition('{} {} {}'.format(self.name, operator, Condition.PLACEHOLDER), (value,), (self.name,))
+
+    def __eq__(self, value):
+        return self._compare('=', value)
+
+    def __ne__(self, value):
+        return self._compare('!=', value)
+
+    def __lt__(self, value):
+        return self._compare('<', value)
+
+    def __le__(self, value):
+        return self._compare('<=', value)
+
+    def __gt__(self, value):
+        return self._compare('>', value)
+
+    def __ge__(self, value):
+        return self._compare('>=', value)
+
+    def btw(self, lower, upper):
+        """
+        Values between lower and upper, both included
+        :param lower: Lowest value, e.g. epoch milliseconds
+        :param upper: Highest value
+        :return: Condition
+        """
+        return Condition('{} btw ({},{})'.format(self.name, Condition.PLACEHOLDER, Condition.PLACEHOLDER),
+                         (lower, upper), (self.name,))
+
+    def in_(self, values):
+        """
+        Values in list
+        :param values: List of values
+        :return: Condition
+        """
+        values = tuple(values)
+        assert values, 'in_ needs at least one value'
+        return self._compare('in', values)
+
+
+class Q(object):
+    _fields_lock = threading.Lock()
+    _known_fields = {}
+
+    def __init__(self, entity_type, fields=(), condition=None, sort=None, start=None, limit=None):
+        """
+        Typed EMS query, every builder method returns new query so queries can be shared and extended,
+        e.g. Q('Incident').layout('Id', 'Status').where(Q.field('Status') == 'Open').order('Id asc')
+        :param entity_type: Entity type to query
+        :param fields: FieldIDs of layout
+        :param condition: Condition of filter, default is None
+        :param sort: Order of results, e.g. 'Id asc', default is None
+        :param start: Number of records to skip, default is None
+        :param limit: Number of records to return, default is None
+        """
+        assert _IDENTIFIER.match(entity_type), 'Invalid entity type {}'.format(entity_type)
+        self.entity_type = entity_type
+        self.fields = tuple(fields)
+        self.condition = condition
+        self.sort = sort
+        self.start = start
+        self.limit = limit
+
+    field = staticmethod(Field)
+
+    def _copy(self, **changes):
+        values = dict(fields=self.fields, condition=self.condition, sort=self.sort, start=self.start,
+                      limit=self.limit)
+        values.update(changes)
+        return Q(self.entity_type, **values)
+
+    def layout(self, *fields):
+        """
+        Set FieldIDs to return
+        :param fields: FieldIDs, or single comma separated string
+        :return: New query
+        """
+        if len(fields) == 1 and ',' in fields[0]:
+            fields = fields[0].replace(' ', '').split(',')
+        for field in fields:
+            assert _IDENTIFIER.match(field), 'Invalid field name {}'.format(field)
+        return self._copy(fields=tuple(fields))
+
+    def where(self, *conditions):
+        """
+        Add conditions, joined with existing ones by and
+        :param conditions: Conditions built from Q.field
+        :return: New query
+        """
+        condition = self.condition
+        for other in conditions:
+            condition = other if condition is None else condition & other
+        return self._copy(condition=condition)
+
+    def order(self, sort):
+        """
+        Set order of results
+        :param sort: Order, e.g. 'EmsCreationTime desc'
+        :return: New query
+        """
+        return self._copy(sort=sort)
+
+    def skip(self, start):
+        return self._copy(start=start)
+
+    def size(self, limit):
+        return self._copy(limit=limit)
+
+    @property
+    def layout_string(self):
+        return ','.join(self.fields)
+
+    @property
+    def filter(self):
+        """
+        Get filter as string
+        :return: Filter, None when query has no conditions
+        """
+        return str(self.condition) if self.condition else None
+
+    def referenced_fields(self):
+        """
+        Get all fields query uses in layout, filter and order
+        :return: Set of FieldIDs
+        """
+        fields = set(self.fields) | set(self.condition.fields if self.condition else ())
+        if self.sort:
+            fields |= {part.split()[0] for part in self.sort.split(',') if part.strip()}
+        return fields
+
+    def url(self, tenant):
+        """
+        Build url of query for tenant
+        :param tenant: SmaxTenant (Run, Build, MasterData)
+        :return: Full url of query
+        """
+        return tenant.build_query_url(self.entity_type, self.layout_string, self.condition, order=self.sort,
+                                      skip=self.start, size=self.limit)
+
+    def validate(self, tenant):
+        """
+        Check fields of query against entity metadata of tenant, metadata is fetched once per entity type
+        and tenant, related fields are checked by their first part only
+        :param tenant: SmaxTenant (Run, Build, MasterData)
+        :return: Query itself
+        """
+        assert self.fields, 'Query of {} has no layout'.format(self.entity_type)
+        key = (tenant.base_url, tenant.tenant_id, self.entity_type)
+        with self._fields_lock:
+            known = self._known_fields.get(key)
+        if known is None:
+            metadata = tenant.get_json('{}/rest/{}/metadata/ui/entity-descriptors/{}'
+                                       .format(tenant.base_url, tenant.tenant_id, self.entity_type), cached=True)
+            known = frozenset(item['name'] for section in ('properties', 'relations')
+                              for item in (metadata.get(section) or []) if isinstance(item, dict) and 'name' in item)
+            with self._fields_lock:
+                self._known_fields[key] = known
+        unknown = sorted(field for field in self.referenced_fields() if known and field.split('.')[0] not in known)
+        assert not unknown, 'Unknown fields of {}: {}'.format(self.entity_type, ', '.join(unknown))
+        return self
+
+    def split(self, field, lower, upper, parts):
+        """
+        Split query into queries covering consecutive ranges of integer field, e.g. EmsCreationTime,
+        so they can be fetched in parallel
+        :param field: Integer FieldID to split on
+        :param lower: Lowest value, included
+        :param upper: Highest value, included
+        :param parts: Number of queries
+        :return: List of queries
+        """
+        assert parts > 0 and upper >= lower, 'Invalid split range'
+        step = max(1, (upper - lower + 1) // parts)
+        queries, start = [], lower
+        while start <= upper:
+            end = upper if len(queries) == parts - 1 else min(upper, start + step - 1)
+            queries.append(self.where(Field(field).btw(start, end)))
+            start = end + 1
+        return queries
+
+    def __repr__(self):
+        return 'Q({}, layout={}, filter={}, order={}, skip={}, size={})'.format(
+            self.entity_type, self.layout_string, self.filter, self.sort, self.start, self.limit)
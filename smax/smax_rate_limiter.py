@@ -0,0 +1,199 @@
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+
+class TokenBucket(object):
+    def __init__(self, rate, burst=None):
+        """
+        Token bucket allowing rate requests per second on average with bursts of up to burst requests
+        :param rate: Requests per second, None for no limit
+        :param burst: Maximum number of requests sent at once after idle period, default is rate
+        """
+        self.rate = rate
+        self.burst = burst or max(1, rate or 1)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Take one token, blocks until one is available
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    delay = self.paused_until - now
+                elif self.rate is None:
+                    return
+                else:
+                    self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+
+    def pause(self, seconds):
+        """
+        Stop handing out tokens, e.g. for Retry-After of throttled response
+        :param seconds: Seconds to pause for
+        """
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.updated = self.paused_until
+            self.tokens = 0.0
+
+
+class ConcurrencyController(object):
+    def __init__(self, initial=4, minimum=1, maximum=32, backoff=0.5, latency_factor=2.0):
+        """
+        AIMD limit of requests in flight, limit grows by one per limit healthy responses and is cut by
+        backoff when SMAX throttles or latency rises over latency_factor times lowest latency seen
+        :param initial: Starting limit, default is 4
+        :param minimum: Lowest limit, default is 1
+        :param maximum: Highest limit, default is 32
+        :param backoff: Factor limit is multiplied by on throttling, default is 0.5
+        :param latency_factor: Latency over baseline counted as congestion, None ignores latency, default is 2.0
+        """
+        assert 1 <= minimum <= initial <= maximum, 'Limits must satisfy 1 <= minimum <= initial <= maximum'
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.backoff = backoff
+        self.latency_factor = latency_factor
+        self.baseline = None
+        self.latency = None
+        self.in_flight = 0
+        self.decreases = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        """
+        Wait for free slot
+        """
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self, latency, throttled):
+        """
+        Free slot and adjust limit
+        :param latency: Seconds request took, None when it failed without response
+        :param throttled: True when SMAX answered with 429 or 503
+        """
+        with self._condition:
+            self.in_flight -= 1
+            congested = throttled
+            if latency is not None and not throttled:
+                # short average is compared to baseline, which follows lowest average and drifts up slowly
+                # so it adapts to slower tenants, single slow responses do not count as congestion
+                self.latency = latency if self.latency is None else self.latency + (latency - self.latency) * 0.2
+                self.baseline = self.latency if self.baseline is None else \
+                    min(self.latency, self.baseline + (self.latency - self.baseline) * 0.01)
+                congested = self.latency_factor is not None and self.latency > self.latency_factor * self.baseline
+            now = time.monotonic()
+            if congested:
+                # cut once per round trip, responses of requests sent before cut do not cut again
+                if now - self._last_decrease > (latency or self.baseline or 0):
+                    self.limit = max(self.minimum, self.limit * self.backoff)
+                    self._last_decrease = now
+                    self.decreases += 1
+            elif latency is not None:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+
+class RateLimiter(object):
+    BUDGETS = ('read', 'write', 'admin')
+    THROTTLE_STATUSES = (429, 503)
+
+    def __init__(self, read_rate=20, write_rate=5, admin_rate=5, burst=None, initial_concurrency=4,
+                 max_concurrency=32, latency_factor=2.0, default_retry_after=1.0, max_retry_after=60):
+        """
+        Client side limit of calls sent to SMAX, pass it to SmaxTransport to apply it to every SmaxTenant
+        and SmaxAdmin sharing transport. Calls are split into read, write (/ems/bulk and other non GET calls)
+        and admin (/bo/rest) budgets, each with own token bucket and AIMD concurrency controller.
+        Throttled responses pause their budget for Retry-After seconds
+        :param read_rate: Read requests per second, None for no limit, default is 20
+        :param write_rate: Write requests per second, None for no limit, default is 5
+        :param admin_rate: Admin requests per second, None for no limit, default is 5
+        :param burst: Dict of budget to burst size, default is rate of budget
+        :param initial_concurrency: Starting number of requests in flight per budget, default is 4
+        :param max_concurrency: Highest number of requests in flight per budget, default is 32
+        :param latency_factor: Latency over baseline counted as congestion, see ConcurrencyController, default is 2.0
+        :param default_retry_after: Seconds budget is paused when throttled response has no Retry-After,
+        default is 1.0
+        :param max_retry_after: Longest pause in seconds, default is 60
+        """
+        rates = {'read': read_rate, 'write': write_rate, 'admin': admin_rate}
+        burst = burst or {}
+        self.buckets = {budget: TokenBucket(rates[budget], burst.get(budget)) for budget in self.BUDGETS}
+        self.controllers = {budget: ConcurrencyController(initial_concurrency, maximum=max_concurrency,
+                                                          latency_factor=latency_factor)
+                            for budget in self.BUDGETS}
+        self.default_retry_after = default_retry_after
+        self.max_retry_after = max_retry_after
+        self.throttled = 0
+
+    @staticmethod
+    def budget(method, url):
+        """
+        Get budget of call
+        :param method: HTTP method
+        :param url: Full url of call
+        :return: read, write or admin
+        """
+        if '/bo/rest' in url:
+            return 'admin'
+        if '/ems/bulk' in url or method.upper() != 'GET':
+            return 'write'
+        return 'read'
+
+    def acquire(self, method, url):
+        """
+        Wait until call may be sent
+        :param method: HTTP method
+        :param url: Full url of call
+        :return: Budget of call, pass it to release
+        """
+        budget = self.budget(method, url)
+        self.buckets[budget].acquire()
+        self.controllers[budget].acquire()
+        return budget
+
+    def release(self, budget, response, latency):
+        """
+        Report finished call
+        :param budget: Budget returned by acquire
+        :param response: Response, None when call failed
+        :param latency: Seconds call took
+        """
+        throttled = response is not None and response.status_code in self.THROTTLE_STATUSES
+        if throttled:
+            self.throttled += 1
+            self.buckets[budget].pause(self.retry_after(response))
+        self.controllers[budget].release(latency if response is not None else None, throttled)
+
+    def retry_after(self, response):
+        """
+        Get seconds to wait from Retry-After header, which holds seconds or HTTP date
+        :param response: Throttled response
+        :return: Seconds to wait
+        """
+        value = response.headers.get('Retry-After')
+        seconds = self.default_retry_after
+        if value:
+            try:
+                seconds = float(value)
+            except ValueError:
+                try:
+                    seconds = parsedate_to_datetime(value).timestamp() - time.time()
+                except (TypeError, ValueError):
+                    pass
+        return min(self.max_retry_after, max(0.0, seconds))
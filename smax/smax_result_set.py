@@ -0,0 +1,240 @@
+import sys
+from array import array
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class ResultRow(object):
+    __slots__ = ('_result_set', '_index')
+
+    def __init__(self, result_set, index):
+        """
+        Read only view of one record of ResultSet, values are looked up in columns on access
+        :param result_set: ResultSet holding record
+        :param index: Position of record in ResultSet
+        """
+        self._result_set = result_set
+        self._index = index
+
+    def __getitem__(self, field):
+        return self._result_set.value(field, self._index)
+
+    def __contains__(self, field):
+        return field in self._result_set.fields
+
+    def __iter__(self):
+        return iter(self._result_set.fields)
+
+    def __len__(self):
+        return len(self._result_set.fields)
+
+    def __repr__(self):
+        return 'ResultRow({})'.format(self.to_dict())
+
+    def get(self, field, default=None):
+        """
+        Get value of field
+        :param field: FieldID
+        :param default: Value returned when field is not part of layout or empty, default is None
+        :return: Value of field
+        """
+        if field not in self._result_set.fields:
+            return default
+        value = self._result_set.value(field, self._index)
+        return default if value is None else value
+
+    def keys(self):
+        return list(self._result_set.fields)
+
+    def to_dict(self):
+        """
+        Get record as properties dict, same as properties of entity returned by EMS query
+        :return: Dict of field to value
+        """
+        return {field: self._result_set.value(field, self._index) for field in self._result_set.fields}
+
+
+class _Column(object):
+    __slots__ = ('values', 'missing', 'numeric_strings')
+
+    def __init__(self):
+        # starts as int64 array, falls back to list of interned values on first value that is not integer
+        self.values = array('q')
+        self.missing = None
+        self.numeric_strings = None
+
+    def append(self, value):
+        if type(self.values) is array:
+            if value is None:
+                if self.missing is None:
+                    self.missing = bytearray(len(self.values))
+                self.values.append(0)
+                self.missing.append(1)
+                return
+            numeric_string = type(value) is str
+            if (type(value) is int or (numeric_string and value.isdecimal() and value == str(int(value)))) and \
+                    self.numeric_strings in (None, numeric_string) and -2 ** 63 <= int(value) < 2 ** 63:
+                self.numeric_strings = numeric_string
+                self.values.append(int(value))
+                if self.missing is not None:
+                    self.missing.append(0)
+                return
+            self.values = [self.get(index) for index in range(len(self.values))]
+            self.missing = None
+        self.values.append(sys.intern(value) if type(value) is str else value)
+
+    def get(self, index):
+        if type(self.values) is not array:
+            return self.values[index]
+        if self.missing is not None and self.missing[index]:
+            return None
+        return str(self.values[index]) if self.numeric_strings else self.values[index]
+
+    def is_typed(self):
+        # column that held only empty values so far has no type yet
+        return type(self.values) is array and self.numeric_strings is not None
+
+    def nbytes(self):
+        if type(self.values) is array:
+            return self.values.itemsize * len(self.values) + len(self.missing or b'')
+        return sys.getsizeof(self.values)
+
+
+class ResultSet(object):
+    def __init__(self, fields, entities=None, meta=None):
+        """
+        Compact, column-wise result of EMS query, every layout field is kept in one column instead of
+        repeating keys in dict per record. Integer fields (Id, EmsCreationTime, LastUpdateTime and
+        other timestamps) are stored in int64 arrays, other values in lists with interned strings.
+        Ids SMAX sends as numeric strings are stored as integers and given back as strings
+        :param fields: List of FieldIDs or layout string, comma separated
+        :param entities: Entities returned by EMS query to load, default is None
+        :param meta: Meta of EMS query result, default is None
+        """
+        if isinstance(fields, str):
+            fields = fields.replace(' ', '').split(',')
+        self.fields = tuple(sys.intern(field) for field in fields if field)
+        self.meta = meta
+        self._columns = {field: _Column() for field in self.fields}
+        self._length = 0
+        if entities is not None:
+            self.extend(entities)
+
+    @classmethod
+    def from_query(cls, result, fields):
+        """
+        Build ResultSet of single page returned by EMS query
+        :param result: JSON result of EMS query
+        :param fields: List of FieldIDs or layout string, comma separated
+        :return: ResultSet
+        """
+        return cls(fields, result.get('entities') or [], meta=result.get('meta'))
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        for index in range(self._length):
+            yield ResultRow(self, index)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError('ResultSet index out of range')
+        return ResultRow(self, index)
+
+    def __repr__(self):
+        return 'ResultSet({} records, fields={})'.format(self._length, ','.join(self.fields))
+
+    def append(self, entity):
+        """
+        Add entity returned by EMS query, fields not in layout are dropped
+        :param entity: Entity dict or its properties dict
+        """
+        properties = entity.get('properties', entity)
+        for field in self.fields:
+            self._columns[field].append(properties.get(field))
+        self._length += 1
+
+    def extend(self, entities):
+        """
+        Add entities one by one, generator returned by paginated query is consumed without buffering
+        :param entities: Iterable of entities
+        """
+        for entity in entities:
+            self.append(entity)
+
+    def value(self, field, index):
+        """
+        Get value of one field of one record
+        :param field: FieldID
+        :param index: Position of record
+        :return: Value of field
+        """
+        return self._columns[field].get(index)
+
+    def column(self, field):
+        """
+        Get all values of field
+        :param field: FieldID
+        :return: List of values
+        """
+        column = self._columns[field]
+        return [column.get(index) for index in range(self._length)]
+
+    def nbytes(self):
+        """
+        Get approximate memory used by columns, without shared interned strings
+        :return: Size in bytes
+        """
+        return sum(column.nbytes() for column in self._columns.values())
+
+    def to_dicts(self):
+        """
+        Get records as list of properties dicts
+        :return: List of dicts
+        """
+        return [row.to_dict() for row in self]
+
+    def to_numpy(self, field):
+        """
+        Get column as NumPy array, integer columns are copied in one step so ResultSet can still grow
+        afterwards, empty values of integer columns become NaN in float64 array, numeric string Ids
+        are given as integers
+        :param field: FieldID
+        :return: numpy.ndarray
+        """
+        assert numpy is not None, 'numpy is required, install it with pip install numpy'
+        column = self._columns[field]
+        if not column.is_typed():
+            return numpy.array([column.get(index) for index in range(self._length)], dtype=object)
+        # copy instead of frombuffer view, array exporting its buffer can not be resized by append
+        values = numpy.array(column.values, dtype=numpy.int64)
+        if column.missing is None or not any(column.missing):
+            return values
+        values = values.astype(numpy.float64)
+        values[numpy.frombuffer(bytes(column.missing), dtype=numpy.bool_)] = numpy.nan
+        return values
+
+    def to_pandas(self):
+        """
+        Get records as pandas DataFrame, integer columns with empty values use nullable Int64 type
+        :return: pandas.DataFrame
+        """
+        try:
+            import pandas
+        except ImportError:
+            raise AssertionError('pandas is required, install it with pip install pandas')
+        data = {}
+        for field in self.fields:
+            column = self._columns[field]
+            if column.is_typed() and column.missing is not None and any(column.missing):
+                data[field] = pandas.arrays.IntegerArray(
+                    numpy.array(column.values, dtype=numpy.int64),
+                    numpy.frombuffer(bytes(column.missing), dtype=numpy.bool_).copy())
+            else:
+                data[field] = self.to_numpy(field)
+        return pandas.DataFrame(data, columns=list(self.fields), copy=False)
@@ -0,0 +1,61 @@
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Rollout(object):
+    def __init__(self, progress_path=None, max_in_flight=4):
+        """
+        Runs batches of changes concurrently and remembers items that completed, so interrupted
+        rollout started again with same progress_path skips them. Progress is JSON lines file with keys
+        of completed items, appended after every batch and removed once every item completed
+        :param progress_path: Path of progress file, default is None meaning no progress is kept
+        :param max_in_flight: Maximum number of batches sent at once, default is 4
+        """
+        assert max_in_flight >= 1, 'max_in_flight must be at least 1'
+        self.progress_path = progress_path
+        self.max_in_flight = max_in_flight
+        self.completed = set()
+        self._lock = threading.Lock()
+        if progress_path and os.path.exists(progress_path):
+            with open(progress_path) as progress_file:
+                for line in progress_file:
+                    try:
+                        self.completed.update(json.loads(line))
+                    except ValueError:
+                        # line cut short by interrupted write, its batch is sent again
+                        pass
+
+    def run(self, batches):
+        """
+        Send batches and collect result of every item
+        :param batches: List of (keys, function) pairs, function sends batch and returns dict of key
+        to result dict with completion_status, keys missing from it are reported as FAILED
+        :return: List of (key, result) pairs in order of batches, items completed by previous run
+        are not part of batches and are not reported
+        """
+        def send(batch):
+            keys, function = batch
+            try:
+                found = function()
+                results = [(key, found.get(key) or {'completion_status': 'FAILED', 'error': 'No result'})
+                           for key in keys]
+            except Exception as error:
+                results = [(key, {'completion_status': 'FAILED', 'error': str(error)}) for key in keys]
+            self._save([key for key, result in results if result.get('completion_status') == 'OK'])
+            return results
+
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            results = [result for batch_results in executor.map(send, batches) for result in batch_results]
+        if self.progress_path and os.path.exists(self.progress_path) and \
+                all(result.get('completion_status') == 'OK' for _, result in results):
+            os.remove(self.progress_path)
+        return results
+
+    def _save(self, keys):
+        with self._lock:
+            self.completed.update(keys)
+            if self.progress_path and keys:
+                with open(self.progress_path, 'a') as progress_file:
+                    progress_file.write(json.dumps(keys) + '\n')
@@ -1,33 +1,22 @@
-import json
-import urllib.parse
-import requests
+from smax.smax_json import dumps, loads
 from smax.smax_auth_wrapper import SmaxTenant
 
 
 class Run(SmaxTenant):
-    def __init__(self, base_url, user_name, password, tenant_id):
-        super().__init__(base_url, user_name, password, tenant_id)
+    ENTITY_TYPES = ('Incident', 'Problem', 'License', 'LicenseType', 'Request', 'AssetModel', 'FixedAsset')
 
-    def get_incidents(self, query_params, filters=None):
+    def __init__(self, base_url, user_name, password, tenant_id, **kwargs):
+        super().__init__(base_url, user_name, password, tenant_id, **kwargs)
+
+    def get_incidents(self, query_params, filters=None, **kwargs):
         """
         Get incidents based on params passed
         :param query_params: FieldIDs you want to query, encased in quotes, comma separated
         :param filters: Filters you'd like to apply, comma separated and encased in quotes, default is None
+        :param kwargs: Paging options, e.g. paginate=True, page_size=1000, see SmaxTenant.get_entities
         :return: Returns JSON result of incident query
         """
-        assert type(query_params) == str, 'Query params must be in string form'
-        query_params = str(query_params).replace(' ', '')
-        if filters:
-            assert type(filters) == str, 'Filter params must be in string form'
-            filters = SmaxTenant.fix_url_encode(urllib.parse.quote_plus(filters))
-            query_endpoint = requests.get('{}/rest/{}/ems/Incident?layout={}&filter={}'
-                                          .format(self.base_url, self.tenant_id, query_params, filters),
-                                          cookies=self.get_cookie()).json()
-            return query_endpoint
-        query_endpoint = requests.get('{}/rest/{}/ems/Incident?layout={}'
-                                      .format(self.base_url, self.tenant_id, query_params),
-                                      cookies=self.get_cookie()).json()
-        return query_endpoint
+        return self.get_entities('Incident', query_params, filters, **kwargs)
 
     def get_incident_by_id(self, incident_id):
         """
@@ -35,19 +24,27 @@ class Run(SmaxTenant):
         :param incident_id: ID of incident to query
         :return: Returns JSON result of incident query
         """
-        query_endpoint = requests.get('{}/rest/{}/entity-page/initializationData/Incident/{}'
-                                      .format(self.base_url, self.tenant_id, incident_id),
-                                      cookies=self.get_cookie()).json()
+        query_endpoint = self.get_json('{}/rest/{}/entity-page/initializationData/Incident/{}'
+                                       .format(self.base_url, self.tenant_id, incident_id))
         return query_endpoint
 
+    def get_incidents_by_ids(self, ids, query_params, **kwargs):
+        """
+        Get many incidents by ID in few queries
+        :param ids: Iterable of incident IDs
+        :param query_params: FieldIDs you want to query, encased in quotes, comma separated
+        :param kwargs: Batching options, e.g. chunk_size=200, see SmaxTenant.get_many
+        :return: Dict of incident ID to incident, IDs that were not found map to None
+        """
+        return self.get_many('Incident', ids, query_params, **kwargs)
+
     def get_incident_templates(self):
         """
         Returns the list of all incident templates
         :return: JSON of all incident templates
         """
-        query_endpoint = requests.get('{}/rest/{}/rms/EntityTemplate?filter=(EntityType+%3D+%27Incident%27)'
-                                      .format(self.base_url, self.tenant_id),
-                                      cookies=self.get_cookie()).json()
+        query_endpoint = self.get_json('{}/rest/{}/rms/EntityTemplate?filter=(EntityType+%3D+%27Incident%27)'
+                                       .format(self.base_url, self.tenant_id), cached=True)
         return query_endpoint
 
     def get_incident_model_by_id(self, incident_model_id):
@@ -56,52 +53,29 @@ class Run(SmaxTenant):
         :param incident_model_id: ID of incident model to query
         :return: Returns JSON result of incident model query
         """
-        query_endpoint = requests.get('{}/rest/{}/entity-page/initializationData/EntityModel/{}'
-                                      .format(self.base_url, self.tenant_id, incident_model_id),
-                                      cookies=self.get_cookie()).json()
+        query_endpoint = self.get_json('{}/rest/{}/entity-page/initializationData/EntityModel/{}'
+                                       .format(self.base_url, self.tenant_id, incident_model_id))
         return query_endpoint
 
-    def get_incident_models(self, query_params, filters=None):
+    def get_incident_models(self, query_params, filters=None, **kwargs):
         """
         Get incident models based on params passed
         :param query_params: FieldIDs you want to query, encased in quotes, comma separated
         :param filters: Filters you'd like to apply, comma separated and encased in quotes, default is None
+        :param kwargs: Paging options, e.g. paginate=True, page_size=1000, see SmaxTenant.get_entities
         :return: Returns JSON result of incident models query
         """
-        assert type(query_params) == str, 'Query params must be in string form'
-        query_params = str(query_params).replace(' ', '')
-        if filters:
-            assert type(filters) == str, 'Filter params must be in string form'
-            filters = SmaxTenant.fix_url_encode(urllib.parse.quote_plus(filters))
-            query_endpoint = requests.get('{}/rest/{}/ems/EntityModel?layout={}&filter={}'
-                                          .format(self.base_url, self.tenant_id, query_params, filters),
-                                          cookies=self.get_cookie()).json()
-            return query_endpoint
-        query_endpoint = requests.get('{}/rest/{}/ems/EntityModel?layout={}'
-                                      .format(self.base_url, self.tenant_id, query_params),
-                                      cookies=self.get_cookie()).json()
-        return query_endpoint
+        return self.get_entities('EntityModel', query_params, filters, **kwargs)
 
-    def get_problems(self, query_params, filters=None):
+    def get_problems(self, query_params, filters=None, **kwargs):
         """
         Get problems based on params passed
         :param query_params: FieldIDs you want to query, encased in quotes, comma separated
         :param filters: Filters you'd like to apply, comma separated and encased in quotes, default is None
+        :param kwargs: Paging options, e.g. paginate=True, page_size=1000, see SmaxTenant.get_entities
         :return: Returns JSON result of problem query
         """
-        assert type(query_params) == str, 'Query params must be in string form'
-        query_params = str(query_params).replace(' ', '')
-        if filters:
-            assert type(filters) == str, 'Filter params must be in string form'
-            filters = SmaxTenant.fix_url_encode(urllib.parse.quote_plus(filters))
-            query_endpoint = requests.get('{}/rest/{}/ems/Problem?layout={}&filter={}'
-                                          .format(self.base_url, self.tenant_id, query_params, filters),
-                                          cookies=self.get_cookie()).json()
-            return query_endpoint
-        query_endpoint = requests.get('{}/rest/{}/ems/Problem?layout={}'
-                                      .format(self.base_url, self.tenant_id, query_params),
-                                      cookies=self.get_cookie()).json()
-        return query_endpoint
+        return self.get_entities('Problem', query_params, filters, **kwargs)
 
     def get_problem_by_id(self, problem_id):
         """
@@ -109,31 +83,29 @@ class Run(SmaxTenant):
         :param problem_id: ID of problem to query
         :return: Returns JSON result of problem query
         """
-        query_endpoint = requests.get('{}/rest/{}/entity-page/initializationData/Problem/{}'
-                                      .format(self.base_url, self.tenant_id, problem_id),
-                                      cookies=self.get_cookie()).json()
+        query_endpoint = self.get_json('{}/rest/{}/entity-page/initializationData/Problem/{}'
+                                       .format(self.base_url, self.tenant_id, problem_id))
         return query_endpoint
 
-    def get_service_requests(self, query_params, filters=None):
+    def get_problems_by_ids(self, ids, query_params, **kwargs):
+        """
+        Get many problems by ID in few queries
+        :param ids: Iterable of problem IDs
+        :param query_params: FieldIDs you want to query, encased in quotes, comma separated
+        :param kwargs: Batching options, e.g. chunk_size=200, see SmaxTenant.get_many
+        :return: Dict of problem ID to problem, IDs that were not found map to None
+        """
+        return self.get_many('Problem', ids, query_params, **kwargs)
+
+    def get_service_requests(self, query_params, filters=None, **kwargs):
         """
         Get service requests based on params passed
         :param query_params: FieldIDs you want to query, encased in quotes, comma separated
         :param filters: Filters you'd like to apply, comma separated and encased in quotes, default is None
+        :param kwargs: Paging options, e.g. paginate=True, page_size=1000, see SmaxTenant.get_entities
         :return: Returns JSON result of service request query
         """
-        assert type(query_params) == str, 'Query params must be in string form'
-        query_params = str(query_params).replace(' ', '')
-        if filters:
-            assert type(filters) == str, 'Filter params must be in string form'
-            filters = SmaxTenant.fix_url_encode(urllib.parse.quote_plus(filters))
-            query_endpoint = requests.get('{}/rest/{}/ems/Request?layout={}&filter={}'
-                                          .format(self.base_url, self.tenant_id, query_params, filters),
-                                          cookies=self.get_cookie()).json()
-            return query_endpoint
-        query_endpoint = requests.get('{}/rest/{}/ems/Request?layout={}'
-                                      .format(self.base_url, self.tenant_id, query_params),
-                                      cookies=self.get_cookie()).json()
-        return query_endpoint
+        return self.get_entities('Request', query_params, filters, **kwargs)
 
     def get_service_request_by_id(self, request_id):
         """
@@ -141,31 +113,29 @@ class Run(SmaxTenant):
         :param request_id: ID of service request to query
         :return: Returns JSON result of service request query
         """
-        query_endpoint = requests.get('{}/rest/{}/entity-page/initializationData/Request/{}'
-                                      .format(self.base_url, self.tenant_id, request_id),
-                                      cookies=self.get_cookie()).json()
+        query_endpoint = self.get_json('{}/rest/{}/entity-page/initializationData/Request/{}'
+                                       .format(self.base_url, self.tenant_id, request_id))
         return query_endpoint
 
-    def get_licenses(self, query_params, filters=None):
+    def get_service_requests_by_ids(self, ids, query_params, **kwargs):
+        """
+        Get many service requests by ID in few queries
+        :param ids: Iterable of service request IDs
+        :param query_params: FieldIDs you want to query, encased in quotes, comma separated
+        :param kwargs: Batching options, e.g. chunk_size=200, see SmaxTenant.get_many
+        :return: Dict of service request ID to service request, IDs that were not found map to None
+        """
+        return self.get_many('Request', ids, query_params, **kwargs)
+
+    def get_licenses(self, query_params, filters=None, **kwargs):
         """
         Get licences based on params passed
         :param query_params: FieldIDs you want to query, encased in quotes, comma separated
         :param filters: Filters you'd like to apply, comma separated and encased in quotes, default is None
+        :param kwargs: Paging options, e.g. paginate=True, page_size=1000, see SmaxTenant.get_entities
         :return: Returns JSON result of software asset licences query
         """
-        assert type(query_params) == str, 'Query params must be in string form'
-        query_params = str(query_params).replace(' ', '')
-        if filters:
-            assert type(filters) == str, 'Filter params must be in string form'
-            filters = SmaxTenant.fix_url_encode(urllib.parse.quote_plus(filters))
-            query_endpoint = requests.get('{}/rest/{}/ems/License?layout={}&filter={}'
-                                          .format(self.base_url, self.tenant_id, query_params, filters),
-                                          cookies=self.get_cookie()).json()
-            return query_endpoint
-        query_endpoint = requests.get('{}/rest/{}/ems/License?layout={}'
-                                      .format(self.base_url, self.tenant_id, query_params),
-                                      cookies=self.get_cookie()).json()
-        return query_endpoint
+        return self.get_entities('License', query_params, filters, **kwargs)
 
     def get_license_by_id(self, licence_id):
         """
@@ -173,9 +143,8 @@ class Run(SmaxTenant):
         :param licence_id: Licence ID
         :return: Returns JSON result of software assets licence query
         """
-        query_endpoint = requests.get('{}/rest/{}/entity-page/initializationData/License/{}'
-                                      .format(self.base_url, self.tenant_id, licence_id),
-                                      cookies=self.get_cookie()).json()
+        query_endpoint = self.get_json('{}/rest/{}/entity-page/initializationData/License/{}'
+                                       .format(self.base_url, self.tenant_id, licence_id))
         return query_endpoint
 
     def get_license_type_by_id(self, licence_type_id):
@@ -184,31 +153,19 @@ class Run(SmaxTenant):
         :param licence_type_id: Licence type ID
         :return: Returns JSON result of software assets licence type query
         """
-        query_endpoint = requests.get('{}/rest/{}/entity-page/initializationData/LicenseType/{}'
-                                      .format(self.base_url, self.tenant_id, licence_type_id),
-                                      cookies=self.get_cookie()).json()
+        query_endpoint = self.get_json('{}/rest/{}/entity-page/initializationData/LicenseType/{}'
+                                       .format(self.base_url, self.tenant_id, licence_type_id))
         return query_endpoint
 
-    def get_license_types(self, query_params, filters=None):
+    def get_license_types(self, query_params, filters=None, **kwargs):
         """
         Get licence types based on params passed
         :param query_params: FieldIDs you want to query, encased in quotes, comma separated
         :param filters: Filters you'd like to apply, comma separated and encased in quotes, default is None
+        :param kwargs: Paging options, e.g. paginate=True, page_size=1000, see SmaxTenant.get_entities
         :return: Returns JSON result of software asset licence types query
         """
-        assert type(query_params) == str, 'Query params must be in string form'
-        query_params = str(query_params).replace(' ', '')
-        if filters:
-            assert type(filters) == str, 'Filter params must be in string form'
-            filters = SmaxTenant.fix_url_encode(urllib.parse.quote_plus(filters))
-            query_endpoint = requests.get('{}/rest/{}/ems/LicenseType?layout={}&filter={}'
-                                          .format(self.base_url, self.tenant_id, query_params, filters),
-                                          cookies=self.get_cookie()).json()
-            return query_endpoint
-        query_endpoint = requests.get('{}/rest/{}/ems/LicenseType?layout={}'
-                                      .format(self.base_url, self.tenant_id, query_params),
-                                      cookies=self.get_cookie()).json()
-        return query_endpoint
+        return self.get_entities('LicenseType', query_params, filters, **kwargs)
 
     def get_license_model_by_id(self, licence_model_id):
         """
@@ -216,31 +173,19 @@ class Run(SmaxTenant):
         :param licence_model_id: Licence model ID
         :return: Returns JSON result of software assets licence model query
         """
-        query_endpoint = requests.get('{}/rest/{}/entity-page/initializationData/AssetModel/{}'
-                                      .format(self.base_url, self.tenant_id, licence_model_id),
-                                      cookies=self.get_cookie()).json()
+        query_endpoint = self.get_json('{}/rest/{}/entity-page/initializationData/AssetModel/{}'
+                                       .format(self.base_url, self.tenant_id, licence_model_id))
         return query_endpoint
 
-    def get_license_models(self, query_params, filters=None):
+    def get_license_models(self, query_params, filters=None, **kwargs):
         """
         Get licence models based on params passed
         :param query_params: FieldIDs you want to query, encased in quotes, comma separated
         :param filters: Filters you'd like to apply, comma separated and encased in quotes, default is None
+        :param kwargs: Paging options, e.g. paginate=True, page_size=1000, see SmaxTenant.get_entities
         :return: Returns JSON result of licence models query
         """
-        assert type(query_params) == str, 'Query params must be in string form'
-        query_params = str(query_params).replace(' ', '')
-        if filters:
-            assert type(filters) == str, 'Filter params must be in string form'
-            filters = SmaxTenant.fix_url_encode(urllib.parse.quote_plus(filters))
-            query_endpoint = requests.get('{}/rest/{}/ems/AssetModel?layout={}&filter={}'
-                                          .format(self.base_url, self.tenant_id, query_params, filters),
-                                          cookies=self.get_cookie()).json()
-            return query_endpoint
-        query_endpoint = requests.get('{}/rest/{}/ems/AssetModel?layout={}'
-                                      .format(self.base_url, self.tenant_id, query_params),
-                                      cookies=self.get_cookie()).json()
-        return query_endpoint
+        return self.get_entities('AssetModel', query_params, filters, **kwargs)
 
     def get_software_title_by_id(self, software_title_id):
         """
@@ -248,31 +193,19 @@ class Run(SmaxTenant):
         :param software_title_id: Software title ID
         :return: Returns JSON result of software assets software title query
         """
-        query_endpoint = requests.get('{}/rest/{}/entity-page/initializationData/AssetModel/{}'
-                                      .format(self.base_url, self.tenant_id, software_title_id),
-                                      cookies=self.get_cookie()).json()
+        query_endpoint = self.get_json('{}/rest/{}/entity-page/initializationData/AssetModel/{}'
+                                       .format(self.base_url, self.tenant_id, software_title_id))
         return query_endpoint
 
-    def get_software_titles(self, query_params, filters=None):
+    def get_software_titles(self, query_params, filters=None, **kwargs):
         """
         Get software titles based on params passed
         :param query_params: FieldIDs you want to query, encased in quotes, comma separated
         :param filters: Filters you'd like to apply, comma separated and encased in quotes, default is None
+        :param kwargs: Paging options, e.g. paginate=True, page_size=1000, see SmaxTenant.get_entities
         :return: Returns JSON result of software assets software titles query
         """
-        assert type(query_params) == str, 'Query params must be in string form'
-        query_params = str(query_params).replace(' ', '')
-        if filters:
-            assert type(filters) == str, 'Filter params must be in string form'
-            filters = SmaxTenant.fix_url_encode(urllib.parse.quote_plus(filters))
-            query_endpoint = requests.get('{}/rest/{}/ems/AssetModel?layout={}&filter={}'
-                                          .format(self.base_url, self.tenant_id, query_params, filters),
-                                          cookies=self.get_cookie()).json()
-            return query_endpoint
-        query_endpoint = requests.get('{}/rest/{}/ems/AssetModel?layout={}'
-                                      .format(self.base_url, self.tenant_id, query_params),
-                                      cookies=self.get_cookie()).json()
-        return query_endpoint
+        return self.get_entities('AssetModel', query_params, filters, **kwargs)
 
     def get_fixed_asset_by_id(self, asset_id):
         """
@@ -280,31 +213,29 @@ class Run(SmaxTenant):
         :param asset_id: Fixed asset ID
         :return: Returns JSON result of fixed asset query
         """
-        query_endpoint = requests.get('{}/rest/{}/entity-page/initializationData/FixedAsset/{}'
-                                      .format(self.base_url, self.tenant_id, asset_id),
-                                      cookies=self.get_cookie()).json()
+        query_endpoint = self.get_json('{}/rest/{}/entity-page/initializationData/FixedAsset/{}'
+                                       .format(self.base_url, self.tenant_id, asset_id))
         return query_endpoint
 
-    def get_fixed_assets(self, query_params, filters=None):
+    def get_fixed_assets_by_ids(self, ids, query_params, **kwargs):
+        """
+        Get many fixed assets by ID in few queries
+        :param ids: Iterable of fixed asset IDs
+        :param query_params: FieldIDs you want to query, encased in quotes, comma separated
+        :param kwargs: Batching options, e.g. chunk_size=200, see SmaxTenant.get_many
+        :return: Dict of fixed asset ID to fixed asset, IDs that were not found map to None
+        """
+        return self.get_many('FixedAsset', ids, query_params, **kwargs)
+
+    def get_fixed_assets(self, query_params, filters=None, **kwargs):
         """
         Get fixed assets based on params passed
         :param query_params: FieldIDs you want to query, encased in quotes, comma separated
         :param filters: Filters you'd like to apply, comma separated and encased in quotes, default is None
+        :param kwargs: Paging options, e.g. paginate=True, page_size=1000, see SmaxTenant.get_entities
         :return: Returns JSON result of fixed assets query
         """
-        assert type(query_params) == str, 'Query params must be in string form'
-        query_params = str(query_params).replace(' ', '')
-        if filters:
-            assert type(filters) == str, 'Filter params must be in string form'
-            filters = SmaxTenant.fix_url_encode(urllib.parse.quote_plus(filters))
-            query_endpoint = requests.get('{}/rest/{}/ems/FixedAsset/?layout={}&filter={}'
-                                          .format(self.base_url, self.tenant_id, query_params, filters),
-                                          cookies=self.get_cookie()).json()
-            return query_endpoint
-        query_endpoint = requests.get('{}/rest/{}/ems/FixedAsset/?layout={}'
-                                      .format(self.base_url, self.tenant_id, query_params),
-                                      cookies=self.get_cookie()).json()
-        return query_endpoint
+        return self.get_entities('FixedAsset', query_params, filters, **kwargs)
 
     def create_entity(self, entity_type, entity_payload):
         """
@@ -334,10 +265,10 @@ class Run(SmaxTenant):
             "operation": "CREATE"
         }
         base_payload['entities'][0]['properties'] = entity_payload
-        entity_creation_payload = json.dumps(base_payload)
-        entity_creation = requests.post('{}/rest/{}/ems/bulk'.format(self.base_url, self.tenant_id),
-                                        cookies=self.get_cookie(), data=entity_creation_payload,
-                                        headers=header).json()
+        entity_creation_payload = dumps(base_payload)
+        entity_creation = loads(self.session.post('{}/rest/{}/ems/bulk'.format(self.base_url, self.tenant_id),
+                                                  data=entity_creation_payload,
+                                                  headers=header).content)
         return entity_creation
 
     def update_entity(self, entity_id, entity_type, entity_payload):
@@ -371,8 +302,8 @@ class Run(SmaxTenant):
         }
         base_payload['entities'][0]['properties'] = {'Id': entity_id}
         base_payload['entities'][0]['properties'].update(entity_payload)
-        entity_update_payload = json.dumps(base_payload)
-        entity_update = requests.post('{}/rest/{}/ems/bulk'.format(self.base_url, self.tenant_id),
-                                      cookies=self.get_cookie(), data=entity_update_payload,
-                                      headers=header).json()
+        entity_update_payload = dumps(base_payload)
+        entity_update = loads(self.session.post('{}/rest/{}/ems/bulk'.format(self.base_url, self.tenant_id),
+                                                data=entity_update_payload,
+                                                headers=header).content)
         return entity_update
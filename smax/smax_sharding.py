@@ -0,0 +1,128 @@
+import functools
+import math
+from concurrent.futures import ThreadPoolExecutor
+from smax.smax_executor import run_jobs
+from smax.smax_query import Condition, Field
+
+
+class ShardPlanner(object):
+    FIELDS = ('EmsCreationTime', 'LastUpdateTime')
+
+    def __init__(self, tenant, field='EmsCreationTime', shard_size=5000, max_in_flight=4, max_probes=200):
+        """
+        Split large EMS query into adjacent btw windows of time field so every window holds about
+        shard_size records, then fetch windows concurrently, each with shallow skip offsets.
+        Window sizes are chosen from counts of sampled windows, dense periods get narrow windows.
+        Records with empty field are not part of any window, both supported fields are always set
+        :param tenant: SmaxTenant (Run, Build, MasterData) to query
+        :param field: Epoch milliseconds field to split on, EmsCreationTime or LastUpdateTime,
+        default is EmsCreationTime
+        :param shard_size: Wanted number of records per window, default is 5000
+        :param max_in_flight: Maximum number of requests sent at once, default is 4
+        :param max_probes: Maximum number of count requests used for planning, default is 200
+        """
+        assert field in self.FIELDS, 'field must be one of the following:\n{}'.format(', '.join(self.FIELDS))
+        assert shard_size >= 1 and max_in_flight >= 1, 'shard_size and max_in_flight must be at least 1'
+        self.tenant = tenant
+        self.field = field
+        self.shard_size = shard_size
+        self.max_in_flight = max_in_flight
+        self.max_probes = max_probes
+
+    def _window(self, filters, lower, upper):
+        window = Field(self.field).btw(lower, upper)
+        if isinstance(filters, Condition):
+            return filters & window if filters else window
+        return '({}) and {}'.format(filters, window) if filters else str(window)
+
+    def _count(self, entity_type, filters):
+        page = self.tenant.get_entities_page(entity_type, 'Id', filters, skip=0, size=1)
+        return page.get('meta', {}).get('total_count')
+
+    def _edge(self, entity_type, filters, direction):
+        page = self.tenant.get_entities_page(entity_type, 'Id,{}'.format(self.field), filters, skip=0, size=1,
+                                             order='{} {}'.format(self.field, direction))
+        entities = page.get('entities') or []
+        return int(entities[0]['properties'][self.field]) if entities else None
+
+    def plan(self, entity_type, filters=None):
+        """
+        Find windows of query
+        :param entity_type: Entity type to query
+        :param filters: Filters you'd like to apply, string or Condition, default is None
+        :return: List of (lower, upper, count) windows in ascending order, bounds included,
+        None when SMAX does not return total count
+        """
+        total_count = self._count(entity_type, filters)
+        if total_count is None:
+            return None
+        if total_count == 0:
+            return []
+        lower = self._edge(entity_type, filters, 'asc')
+        upper = self._edge(entity_type, filters, 'desc')
+        if lower is None or upper is None:
+            return None
+        windows = [(lower, upper, total_count)]
+        probes = 3
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            while probes < self.max_probes:
+                # split every window over target into parts sized by its count, assuming even spread inside
+                splits = []
+                for window_lower, window_upper, count in windows:
+                    parts = min(math.ceil(count / self.shard_size), window_upper - window_lower + 1)
+                    if count > self.shard_size * 1.5 and parts > 1:
+                        step = (window_upper - window_lower + 1) / parts
+                        edges = [window_lower + int(round(step * part)) for part in range(parts)] + [window_upper + 1]
+                        splits.append([(edges[part], edges[part + 1] - 1) for part in range(parts)])
+                    else:
+                        splits.append(None)
+                wanted = sum(len(split) for split in splits if split)
+                if not wanted or probes + wanted > self.max_probes:
+                    break
+                futures = {bounds: executor.submit(self._count, entity_type, self._window(filters, *bounds))
+                           for split in splits if split for bounds in split}
+                probes += wanted
+                refined = []
+                for window, split in zip(windows, splits):
+                    if split is None:
+                        refined.append(window)
+                        continue
+                    refined.extend((bounds[0], bounds[1], futures[bounds].result() or 0) for bounds in split)
+                windows = [window for window in refined if window[2]]
+        return self._merge(windows)
+
+    def _merge(self, windows):
+        # join neighbouring small windows so every request fetches close to shard_size records
+        merged = []
+        for lower, upper, count in windows:
+            if merged and merged[-1][2] + count <= self.shard_size:
+                merged[-1] = (merged[-1][0], upper, merged[-1][2] + count)
+            else:
+                merged.append((lower, upper, count))
+        return merged
+
+    def iter_entities(self, entity_type, layout, filters=None, page_size=500, order='Id asc', ordered=True):
+        """
+        Fetch all records of query window by window, windows are fetched concurrently
+        :param entity_type: Entity type to query
+        :param layout: FieldIDs you want to query, encased in quotes, comma separated
+        :param filters: Filters you'd like to apply, string or Condition, default is None
+        :param page_size: Number of records fetched per page inside window, default is 500
+        :param order: Order inside window, default is 'Id asc'
+        :param ordered: Set to False to yield windows as they arrive instead of in time order, default is True
+        :return: Generator yielding entities one by one
+        """
+        windows = self.plan(entity_type, filters)
+        if windows is None:
+            yield from self.tenant.iter_entities_parallel(entity_type, layout, filters, page_size=page_size,
+                                                          order=order, max_in_flight=self.max_in_flight,
+                                                          ordered=ordered)
+            return
+
+        def fetch(lower, upper):
+            return list(self.tenant.iter_entities(entity_type, layout, self._window(filters, lower, upper),
+                                                  page_size=page_size, order=order))
+
+        jobs = ((index, functools.partial(fetch, lower, upper)) for index, (lower, upper, _) in enumerate(windows))
+        for _, entities in run_jobs(jobs, max_in_flight=self.max_in_flight, ordered=ordered):
+            yield from entities
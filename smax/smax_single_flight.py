@@ -0,0 +1,75 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+class SingleFlight(object):
+    def __init__(self, recent_ttl=0):
+        """
+        Coalesce concurrent identical calls, while call for a key is in flight every other caller
+        of same key waits for it and gets its result instead of making its own call
+        :param recent_ttl: Seconds finished result is still handed out to new callers, default is 0
+        """
+        self.recent_ttl = recent_ttl
+        self.calls = 0
+        self.shared = 0
+        self._in_flight = {}
+        self._recent = OrderedDict()
+        self._lock = threading.Lock()
+
+    def do(self, key, function):
+        """
+        Call function once for all concurrent callers of key
+        :param key: Key identifying call, e.g. url
+        :param function: Function without arguments making the call
+        :return: Result of function
+        """
+        with self._lock:
+            recent = self._recent.get(key)
+            if recent is not None:
+                if recent[0] > time.monotonic():
+                    self.shared += 1
+                    return recent[1]
+                del self._recent[key]
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+                self.calls += 1
+            else:
+                self.shared += 1
+        if not leader:
+            return future.result()
+        try:
+            result = function()
+        except BaseException as error:
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(error)
+            raise
+        with self._lock:
+            del self._in_flight[key]
+            if self.recent_ttl > 0:
+                now = time.monotonic()
+                self._recent.pop(key, None)
+                self._recent[key] = (now + self.recent_ttl, result)
+                # all entries live recent_ttl, so oldest inserted expire first and sweep stops at first live one
+                while self._recent:
+                    oldest = next(iter(self._recent.values()))
+                    if oldest[0] > now:
+                        break
+                    self._recent.popitem(last=False)
+        future.set_result(result)
+        return result
+
+    def forget(self, key=None):
+        """
+        Drop recent results
+        :param key: Drop only result of this key, default drops all
+        """
+        with self._lock:
+            if key is None:
+                self._recent.clear()
+            else:
+                self._recent.pop(key, None)
@@ -0,0 +1,121 @@
+import json
+import os
+import tempfile
+import threading
+import time
+
+
+class DeltaSync(object):
+    def __init__(self, tenant, state_path, lag=60):
+        """
+        Incremental sync of EMS queries, remembers highest LastUpdateTime seen per sync so
+        next run fetches only records changed since, state is saved to local JSON file
+        :param tenant: SmaxTenant (Run, Build, MasterData) to query
+        :param state_path: Path of JSON file holding watermarks
+        :param lag: Seconds subtracted from current time to get upper bound of each run, records changed
+        while run is in progress are picked up by next run, it also covers clock difference between
+        this machine and SMAX, default is 60
+        """
+        self.tenant = tenant
+        self.state_path = state_path
+        self.lag = lag
+        self._lock = threading.Lock()
+        self.state = {}
+        if os.path.exists(state_path):
+            with open(state_path) as state_file:
+                self.state = json.load(state_file)
+
+    def get_watermark(self, name):
+        """
+        Get watermark of sync
+        :param name: Name of sync, entity type unless other name was given
+        :return: Highest LastUpdateTime seen in epoch milliseconds, None if sync never ran
+        """
+        with self._lock:
+            return self.state.get(name, {}).get('watermark')
+
+    def reset(self, name=None):
+        """
+        Forget watermark so next run fetches everything again
+        :param name: Name of sync to reset, default resets all
+        """
+        with self._lock:
+            if name is None:
+                self.state = {}
+            else:
+                self.state.pop(name, None)
+            self._save()
+
+    def changes(self, entity_type, layout, filters=None, name=None, page_size=500):
+        """
+        Fetch records changed since last run, watermark is saved only once all records were consumed,
+        so interrupted run is repeated on next call. Pages are ordered by LastUpdateTime and Id and each
+        page starts after last record of previous one instead of at skip offset, so records updated while
+        run is in progress leave window without shifting later pages, next run picks them up
+        :param entity_type: Entity type to query
+        :param layout: FieldIDs you want to query, encased in quotes, comma separated, Id and
+        LastUpdateTime are always added
+        :param filters: Filters you'd like to apply, comma separated and encased in quotes, default is None
+        :param name: Name of sync to keep separate watermark for same entity type, default is entity type
+        :param page_size: Number of records fetched per page, default is 500
+        :return: Generator yielding changed entities one by one
+        """
+        assert type(layout) == str, 'Query params must be in string form'
+        name = name or entity_type
+        fields = [field for field in layout.replace(' ', '').split(',') if field]
+        for field in ('LastUpdateTime', 'Id'):
+            if field not in fields:
+                fields.insert(0, field)
+        layout = ','.join(fields)
+        with self._lock:
+            previous = dict(self.state.get(name, {}))
+        watermark = previous.get('watermark')
+        boundary_ids = set(previous.get('boundary_ids', []))
+        upper_bound = int((time.time() - self.lag) * 1000)
+        if watermark is None:
+            window = 'LastUpdateTime <= {}'.format(upper_bound)
+        else:
+            window = 'LastUpdateTime btw ({},{})'.format(watermark, upper_bound)
+        new_watermark, new_boundary_ids = watermark, set(boundary_ids)
+        while True:
+            query_filter = '({}) and {}'.format(filters, window) if filters else window
+            page = self.tenant.get_entities_page(entity_type, layout, query_filter, skip=0, size=page_size,
+                                                 order='LastUpdateTime asc,Id asc')
+            entities = page.get('entities') or []
+            for entity in entities:
+                properties = entity['properties']
+                entity_id = str(properties['Id'])
+                last_update = int(properties['LastUpdateTime'])
+                if last_update == watermark and entity_id in boundary_ids:
+                    continue
+                if new_watermark is None or last_update > new_watermark:
+                    new_watermark, new_boundary_ids = last_update, {entity_id}
+                elif last_update == new_watermark:
+                    new_boundary_ids.add(entity_id)
+                yield entity
+            total_count = page.get('meta', {}).get('total_count')
+            if len(entities) < page_size or (total_count is not None and len(entities) >= total_count):
+                break
+            last = entities[-1]['properties']
+            window = '(LastUpdateTime > {0} or (LastUpdateTime = {0} and Id > {1})) and LastUpdateTime <= {2}' \
+                .format(int(last['LastUpdateTime']), int(last['Id']), upper_bound)
+        with self._lock:
+            self.state[name] = {'entity_type': entity_type,
+                                'watermark': new_watermark,
+                                'boundary_ids': sorted(new_boundary_ids),
+                                'synced_at': int(time.time() * 1000)}
+            self._save()
+
+    def _save(self):
+        # write to temporary file first so state file is never left half written
+        directory = os.path.dirname(os.path.abspath(self.state_path))
+        descriptor, temporary_path = tempfile.mkstemp(dir=directory, prefix='.smax_sync_')
+        try:
+            with os.fdopen(descriptor, 'w') as state_file:
+                json.dump(self.state, state_file)
+                state_file.flush()
+                os.fsync(state_file.fileno())
+            os.replace(temporary_path, self.state_path)
+        except BaseException:
+            os.remove(temporary_path)
+            raise
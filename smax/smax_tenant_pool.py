@@ -0,0 +1,208 @@
+import urllib.parse
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from smax.smax_auth_wrapper import SmaxTenant
+from smax.smax_transport import SmaxTransport
+
+
+class TenantPool(object):
+    def __init__(self, tenants, tenant_class=SmaxTenant, max_per_host=4, transport=None, **kwargs):
+        """
+        Authenticated tenants of one or many SMAX instances, runs same call on all of them concurrently,
+        at most max_per_host calls per SMAX host at a time. Each tenant logs in once and keeps its token,
+        tenants of same host share one connection pool. Tenants are keyed by (base_url, tenant_id), so same
+        tenant ID may be in pool once per SMAX instance
+        :param tenants: Iterable of tenant IDs, dicts of tenant_class arguments (base_url, user_name, password,
+        tenant_id and any optional one) or ready tenant objects
+        :param tenant_class: Class of tenants built from IDs and dicts, e.g. Run or Build, default is SmaxTenant
+        :param max_per_host: Maximum number of tenants called at once per SMAX host, default is 4
+        :param transport: SmaxTransport shared by all tenants, default is new transport per host
+        :param kwargs: Arguments shared by all tenants built from IDs and dicts, e.g. base_url, user_name,
+        password, cache
+        """
+        assert max_per_host >= 1, 'max_per_host must be at least 1'
+        self.max_per_host = max_per_host
+        self.tenants = OrderedDict()
+        self.hosts = {}
+        self.errors = {}
+        self._transports = {}
+        for tenant in tenants:
+            if not isinstance(tenant, SmaxTenant):
+                arguments = dict(kwargs, **(tenant if isinstance(tenant, dict) else {'tenant_id': tenant}))
+                host = self.host(arguments['base_url'])
+                if 'transport' not in arguments:
+                    arguments['transport'] = transport or self._transport(host)
+                tenant = tenant_class(**arguments)
+            key = self.key(tenant)
+            assert key not in self.tenants, 'Tenant {} of {} is in pool twice'.format(key[1], key[0])
+            self.tenants[key] = tenant
+            self.hosts[key] = self.host(tenant.base_url)
+
+    @staticmethod
+    def host(base_url):
+        """
+        Get host of SMAX instance, calls are limited per host
+        :param base_url: Base url of SMAX instance
+        :return: Host with port, lower case
+        """
+        return urllib.parse.urlsplit(base_url).netloc.lower()
+
+    @staticmethod
+    def key(tenant):
+        """
+        Get key of tenant in pool
+        :param tenant: SmaxTenant
+        :return: Tuple of base url without trailing slash and tenant ID
+        """
+        return tenant.base_url.rstrip('/'), str(tenant.tenant_id)
+
+    def keys(self, tenant_ids=None):
+        """
+        Get keys of tenants
+        :param tenant_ids: (base_url, tenant_id) keys or plain tenant IDs, plain ID stands for tenants with that ID
+        on every host, default is every tenant of pool
+        :return: List of keys in order of pool
+        """
+        if tenant_ids is None:
+            return list(self.tenants)
+        keys = []
+        for tenant_id in tenant_ids:
+            if isinstance(tenant_id, tuple):
+                found = [(tenant_id[0].rstrip('/'), str(tenant_id[1]))]
+                if found[0] not in self.tenants:
+                    raise KeyError(tenant_id)
+            else:
+                found = [key for key in self.tenants if key[1] == str(tenant_id)]
+                if not found:
+                    raise KeyError(tenant_id)
+            keys.extend(key for key in found if key not in keys)
+        return keys
+
+    def _transport(self, host):
+        if host not in self._transports:
+            self._transports[host] = SmaxTransport(pool_size=self.max_per_host)
+        return self._transports[host]
+
+    def __getitem__(self, tenant_id):
+        keys = self.keys([tenant_id])
+        if len(keys) > 1:
+            raise KeyError('Tenant {} is on {} hosts, use (base_url, tenant_id)'.format(tenant_id, len(keys)))
+        return self.tenants[keys[0]]
+
+    def __len__(self):
+        return len(self.tenants)
+
+    def map(self, function, tenant_ids=None):
+        """
+        Call function with every tenant, hosts are called concurrently, at most max_per_host tenants
+        of each host at a time, failure of one tenant does not stop others
+        :param function: Function taking tenant, e.g. lambda tenant: tenant.get_entities('Incident', 'Id')
+        :param tenant_ids: Keys or tenant IDs to call, see keys, default is every tenant of pool
+        :return: Generator yielding ((base_url, tenant_id), result, error) as tenants finish, error is exception
+        raised by function or None, result is None when it failed
+        """
+        queues = OrderedDict()
+        for key in self.keys(tenant_ids):
+            queues.setdefault(self.hosts[key], deque()).append(key)
+        if not queues:
+            return
+        pending = {}
+        executor = ThreadPoolExecutor(max_workers=self.max_per_host * len(queues))
+
+        def submit(host):
+            if not queues[host]:
+                return False
+            key = queues[host].popleft()
+            pending[executor.submit(function, self.tenants[key])] = host, key
+            return True
+
+        try:
+            # each host gets own slots, so slow or failing host does not hold up tenants of other hosts
+            for host in queues:
+                for _ in range(self.max_per_host):
+                    if not submit(host):
+                        break
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    host, key = pending.pop(future)
+                    submit(host)
+                    try:
+                        yield key, future.result(), None
+                    except Exception as error:
+                        yield key, None, error
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    def login(self, tenant_ids=None):
+        """
+        Log in to every tenant up front, tenants log in on first call otherwise
+        :param tenant_ids: Keys or tenant IDs to log in to, see keys, default is every tenant of pool
+        :return: Dict of (base_url, tenant_id) to exception of tenants that failed to log in
+        """
+        return {key: error for key, _, error in self.map(lambda tenant: tenant.session.get_token(), tenant_ids)
+                if error is not None}
+
+    def get_entities(self, entity_type, query_params, filters=None, tenant_ids=None, **kwargs):
+        """
+        Run EMS query on every tenant, see SmaxTenant.get_entities
+        :param entity_type: Entity type to query
+        :param query_params: FieldIDs you want to query, encased in quotes, comma separated
+        :param filters: Filters you'd like to apply, comma separated and encased in quotes, default is None
+        :param tenant_ids: Keys or tenant IDs to query, see keys, default is every tenant of pool
+        :param kwargs: Query options, e.g. size=100, when paginating all entities of tenant are read into list
+        :return: Generator yielding ((base_url, tenant_id), result, error) as tenants finish
+        """
+        def run(tenant):
+            result = tenant.get_entities(entity_type, query_params, filters, **kwargs)
+            return list(result) if kwargs.get('paginate') and not kwargs.get('compact') else result
+        return self.map(run, tenant_ids)
+
+    def query(self, query, validate=True, tenant_ids=None, **kwargs):
+        """
+        Run query built with Q on every tenant, see SmaxTenant.query
+        :param query: Q query
+        :param validate: Set to False to skip check of fields against entity metadata of each tenant, default is True
+        :param tenant_ids: Keys or tenant IDs to query, see keys, default is every tenant of pool
+        :param kwargs: Paging options, e.g. paginate=True, when paginating all entities of tenant are read into list
+        :return: Generator yielding ((base_url, tenant_id), result, error) as tenants finish
+        """
+        def run(tenant):
+            result = tenant.query(query, validate=validate, **kwargs)
+            return list(result) if kwargs.get('paginate') and not kwargs.get('compact') else result
+        return self.map(run, tenant_ids)
+
+    def iter_entities(self, entity_type, layout, filters=None, tenant_ids=None, **kwargs):
+        """
+        Walk through all pages of EMS query on every tenant, entities of tenant are yielded once tenant
+        finished, tenants that failed are skipped and kept in errors until next call
+        :param entity_type: Entity type to query
+        :param layout: FieldIDs you want to query, encased in quotes, comma separated
+        :param filters: Filters you'd like to apply, comma separated and encased in quotes, default is None
+        :param tenant_ids: Keys or tenant IDs to query, see keys, default is every tenant of pool
+        :param kwargs: Paging options, e.g. page_size=1000, parallel=True, see SmaxTenant.get_entities
+        :return: Generator yielding ((base_url, tenant_id), entity)
+        """
+        self.errors = {}
+        for key, entities, error in self.get_entities(entity_type, layout, filters, tenant_ids,
+                                                      paginate=True, **kwargs):
+            if error is not None:
+                self.errors[key] = error
+                continue
+            for entity in entities:
+                yield key, entity
+
+    def close(self):
+        """
+        Close connections of transports created by pool
+        """
+        for transport in self._transports.values():
+            transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
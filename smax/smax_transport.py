@@ -0,0 +1,88 @@
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class SmaxTransport(object):
+    IDEMPOTENT_METHODS = ('GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS', 'TRACE')
+
+    def __init__(self, pool_size=10, timeout=60, retries=3, backoff_factor=0.5,
+                 retry_statuses=(502, 503, 504), keep_alive=True, rate_limiter=None, instrumentation=None):
+        """
+        Pooled HTTP transport, keeps connections to SMAX host open between calls,
+        one instance can be shared by any number of SmaxTenant and SmaxAdmin objects
+        :param pool_size: Maximum number of connections kept open per host, default is 10
+        :param timeout: Seconds to wait for connection and response, default is 60, None waits forever
+        :param retries: Number of retries of failed idempotent calls, default is 3
+        :param backoff_factor: Backoff factor between retries in seconds, default is 0.5
+        :param retry_statuses: HTTP statuses that are retried, default is 502, 503, 504
+        :param keep_alive: Set to False to close connection after each call, default is True
+        :param rate_limiter: RateLimiter pacing calls of every tenant using transport, throttled calls (429 of
+        any method, 503 of idempotent ones) are sent again once limiter allows, up to retries times. Throttle
+        statuses and Retry-After are handled by limiter only, never by retry of connection pool, default is None
+        :param instrumentation: Instrumentation measuring every call sent through transport, default is None
+        """
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.retries = retries
+        self.rate_limiter = rate_limiter
+        self.instrumentation = instrumentation
+        if rate_limiter is not None:
+            # pool retrying 503 on its own would hide throttling from limiter and multiply calls sent
+            retry_statuses = [status for status in retry_statuses if status not in rate_limiter.THROTTLE_STATUSES]
+        retry = Retry(total=retries, connect=retries, read=retries, status=retries,
+                      backoff_factor=backoff_factor, status_forcelist=retry_statuses,
+                      raise_on_status=False, respect_retry_after_header=rate_limiter is None)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        if not keep_alive:
+            self.session.headers['Connection'] = 'close'
+
+    def request(self, method, url, **kwargs):
+        """
+        Send request over pooled connection
+        :param method: HTTP method
+        :param url: Full url to call
+        :param kwargs: Any other argument accepted by requests
+        :return: Response object
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        if self.instrumentation is None:
+            return self._send(method, url, None, **kwargs)
+        event = self.instrumentation.start(method, url, kwargs)
+        try:
+            response = self._send(method, url, event, **kwargs)
+        except Exception as error:
+            self.instrumentation.end(event, error=error)
+            raise
+        self.instrumentation.end(event, response)
+        return response
+
+    def _send(self, method, url, event, **kwargs):
+        if self.rate_limiter is None:
+            return self.session.request(method, url, **kwargs)
+        for attempt in range(self.retries + 1):
+            budget = self.rate_limiter.acquire(method, url)
+            started = time.monotonic()
+            response = None
+            try:
+                response = self.session.request(method, url, **kwargs)
+            finally:
+                self.rate_limiter.release(budget, response, time.monotonic() - started)
+            if event is not None:
+                event['retries'] = attempt
+            # 429 means SMAX did not process call, so it is safe to send again for any method, 503 is sent
+            # again only for idempotent methods like pool retry would
+            if response.status_code not in self.rate_limiter.THROTTLE_STATUSES or \
+                    (response.status_code != 429 and method.upper() not in self.IDEMPOTENT_METHODS):
+                break
+        return response
+
+    def close(self):
+        """
+        Close all pooled connections
+        """
+        self.session.close()
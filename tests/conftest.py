@@ -0,0 +1,23 @@
+import pytest
+from smax import Run, SmaxAdmin
+from tests.mock_server import MockSmaxServer
+
+
+@pytest.fixture
+def server():
+    with MockSmaxServer(records=2000) as mock:
+        yield mock
+
+
+@pytest.fixture
+def tenant(server):
+    run = Run(server.url, 'user', 'password', 1)
+    yield run
+    run.session.close()
+
+
+@pytest.fixture
+def admin(server):
+    suite_admin = SmaxAdmin(server.url, 'admin', 'password', 1)
+    yield suite_admin
+    suite_admin.session.close()
@@ -0,0 +1,416 @@
+import functools
+import json
+import random
+import re
+import socket
+import threading
+import time
+import urllib.parse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+_TOKEN = re.compile(r"\s*(?:(\()|(\))|(,)|('(?:[^'\\]|\\.)*')|(-?\d+(?:\.\d+)?)|(<=|>=|!=|=|<|>)|([A-Za-z_][\w.]*))")
+_ENTITY = re.compile(r'^/rest/([^/]+)/ems/(\w+)(?:/([^/]+))?$')
+_PAGE = re.compile(r'^/rest/([^/]+)/entity-page/initializationData/(\w+)/([^/]+)$')
+_BO = re.compile(r'^/bo/rest/entities/(\w+)(?:/([^/]+))?$')
+
+
+def _tokens(text):
+    position, tokens = 0, []
+    text = text.strip()
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if not match or match.end() == position:
+            raise ValueError('Invalid filter near {}'.format(text[position:]))
+        group = match.lastindex
+        value = match.group(group)
+        if group == 4:
+            value = ('literal', value[1:-1].replace("\\'", "'"))
+        elif group == 5:
+            value = ('literal', float(value) if '.' in value else int(value))
+        elif group == 7 and value in ('true', 'false', 'null'):
+            value = ('literal', {'true': True, 'false': False, 'null': None}[value])
+        elif group == 7:
+            value = ('word', value)
+        tokens.append(value)
+        position = match.end()
+    return tokens
+
+
+def _comparable(value, literal):
+    # SMAX Ids are numeric strings, compare them as numbers when filter uses number
+    if isinstance(literal, (int, float)) and not isinstance(literal, bool) and isinstance(value, str):
+        try:
+            return float(value), literal
+        except ValueError:
+            return value, str(literal)
+    if isinstance(value, (int, float)) and isinstance(literal, str):
+        return str(value), literal
+    return value, literal
+
+
+def _compare(operator, value, literal):
+    if value is None or literal is None:
+        return {'=': value is literal, '!=': value is not literal}.get(operator, False)
+    value, literal = _comparable(value, literal)
+    try:
+        return {'=': value == literal, '!=': value != literal, '<': value < literal, '<=': value <= literal,
+                '>': value > literal, '>=': value >= literal}[operator]
+    except TypeError:
+        return False
+
+
+@functools.lru_cache(maxsize=256)
+def compile_filter(text):
+    """
+    Compile EMS filter into predicate, supports =, !=, <, <=, >, >=, btw, in, and, or and brackets
+    :param text: EMS filter, e.g. "Status = 'Open' and EmsCreationTime btw (1,2)"
+    :return: Function taking properties dict and returning True for matching records
+    """
+    tokens = _tokens(text)
+    position = [0]
+
+    def peek():
+        return tokens[position[0]] if position[0] < len(tokens) else None
+
+    def take(expected=None):
+        token = peek()
+        if token is None or (expected is not None and token != expected and token != ('word', expected)):
+            raise ValueError('Invalid filter {}, expected {}'.format(text, expected))
+        position[0] += 1
+        return token
+
+    def values():
+        take('(')
+        items = [take()[1]]
+        while peek() == ',':
+            take(',')
+            items.append(take()[1])
+        take(')')
+        return items
+
+    def factor():
+        if peek() == '(':
+            take('(')
+            predicate = expression()
+            take(')')
+            return predicate
+        field = take()[1]
+        operator = take()
+        if operator == ('word', 'btw'):
+            lower, upper = values()
+            return lambda properties: _compare('>=', properties.get(field), lower) and \
+                _compare('<=', properties.get(field), upper)
+        if operator == ('word', 'in'):
+            items = {str(item) for item in values()}
+            return lambda properties: str(properties.get(field)) in items
+        literal = take()[1]
+        return lambda properties: _compare(operator, properties.get(field), literal)
+
+    def term():
+        predicates = [factor()]
+        while peek() == ('word', 'and'):
+            take('and')
+            predicates.append(factor())
+        return predicates[0] if len(predicates) == 1 else lambda properties: all(p(properties) for p in predicates)
+
+    def expression():
+        predicates = [term()]
+        while peek() == ('word', 'or'):
+            take('or')
+            predicates.append(term())
+        return predicates[0] if len(predicates) == 1 else lambda properties: any(p(properties) for p in predicates)
+
+    predicate = expression()
+    if peek() is not None:
+        raise ValueError('Invalid filter {}, unexpected {}'.format(text, peek()))
+    return predicate
+
+
+class MockSmaxServer(object):
+    BO_TYPES = {'tenant': 20, 'user': 200, 'account': 5, 'customer': 10, 'licensePool': 10, 'license': 30,
+                'licenseActivity': 100, 'operationHistory': 500}
+
+    def __init__(self, records=10000, latency=0.0, jitter=0.0, max_page_size=1000, error_rate=0.0,
+                 error_status=503, max_concurrency=None, retry_after=1, token_lifetime=None, seed=0,
+                 port=0):
+        """
+        Local stand-in of SMAX for tests and offline benchmarks, serves login, EMS queries with
+        layout, filter, order, skip and size, /ems/bulk, entity-page/initializationData, forms, metadata,
+        workflow, templates and Suite Admin /bo/rest/entities on 127.0.0.1. Records are generated from seed,
+        responses only mimic shape of real ones
+        :param records: Number of records generated per entity type, default is 10000
+        :param latency: Seconds added to every response, default is 0.0
+        :param jitter: Maximum random seconds added on top of latency, default is 0.0
+        :param max_page_size: Largest page EMS query returns, default is 1000
+        :param error_rate: Share of calls answered with error_status, default is 0.0
+        :param error_status: HTTP status of injected errors, default is 503
+        :param max_concurrency: Calls in flight over this number are answered with 429, default is None
+        :param retry_after: Retry-After seconds of 429 and 503 responses, default is 1
+        :param token_lifetime: Seconds token is accepted, calls with older token get 401, default is None
+        :param seed: Seed of generated records and injected errors, default is 0
+        :param port: Port to listen on, default is free port
+        """
+        self.records = records
+        self.latency = latency
+        self.jitter = jitter
+        self.max_page_size = max_page_size
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.max_concurrency = max_concurrency
+        self.retry_after = retry_after
+        self.token_lifetime = token_lifetime
+        self.port = port
+        self.stats = {'logins': 0, 'requests': 0, 'throttled': 0, 'errors': 0, 'unauthorized': 0}
+        self.in_flight = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens = {}
+        self._tables = {}
+        self._server = None
+        self._thread = None
+        self._bo = {entity_type: [self._bo_entity(entity_type, index) for index in range(count)]
+                    for entity_type, count in self.BO_TYPES.items()}
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:{}'.format(self._server.server_address[1])
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def start(self):
+        """
+        Start serving in background thread
+        :return: Server itself, base url is in url
+        """
+        server = self
+
+        class Handler(_Handler):
+            mock = server
+        self._server = ThreadingHTTPServer(('127.0.0.1', self.port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name='smax-mock-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stop serving
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def table(self, entity_type):
+        """
+        Get records of entity type, generated on first use
+        :param entity_type: Entity type
+        :return: Dict of Id to properties
+        """
+        with self._lock:
+            if entity_type not in self._tables:
+                generator = random.Random('{}-{}'.format(self._random.random(), entity_type))
+                start = 1546300800000
+                table = {}
+                for index in range(self.records):
+                    created = start + index * 60000 + generator.randint(0, 59999)
+                    closed = created + generator.randint(60000, 14 * 86400000) if generator.random() < 0.8 else None
+                    entity_id = str(10000 + index)
+                    table[entity_id] = {
+                        'Id': entity_id, 'EmsCreationTime': created,
+                        'LastUpdateTime': (closed or created) + generator.randint(0, 3600000),
+                        'DisplayLabel': '{} {}'.format(entity_type, entity_id),
+                        'Status': generator.choice(('RequestStatusReady', 'RequestStatusInProgress',
+                                                    'RequestStatusComplete')),
+                        'Priority': generator.choice(('LowPriority', 'MediumPriority', 'HighPriority',
+                                                      'CriticalPriority')),
+                        'Category': str(500 + generator.randint(0, 40)),
+                        'RegisteredForActualService': str(25000 + generator.randint(0, 60)),
+                        'AssignedToGroup': str(3000 + generator.randint(0, 25)),
+                        'CloseTime': closed}
+                self._tables[entity_type] = table
+            return self._tables[entity_type]
+
+    def _bo_entity(self, entity_type, index):
+        entity = {'id': str(1000 + index), 'entityType': entity_type, 'name': '{} {}'.format(entity_type, index)}
+        if entity_type == 'user':
+            entity['tenantIds'] = [str(1000 + index % self.BO_TYPES['tenant'])]
+        if entity_type in ('license', 'licensePool'):
+            entity['tenantId'] = str(1000 + index % self.BO_TYPES['tenant'])
+        if entity_type == 'operationHistory':
+            entity['time'] = 1546300800000 + index * 3600000
+        return entity
+
+    def query(self, entity_type, params):
+        fields = [field for field in params.get('layout', 'Id').split(',') if field]
+        rows = list(self.table(entity_type).values())
+        if params.get('filter'):
+            predicate = compile_filter(params['filter'])
+            rows = [row for row in rows if predicate(row)]
+        for part in reversed([part.split() for part in params.get('order', '').split(',') if part.strip()]):
+            field, descending = part[0], len(part) > 1 and part[1].lower() == 'desc'
+            rows.sort(key=lambda row: (row.get(field) is not None,
+                                       int(row[field]) if field == 'Id' else row.get(field) or 0),
+                      reverse=descending)
+        skip = int(params.get('skip', 0))
+        size = min(int(params.get('size', self.max_page_size)), self.max_page_size)
+        entities = [{'entity_type': entity_type, 'related_properties': {},
+                     'properties': {field: row.get(field) for field in fields if field in row or field == 'Id'}}
+                    for row in rows[skip:skip + size]]
+        return {'meta': {'completion_status': 'OK', 'total_count': len(rows), 'errorDetailsList': [],
+                         'errorDetailsMetaList': [], 'query_time': int(time.time() * 1000)},
+                'entities': entities}
+
+    def bulk(self, payload):
+        results = []
+        for item in payload.get('entities', []):
+            entity_type, properties = item['entity_type'], dict(item.get('properties', {}))
+            table = self.table(entity_type)
+            with self._lock:
+                if payload.get('operation') == 'UPDATE':
+                    if str(properties.get('Id')) not in table:
+                        results.append({'completion_status': 'FAILED', 'entity': item,
+                                        'errorDetails': {'message': 'Entity not found'}})
+                        continue
+                    table[str(properties['Id'])].update(properties)
+                else:
+                    properties['Id'] = str(10000 + len(table))
+                    properties.setdefault('EmsCreationTime', int(time.time() * 1000))
+                    table[properties['Id']] = properties
+                table[str(properties['Id'])]['LastUpdateTime'] = int(time.time() * 1000)
+            results.append({'completion_status': 'OK', 'errorDetails': None,
+                            'entity': {'entity_type': entity_type, 'properties': {'Id': properties['Id']},
+                                       'related_properties': {}}})
+        return {'entity_result_list': results, 'meta': {'completion_status': 'OK'}}
+
+    def bo_collection(self, entity_type, params):
+        entities = self._bo.get(entity_type, [])
+        if params.get('filter'):
+            predicate = compile_filter(params['filter'])
+            entities = [entity for entity in entities if predicate(entity)]
+        skip = int(params.get('skip', 0))
+        size = int(params.get('size', len(entities) or 1))
+        return {'meta': {'total_count': len(entities)}, 'entities': entities[skip:skip + size]}
+
+    def authorized(self, cookie):
+        token = re.search(r'LWSSO_COOKIE_KEY=([^;]+)', cookie or '')
+        with self._lock:
+            issued = self._tokens.get(token.group(1)) if token else None
+        return issued is not None and (self.token_lifetime is None or time.time() - issued < self.token_lifetime)
+
+    def login(self):
+        with self._lock:
+            self.stats['logins'] += 1
+            token = 'mock-token-{}-{}'.format(self.stats['logins'], self._random.randint(0, 10 ** 9))
+            self._tokens[token] = time.time()
+        return token
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    mock = None
+
+    def setup(self):
+        BaseHTTPRequestHandler.setup(self)
+        # headers and body are written separately, without this every response waits for delayed ACK
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body, headers=None):
+        data = body if isinstance(body, bytes) else json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _handle(self, method):
+        mock = self.mock
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        url = urllib.parse.urlparse(self.path)
+        params = {key: values[-1] for key, values in urllib.parse.parse_qs(url.query).items()}
+        with mock._lock:
+            mock.stats['requests'] += 1
+            mock.in_flight += 1
+            over_limit = mock.max_concurrency is not None and mock.in_flight > mock.max_concurrency
+            failed = not over_limit and mock.error_rate and mock._random.random() < mock.error_rate
+        try:
+            if over_limit or failed:
+                with mock._lock:
+                    mock.stats['throttled' if over_limit else 'errors'] += 1
+                return self._send(429 if over_limit else mock.error_status, {'error': 'injected'},
+                                  {'Retry-After': str(mock.retry_after)})
+            if mock.latency or mock.jitter:
+                time.sleep(mock.latency + mock._random.random() * mock.jitter)
+            if url.path.endswith('/authenticate/login'):
+                return self._send(200, mock.login().encode('utf-8'))
+            if not mock.authorized(self.headers.get('Cookie')):
+                with mock._lock:
+                    mock.stats['unauthorized'] += 1
+                return self._send(401, {'error': 'unauthorized'})
+            status, result = self._route(method, url.path, params, json.loads(body) if body else None)
+            return self._send(status, result)
+        finally:
+            with mock._lock:
+                mock.in_flight -= 1
+
+    def _route(self, method, path, params, payload):
+        mock = self.mock
+        match = _ENTITY.match(path)
+        if match and match.group(2) == 'bulk':
+            return 200, mock.bulk(payload or {})
+        if match and match.group(3):
+            properties = mock.table(match.group(2)).get(match.group(3))
+            if properties is None:
+                return 404, {'meta': {'completion_status': 'FAILED'}}
+            layout = [field for field in params.get('layout', 'Id').split(',') if field]
+            return 200, {'meta': {'completion_status': 'OK', 'total_count': 1},
+                         'entities': [{'entity_type': match.group(2), 'related_properties': {},
+                                       'properties': {field: properties.get(field) for field in layout}}]}
+        if match:
+            return 200, mock.query(match.group(2), params)
+        match = _PAGE.match(path)
+        if match:
+            properties = mock.table(match.group(2)).get(match.group(3))
+            return (200, {'EntityData': properties, 'entity_type': match.group(2)}) if properties else \
+                (404, {'error': 'not found'})
+        if '/metadata/ui/entity-descriptors/' in path or '/forms/' in path or '/workflow/full/' in path:
+            entity_type = path.rstrip('/').split('/')[-1]
+            fields = next(iter(mock.table(entity_type).values()), {'Id': None}).keys()
+            return 200, {'name': entity_type, 'properties': [{'name': field} for field in fields],
+                         'relations': [], 'workflow': [], 'fields': list(fields)}
+        if '/rms/EntityTemplate' in path:
+            return 200, {'meta': {'completion_status': 'OK'}, 'entities': []}
+        match = _BO.match(path)
+        if match:
+            if method != 'GET':
+                return 200, {'meta': {'completion_status': 'OK'}, 'entity_result_list': [
+                    {'entity': item, 'completion_status': 'OK'}
+                    for item in (payload.get('attachEntities', []) if isinstance(payload, dict) else payload or [])]}
+            if match.group(2) and match.group(1) != 'configurations':
+                entity = next((item for item in mock._bo.get(match.group(1), []) if item['id'] == match.group(2)),
+                              None)
+                return (200, entity) if entity else (404, {'error': 'not found'})
+            return 200, mock.bo_collection(match.group(1), params)
+        return 404, {'error': 'unknown endpoint {}'.format(path)}
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def do_PUT(self):
+        self._handle('PUT')
+
+    def do_DELETE(self):
+        self._handle('DELETE')
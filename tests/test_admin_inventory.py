@@ -0,0 +1,44 @@
+from smax import AdminInventory
+
+
+def test_snapshot_joins_collections(admin):
+    snapshot = AdminInventory(admin, max_in_flight=8).snapshot()
+    tenants = snapshot['tenants']
+    assert len(tenants) == 20
+    assert sum(len(tenant['users']) for tenant in tenants.values()) == 200
+    assert len(tenants['1000']['users']) == 10
+    assert len(tenants['1001']['licenses']) == 2 and len(tenants['1001']['license_pools']) == 1
+    assert snapshot['unassigned'] == {'users': [], 'licenses': [], 'license_pools': []}
+    assert len(snapshot['accounts']) == 5 and len(snapshot['license_activity']) == 100
+    assert snapshot['errors'] == {}
+
+
+def test_snapshot_is_cached(admin):
+    inventory = AdminInventory(admin, details=('tenants',), ttl=60)
+    first = inventory.snapshot()
+    assert inventory.calls == 7 + 20
+    assert inventory.snapshot() is first
+    assert inventory.calls == 7 + 20
+    assert inventory.snapshot(refresh=True) is not first
+    inventory.invalidate()
+    inventory.snapshot()
+    assert inventory.calls == 3 * (7 + 20)
+
+
+def test_failed_calls_are_reported(admin, monkeypatch):
+    def failing_get_customers():
+        raise ConnectionError('connection lost')
+
+    def get_user_by_id(user_id):
+        if user_id != '1005':
+            raise ConnectionError('connection lost')
+        return {'id': user_id, 'tenantIds': ['1005'], 'detail': True}
+    monkeypatch.setattr(admin, 'get_customers', failing_get_customers)
+    monkeypatch.setattr(admin, 'get_user_by_id', get_user_by_id)
+    snapshot = AdminInventory(admin, details=('users',)).snapshot()
+    assert snapshot['customers'] == []
+    assert set(snapshot['errors']) == {'customers'} | {'users/{}'.format(1000 + index) for index in range(200)
+                                                       if index != 5}
+    # users whose details failed are kept as listed
+    users = snapshot['tenants']['1005']['users']
+    assert len(users) == 10 and [user.get('detail') for user in users] == [True] + [None] * 9
@@ -0,0 +1,37 @@
+import asyncio
+import pytest
+from smax import aio
+
+pytest.importorskip('aiohttp')
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_first_page(server):
+    async def main():
+        async with aio.Run(server.url, 'user', 'password', 1) as tenant:
+            return await tenant.get_incidents('Id', size=5)
+    assert len(run(main())['entities']) == 5
+
+
+def test_paginate(server):
+    async def main():
+        async with aio.Run(server.url, 'user', 'password', 1) as tenant:
+            sequential = [entity async for entity in tenant.get_incidents('Id', paginate=True, page_size=300)]
+            parallel = [entity async for entity in tenant.get_incidents('Id', paginate=True, page_size=300,
+                                                                        parallel=True, max_in_flight=4)]
+            return sequential, parallel
+    sequential, parallel = run(main())
+    assert [entity['properties']['Id'] for entity in sequential] == [str(10000 + index) for index in range(2000)]
+    assert parallel == sequential
+
+
+def test_concurrent_coroutines_share_login(server):
+    async def main():
+        async with aio.Run(server.url, 'user', 'password', 1) as tenant:
+            return await asyncio.gather(*[tenant.get_incident_by_id(10000 + index) for index in range(10)])
+    results = run(main())
+    assert [result['EntityData']['Id'] for result in results] == [str(10000 + index) for index in range(10)]
+    assert server.stats['logins'] == 1
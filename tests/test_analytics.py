@@ -0,0 +1,48 @@
+import collections
+import pytest
+from smax import Aggregation, aggregate, bucket, count_by
+
+numpy = pytest.importorskip('numpy')
+
+
+def test_bucket():
+    monday = 1546819200000
+    assert bucket([monday + 5000], 'hour').tolist() == [monday]
+    assert bucket([monday + 25 * 3600000], 'day').tolist() == [monday + 24 * 3600000]
+    assert bucket([monday + 6 * 24 * 3600000], 'week').tolist() == [monday]
+    assert bucket([monday], 'month').tolist() == [1546300800000]
+    assert bucket([monday - 1], 'day', offset=2 * 3600000).tolist() == [monday - 2 * 3600000]
+
+
+def test_count_by_matches_table(server, tenant):
+    entities = tenant.get_entities('Incident', 'Id,Priority,Status', paginate=True, page_size=300, compact=True)
+    expected = collections.Counter((row['Priority'], row['Status']) for row in server.table('Incident').values())
+    rows = count_by(entities, ['Priority', 'Status'])
+    assert {(row['Priority'], row['Status']): row['count'] for row in rows} == expected
+
+
+def test_stream_equals_result_set(tenant):
+    stream = tenant.get_entities('Incident', 'Id,Priority,EmsCreationTime', paginate=True, page_size=300)
+    entities = tenant.get_entities('Incident', 'Id,Priority,EmsCreationTime', paginate=True, page_size=300,
+                                   compact=True)
+    options = {'time_field': 'EmsCreationTime', 'unit': 'week'}
+    assert Aggregation('Priority', **options).add_stream(stream, page_size=128).result() == \
+        aggregate(entities, 'Priority', **options)
+
+
+def test_value_statistics():
+    entities = [{'properties': {'Priority': 'High', 'EmsCreationTime': 0, 'CloseTime': close}}
+                for close in (10, 20, 30, None)] + [{'properties': {'Priority': 'Low', 'EmsCreationTime': 0,
+                                                                    'CloseTime': None}}]
+    rows = aggregate(entities, 'Priority', value=lambda columns: columns['CloseTime'] - columns['EmsCreationTime'],
+                     percentiles=(50,), threshold=15)
+    assert rows == [{'Priority': 'High', 'count': 4, 'measured': 3, 'sum': 60.0, 'mean': 20.0, 'min': 10.0,
+                     'max': 30.0, 'p50': 20.0, 'within_threshold': 1},
+                    {'Priority': 'Low', 'count': 1, 'measured': 0, 'sum': 0.0, 'mean': None, 'min': None,
+                     'max': None, 'p50': None, 'within_threshold': 0}]
+
+
+def test_records_without_time_are_skipped():
+    aggregation = Aggregation(time_field='EmsCreationTime').add([{'EmsCreationTime': 0}, {'EmsCreationTime': None}])
+    assert aggregation.skipped == 1
+    assert aggregation.result() == [{'bucket': 0, 'count': 1}]
@@ -0,0 +1,54 @@
+import pytest
+
+
+def test_bulk_create_packs_chunks(server, tenant):
+    tenant.get_cookie()
+    requests = server.stats['requests']
+    results = tenant.bulk_create('Incident', [{'DisplayLabel': 'Bulk {}'.format(index)} for index in range(250)],
+                                 chunk_size=100)
+    assert server.stats['requests'] - requests == 3
+    assert [result['completion_status'] for result in results] == ['OK'] * 250
+    created = [server.table('Incident')[result['entity']['properties']['Id']] for result in results]
+    assert [entity['DisplayLabel'] for entity in created] == ['Bulk {}'.format(index) for index in range(250)]
+
+
+@pytest.mark.parametrize('parallel', [False, True])
+def test_bulk_write_reports_result_per_entity(server, tenant, parallel):
+    operations = [('UPDATE', 'Incident', {'Id': '10000', 'Status': 'RequestStatusComplete'}),
+                  ('UPDATE', 'Incident', {'Id': '99999', 'Status': 'RequestStatusComplete'}),
+                  ('CREATE', 'Incident', {'DisplayLabel': 'New'})]
+    results = tenant.bulk_write(operations * 20, chunk_size=7, parallel=parallel, max_in_flight=3)
+    assert [result['completion_status'] for result in results] == ['OK', 'FAILED', 'OK'] * 20
+    assert [result['properties'] for result in results] == [payload for _, _, payload in operations * 20]
+    assert server.table('Incident')['10000']['Status'] == 'RequestStatusComplete'
+
+
+def test_failed_call_fails_its_entities(server, tenant):
+    tenant.get_cookie()
+    server.error_rate = 1.0
+    server.error_status = 500
+    results = tenant.bulk_create('Incident', [{'DisplayLabel': 'Lost'}] * 3)
+    assert [result['completion_status'] for result in results] == ['FAILED'] * 3
+    assert 'HTTP 500' in results[0]['errorDetails']
+
+
+def test_update_requires_id(tenant):
+    with pytest.raises(AssertionError):
+        tenant.bulk_update('Incident', [{'Status': 'RequestStatusComplete'}])
+
+
+@pytest.mark.parametrize('parallel', [False, True])
+def test_completed_chunks_are_reported_when_call_raises(tenant, monkeypatch, parallel):
+    send_bulk_chunk = tenant._send_bulk_chunk
+
+    def failing_send_bulk_chunk(operation, items):
+        if items[0][0] == 20:
+            raise ConnectionError('connection lost')
+        return send_bulk_chunk(operation, items)
+    monkeypatch.setattr(tenant, '_send_bulk_chunk', failing_send_bulk_chunk)
+    completed = {}
+    with pytest.raises(ConnectionError):
+        tenant.bulk_create('Incident', [{'DisplayLabel': 'Bulk {}'.format(index)} for index in range(50)],
+                           chunk_size=10, parallel=parallel, max_in_flight=2, completed=completed)
+    assert set(range(20)) <= set(completed) and not set(range(20, 30)) & set(completed)
+    assert all(result['completion_status'] == 'OK' for result in completed.values())
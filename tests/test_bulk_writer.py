@@ -0,0 +1,106 @@
+import threading
+import time
+import pytest
+from smax import BulkWriter
+
+
+class FakeTenant(object):
+    def __init__(self, delay=0.0, failures=0):
+        self.delay = delay
+        self.failures = failures
+        self.batches = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def bulk_write(self, operations, **kwargs):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delay)
+            with self._lock:
+                if self.failures:
+                    self.failures -= 1
+                    raise ConnectionError('SMAX is down')
+                self.batches.append([(operation, entity_type, dict(payload))
+                                     for operation, entity_type, payload in operations])
+            return [{'operation': operation, 'entity_type': entity_type, 'properties': payload,
+                     'completion_status': 'OK'} for operation, entity_type, payload in operations]
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def test_writes_through_bulk(server, tenant):
+    with BulkWriter(tenant, flush_size=50, flush_interval=0.1, chunk_size=20) as writer:
+        for index in range(120):
+            writer.create('Incident', {'DisplayLabel': 'Queued {}'.format(index)})
+        writer.update(10000, 'Incident', {'Status': 'RequestStatusComplete'})
+        writer.update(10000, 'Incident', {'Priority': 'HighPriority'})
+    assert writer.sent == 121
+    assert writer.failed == []
+    assert server.table('Incident')['10000']['Status'] == 'RequestStatusComplete'
+    assert server.table('Incident')['10000']['Priority'] == 'HighPriority'
+    assert sum(row['DisplayLabel'].startswith('Queued') for row in server.table('Incident').values()) == 120
+
+
+def test_flush_waits_for_background_send():
+    fake = FakeTenant(delay=0.2)
+    writer = BulkWriter(fake, flush_size=1, flush_interval=60)
+    writer.update(1, 'Incident', {'Status': 'Old'})
+    time.sleep(0.05)
+    writer.update(1, 'Incident', {'Status': 'New'})
+    writer.flush()
+    writer.close()
+    assert fake.max_active == 1
+    assert [batch[0][2]['Status'] for batch in fake.batches] == ['Old', 'New']
+
+
+def test_failed_send_is_queued_again():
+    fake = FakeTenant(failures=1)
+    writer = BulkWriter(fake, flush_size=100, flush_interval=60)
+    writer.create('Incident', {'DisplayLabel': 'Kept'})
+    writer.update(1, 'Incident', {'Status': 'Old', 'Priority': 'LowPriority'})
+    with pytest.raises(ConnectionError):
+        writer.flush()
+    writer.update(1, 'Incident', {'Status': 'New'})
+    writer.flush()
+    writer.close()
+    assert fake.batches == [[('CREATE', 'Incident', {'DisplayLabel': 'Kept'}),
+                             ('UPDATE', 'Incident', {'Id': 1, 'Status': 'New', 'Priority': 'LowPriority'})]]
+
+
+def test_background_error_is_raised_and_operations_kept():
+    fake = FakeTenant(failures=1)
+    writer = BulkWriter(fake, flush_size=1, flush_interval=60)
+    writer.create('Incident', {'DisplayLabel': 'First'})
+    deadline = time.monotonic() + 5
+    while writer._error is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    with pytest.raises(ConnectionError):
+        writer.create('Incident', {'DisplayLabel': 'Second'})
+    writer.close()
+    assert [payload['DisplayLabel'] for batch in fake.batches for _, _, payload in batch] == ['First']
+
+
+def test_answered_chunks_are_not_sent_again(server, tenant, monkeypatch):
+    send_bulk_chunk = tenant._send_bulk_chunk
+    sent = []
+
+    def failing_send_bulk_chunk(operation, items):
+        sent.extend(payload['DisplayLabel'] for _, _, payload in items)
+        if len(sent) == 2:
+            raise ConnectionError('connection lost')
+        return send_bulk_chunk(operation, items)
+    monkeypatch.setattr(tenant, '_send_bulk_chunk', failing_send_bulk_chunk)
+    writer = BulkWriter(tenant, flush_size=100, flush_interval=60, chunk_size=1)
+    writer.create('Incident', {'DisplayLabel': 'A'})
+    writer.create('Incident', {'DisplayLabel': 'B'})
+    with pytest.raises(ConnectionError):
+        writer.flush()
+    assert writer.sent == 1
+    writer.close()
+    assert sent == ['A', 'B', 'B']
+    labels = [row['DisplayLabel'] for row in server.table('Incident').values()]
+    assert labels.count('A') == 1 and labels.count('B') == 1
@@ -0,0 +1,49 @@
+import time
+from smax import Configuration, ResponseCache
+
+
+def test_entries_expire_after_ttl():
+    cache = ResponseCache(default_ttl=0.1)
+    cache.put('/rest/1/ems/Incident', b'{}')
+    assert cache.get('/rest/1/ems/Incident') == b'{}'
+    time.sleep(0.15)
+    assert cache.get('/rest/1/ems/Incident') is None
+    assert cache.size == 0
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = ResponseCache(max_bytes=10)
+    cache.put('a', b'1234')
+    cache.put('b', b'1234')
+    cache.get('a')
+    cache.put('c', b'1234')
+    assert cache.get('a') == b'1234'
+    assert cache.get('b') is None
+    assert cache.size == 8
+
+
+def test_ttl_policies():
+    cache = ResponseCache(ttls={'/forms/': 0})
+    assert cache.ttl_for('/rest/1/metadata/ui/entity-descriptors/Incident') == 3600
+    cache.put('/rest/1/forms/Change', b'{}')
+    assert cache.get('/rest/1/forms/Change') is None
+
+
+def test_cache_persists(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    cache = ResponseCache(path=path)
+    cache.put('/rest/1/workflow/full/Incident', b'{"workflow": []}')
+    cache.close()
+    assert ResponseCache(path=path).get('/rest/1/workflow/full/Incident') == b'{"workflow": []}'
+
+
+def test_tenant_serves_metadata_from_cache(server):
+    cache = ResponseCache()
+    first = Configuration(server.url, 'user', 'password', 1, cache=cache)
+    second = Configuration(server.url, 'user', 'password', 2, cache=cache)
+    fields = first.get_records_fields('Incident')
+    requests = server.stats['requests']
+    assert first.get_records_fields('Incident') == fields
+    assert server.stats['requests'] == requests
+    second.get_records_fields('Incident')
+    assert server.stats['requests'] > requests
@@ -0,0 +1,77 @@
+import itertools
+import threading
+import time
+import pytest
+from smax.smax_executor import run_jobs
+
+
+class Gauge(object):
+    def __init__(self):
+        self.active = 0
+        self.highest = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        with self._lock:
+            self.active += 1
+            self.highest = max(self.highest, self.active)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        with self._lock:
+            self.active -= 1
+
+
+def sleeper(seconds, value, gauge=None):
+    def job():
+        with gauge or Gauge():
+            time.sleep(seconds)
+        return value
+    return job
+
+
+def test_ordered_results_keep_order_of_jobs():
+    jobs = [(index, sleeper(delay, index * 10)) for index, delay in enumerate([0.05, 0.0, 0.02, 0.0])]
+    assert list(run_jobs(jobs, max_in_flight=4)) == [(0, 0), (1, 10), (2, 20), (3, 30)]
+
+
+def test_unordered_results_come_as_they_finish():
+    jobs = [('slow', sleeper(0.1, 1)), ('fast', sleeper(0.0, 2))]
+    assert [key for key, _ in run_jobs(jobs, max_in_flight=2, ordered=False)] == ['fast', 'slow']
+
+
+def test_jobs_in_flight_are_capped():
+    gauge = Gauge()
+    jobs = [(index, sleeper(0.01, index, gauge)) for index in range(20)]
+    assert [result for _, result in run_jobs(jobs, max_in_flight=3)] == list(range(20))
+    assert gauge.highest == 3
+
+
+def test_jobs_are_taken_lazily():
+    taken = []
+
+    def jobs():
+        for index in itertools.count():
+            taken.append(index)
+            yield index, sleeper(0.0, index)
+    results = run_jobs(jobs(), max_in_flight=2)
+    assert [next(results)[1] for _ in range(3)] == [0, 1, 2]
+    results.close()
+    assert len(taken) <= 3 + 2 * 2
+
+
+def test_failure_is_raised_and_waiting_jobs_are_cancelled():
+    started = []
+
+    def failing():
+        raise ConnectionError('connection lost')
+
+    def job(index):
+        def run():
+            started.append(index)
+            time.sleep(0.05)
+            return index
+        return run
+    jobs = [(0, failing)] + [(index, job(index)) for index in range(1, 50)]
+    with pytest.raises(ConnectionError):
+        list(run_jobs(jobs, max_in_flight=2))
+    assert len(started) < 10
@@ -0,0 +1,86 @@
+import csv
+import gzip
+import json
+import os
+import subprocess
+import sys
+import pytest
+
+
+def test_ndjson_export(tenant, tmp_path):
+    path = str(tmp_path / 'incidents.ndjson')
+    assert tenant.export('Incident', 'Id,Status', None, path, page_size=300) == 2000
+    with open(path) as output:
+        entities = [json.loads(line) for line in output]
+    assert [entity['properties']['Id'] for entity in entities] == [str(10000 + index) for index in range(2000)]
+    assert not os.path.exists(path + '.progress')
+
+
+def test_gzip_csv_export(server, tenant, tmp_path):
+    path = str(tmp_path / 'incidents.csv.gz')
+    rows = tenant.export('Incident', 'Id,Priority', "Priority = 'HighPriority'", path, format='csv',
+                         compress='gzip', page_size=100)
+    with gzip.open(path, 'rt') as output:
+        lines = list(csv.reader(output))
+    assert lines[0] == ['Id', 'Priority']
+    expected = sum(row['Priority'] == 'HighPriority' for row in server.table('Incident').values())
+    assert len(lines) - 1 == rows == expected
+
+
+def test_interrupted_export_resumes(tenant, tmp_path, monkeypatch):
+    path = str(tmp_path / 'incidents.csv')
+    get_entities_page = tenant.get_entities_page
+    calls = []
+
+    def failing_get_entities_page(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == 3:
+            raise ConnectionError('connection lost')
+        return get_entities_page(*args, **kwargs)
+    monkeypatch.setattr(tenant, 'get_entities_page', failing_get_entities_page)
+    with pytest.raises(ConnectionError):
+        tenant.export('Incident', 'Id', None, path, format='csv', page_size=300, resume=True)
+    assert os.path.exists(path + '.progress')
+    assert tenant.export('Incident', 'Id', None, path, format='csv', page_size=300, resume=True) == 2000
+    with open(path) as output:
+        ids = [row[0] for row in csv.reader(output)][1:]
+    assert ids == [str(10000 + index) for index in range(2000)]
+
+
+def test_parquet_export(tenant, tmp_path):
+    parquet = pytest.importorskip('pyarrow.parquet')
+    path = str(tmp_path / 'incidents.parquet')
+    assert tenant.export('Incident', 'Id,EmsCreationTime,CloseTime', None, path, format='parquet',
+                         page_size=500) == 2000
+    table = parquet.read_table(path)
+    assert table.num_rows == 2000
+    assert table.column_names == ['Id', 'EmsCreationTime', 'CloseTime']
+
+
+@pytest.mark.parametrize('format', ['parquet', 'arrow'])
+def test_columns_empty_on_first_page(server, tenant, tmp_path, format):
+    pyarrow = pytest.importorskip('pyarrow')
+    import pyarrow.ipc
+    import pyarrow.parquet
+    rows = server.table('Incident')
+    for entity_id, row in rows.items():
+        first_page = int(entity_id) < 10500
+        row['CloseTime'] = None if first_page else row['EmsCreationTime'] + 1
+        row['Category'] = None if first_page else int(row['Category'])
+    path = str(tmp_path / 'incidents.{}'.format(format))
+    assert tenant.export('Incident', 'Id,CloseTime,Category', None, path, format=format, page_size=500,
+                         compress='zstd') == 2000
+    table = pyarrow.parquet.read_table(path) if format == 'parquet' else pyarrow.ipc.open_file(path).read_all()
+    assert table.schema.field('CloseTime').type == pyarrow.int64()
+    assert table.column('CloseTime').null_count == 500
+    assert table.column('Category').to_pylist()[500] == str(rows['10500']['Category'])
+
+
+def test_arrow_rejects_gzip(tenant, tmp_path):
+    with pytest.raises(AssertionError):
+        tenant.export('Incident', 'Id', None, str(tmp_path / 'incidents.arrow'), format='arrow', compress='gzip')
+
+
+def test_import_does_not_load_pyarrow():
+    code = 'import sys, smax; print("pyarrow" in sys.modules)'
+    assert subprocess.check_output([sys.executable, '-c', code]).strip() == b'False'
@@ -0,0 +1,28 @@
+def test_get_many_returns_entity_per_id(tenant):
+    found = tenant.get_incidents_by_ids(['10005', 10001, '10005', '99999'], 'Status')
+    assert list(found) == ['10005', '10001', '99999']
+    assert found['10001']['properties']['Id'] == '10001'
+    assert 'Status' in found['10005']['properties']
+    assert found['99999'] is None
+
+
+def test_get_many_packs_ids_into_few_queries(server, tenant):
+    tenant.get_cookie()
+    requests = server.stats['requests']
+    found = tenant.get_many('Incident', [str(10000 + index) for index in range(1000)], 'Id', chunk_size=300)
+    assert server.stats['requests'] - requests == 4
+    assert all(entity is not None for entity in found.values())
+
+
+def test_get_many_keeps_urls_short(tenant, monkeypatch):
+    urls = []
+    get_json = tenant.get_json
+
+    def recording_get_json(url, **kwargs):
+        urls.append(url)
+        return get_json(url, **kwargs)
+    monkeypatch.setattr(tenant, 'get_json', recording_get_json)
+    found = tenant.get_many('Incident', [str(10000 + index) for index in range(1000)], 'Id', max_url_length=1500)
+    assert len(urls) > 4
+    assert max(len(url) for url in urls) <= 1500
+    assert len(found) == 1000
@@ -0,0 +1,38 @@
+import pytest
+from smax.smax_json import dumps, loads, query_decoder
+
+
+def test_round_trip():
+    payload = {'entities': [{'entity_type': 'Incident', 'properties': {'Id': '10001', 'DisplayLabel': 'Ünïcode'}}],
+               'operation': 'UPDATE'}
+    assert loads(dumps(payload)) == payload
+    assert loads(dumps(payload).encode('utf-8')) == payload
+
+
+def test_dumps_falls_back_for_non_string_keys():
+    assert loads(dumps({1: 'one'})) == {'1': 'one'}
+
+
+def test_invalid_json_raises_value_error():
+    with pytest.raises(ValueError):
+        loads(b'{"entities": [')
+
+
+def test_query_decoder():
+    pytest.importorskip('msgspec')
+    decode = query_decoder('Incident', 'Id,EmsCreationTime')
+    assert decode is query_decoder('Incident', 'Id,EmsCreationTime')
+    result = decode(b'{"meta": {"completion_status": "OK"}, "entities": [{"entity_type": "Incident", '
+                    b'"properties": {"Id": "10001", "EmsCreationTime": 1546300800000, "Extra": [1, 2]}}]}')
+    assert result.meta['completion_status'] == 'OK'
+    properties = result.entities[0].properties
+    assert (properties.Id, properties.EmsCreationTime) == ('10001', 1546300800000)
+    assert not hasattr(properties, 'Extra')
+
+
+def test_typed_query(server, tenant):
+    pytest.importorskip('msgspec')
+    result = tenant.get_entities('Incident', 'Id,Status,LastUpdateTime', size=50, order='Id asc', typed=True)
+    table = server.table('Incident')
+    assert [(entity.properties.Id, entity.properties.LastUpdateTime) for entity in result.entities] == \
+        [(entity_id, table[entity_id]['LastUpdateTime']) for entity_id in sorted(table, key=int)[:50]]
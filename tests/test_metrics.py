@@ -0,0 +1,44 @@
+from smax import Run, SmaxTransport
+from smax.smax_metrics import Instrumentation, endpoint_template
+
+
+def test_endpoint_template():
+    assert endpoint_template('https://smax/rest/123/ems/Incident?layout=Id') == 'ems/Incident'
+    assert endpoint_template('https://smax/rest/123/ems/Incident/10001') == 'ems/Incident/{id}'
+    assert endpoint_template('https://smax/rest/123/ems/bulk') == 'ems/bulk'
+    assert endpoint_template('https://smax/auth/authentication-endpoint/authenticate/login?TENANTID=1') == \
+        'auth/login'
+    assert endpoint_template('https://smax/bo/rest/entities/tenant?size=5') == 'bo/rest/entities/tenant'
+    assert endpoint_template('https://smax/rest/123/metadata/ui/entity-descriptors/Incident') == \
+        'rest/metadata/ui/entity-descriptors/Incident'
+
+
+def test_calls_are_counted(server):
+    instrumentation = Instrumentation()
+    events = []
+    instrumentation.add_hook(end=events.append)
+    transport = SmaxTransport(instrumentation=instrumentation)
+    tenant = Run(server.url, 'user', 'password', 1, transport=transport)
+    for _ in range(3):
+        tenant.get_incidents('Id', size=10)
+    transport.close()
+    endpoints = {(item['endpoint'], item['method']): item for item in instrumentation.snapshot()['endpoints']}
+    incidents = endpoints[('ems/Incident', 'GET')]
+    assert incidents['requests'] == 3 and incidents['errors'] == 0
+    assert incidents['bytes_in'] > 0
+    assert incidents['latency_buckets'][-1] == (float('inf'), 3)
+    assert endpoints[('auth/login', 'POST')]['requests'] == 1
+    assert instrumentation.snapshot()['auth_refreshes'] == 1
+    assert [event['status'] for event in events] == [200] * 4
+
+
+def test_prometheus_text(server):
+    instrumentation = Instrumentation()
+    transport = SmaxTransport(instrumentation=instrumentation)
+    tenant = Run(server.url, 'user', 'password', 1, transport=transport)
+    tenant.get_incidents('Id', size=1)
+    transport.close()
+    text = instrumentation.prometheus_text()
+    assert 'smax_request_duration_seconds_count{endpoint="ems/Incident",method="GET"} 1\n' in text
+    assert 'smax_requests_total{endpoint="ems/Incident",method="GET",status="200"} 1\n' in text
+    assert text.endswith('smax_auth_refreshes_total 1\n')
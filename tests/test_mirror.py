@@ -0,0 +1,55 @@
+import time
+from smax import Mirror
+
+
+def test_sync_copies_records(server, tenant, tmp_path):
+    mirror = Mirror(tenant, str(tmp_path / 'mirror.db'), lag=0)
+    mirror.add_entity('Incident', 'Status,Priority')
+    assert mirror.sync(page_size=300) == {'Incident': 2000}
+    expected = {}
+    for row in server.table('Incident').values():
+        expected[row['Status']] = expected.get(row['Status'], 0) + 1
+    assert {row['Status']: row['count'] for row in mirror.aggregate('Incident', ['Status'])} == expected
+    assert mirror.query('Incident', 'Id = ?', ('10001',), columns=['Status'])[0]['Status'] == \
+        server.table('Incident')['10001']['Status']
+    mirror.close()
+
+
+def test_mirror_matches_tenant_after_changes_during_sync(server, tenant, tmp_path, monkeypatch):
+    mirror = Mirror(tenant, str(tmp_path / 'mirror.db'), lag=0)
+    mirror.add_entity('Incident', 'Status')
+    mirror.sync(page_size=100)
+    changed = [str(10000 + index) for index in range(0, 2000, 4)]
+    tenant.bulk_update('Incident', [{'Id': entity_id, 'Status': 'Changed'} for entity_id in changed])
+    time.sleep(0.01)
+
+    get_entities_page = tenant.get_entities_page
+    calls = []
+
+    def mutating_get_entities_page(*args, **kwargs):
+        page = get_entities_page(*args, **kwargs)
+        calls.append(1)
+        if len(calls) == 1:
+            tenant.bulk_update('Incident', [{'Id': entity_id, 'Status': 'ChangedAgain'}
+                                            for entity_id in changed[:50]])
+            time.sleep(0.01)
+        return page
+    monkeypatch.setattr(tenant, 'get_entities_page', mutating_get_entities_page)
+    mirror.sync(page_size=100)
+    monkeypatch.undo()
+    mirror.sync(page_size=100)
+    assert mirror.compare() == {'Incident': {'mirror': 2000, 'tenant': 2000}}
+    local = {row['Id']: row['Status'] for row in mirror.query('Incident')}
+    assert local == {row['Id']: row['Status'] for row in server.table('Incident').values()}
+    mirror.close()
+
+
+def test_full_sync_drops_deleted_records(server, tenant, tmp_path):
+    mirror = Mirror(tenant, str(tmp_path / 'mirror.db'), lag=0)
+    mirror.add_entity('Incident', 'Status')
+    mirror.sync()
+    del server.table('Incident')['10000']
+    assert mirror.compare('Incident') == {'Incident': {'mirror': 2000, 'tenant': 1999}}
+    mirror.sync(full=True)
+    assert mirror.compare('Incident') == {'Incident': {'mirror': 1999, 'tenant': 1999}}
+    mirror.close()
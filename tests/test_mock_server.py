@@ -0,0 +1,31 @@
+import requests
+from tests.mock_server import MockSmaxServer, compile_filter
+
+
+def test_compile_filter():
+    predicate = compile_filter("Status = 'Open' and (Id in (1,2) or EmsCreationTime btw (10,20))")
+    assert predicate({'Status': 'Open', 'Id': '2', 'EmsCreationTime': 0})
+    assert predicate({'Status': 'Open', 'Id': '3', 'EmsCreationTime': 15})
+    assert not predicate({'Status': 'Open', 'Id': '3', 'EmsCreationTime': 25})
+    assert not predicate({'Status': 'Closed', 'Id': '1', 'EmsCreationTime': 15})
+
+
+def test_query_pages(tenant):
+    first = tenant.get_incidents('Id', order='Id asc', skip=0, size=10)
+    second = tenant.get_incidents('Id', order='Id asc', skip=10, size=10)
+    assert first['meta']['total_count'] == 2000
+    assert [entity['properties']['Id'] for entity in first['entities']] == [str(10000 + i) for i in range(10)]
+    assert second['entities'][0]['properties']['Id'] == '10010'
+
+
+def test_rejects_call_without_token(server):
+    response = requests.get('{}/rest/1/ems/Incident?layout=Id'.format(server.url))
+    assert response.status_code == 401
+
+
+def test_injects_errors():
+    with MockSmaxServer(records=10, error_rate=1.0, error_status=503, retry_after=2) as server:
+        response = requests.post('{}/auth/authentication-endpoint/authenticate/login'.format(server.url))
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '2'
+    assert server.stats['errors'] == 1
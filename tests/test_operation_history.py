@@ -0,0 +1,63 @@
+from smax import OperationHistoryReader
+
+
+class FixedPageAdmin(object):
+    """
+    Suite Admin that ignores skip and filter and always returns same operations
+    """
+    def __init__(self, operations):
+        self.operations = operations
+        self.calls = 0
+
+    def get_operation_history(self, skip=None, size=None, filters=None):
+        self.calls += 1
+        return list(self.operations)
+
+
+def add_operation(server, time):
+    operations = server._bo['operationHistory']
+    operations.append({'id': str(1000 + len(operations)), 'entityType': 'operationHistory', 'time': time})
+
+
+def test_reads_only_new_operations(server, admin):
+    reader = OperationHistoryReader(admin, page_size=100)
+    operations = list(reader.read())
+    assert [operation['id'] for operation in operations] == [str(1000 + index) for index in range(500)]
+    assert list(reader.read()) == []
+    last_time = operations[-1]['time']
+    add_operation(server, last_time)
+    add_operation(server, last_time + 1)
+    assert [operation['id'] for operation in reader.read()] == ['1500', '1501']
+
+
+def test_checkpoint_survives_restart(server, admin, tmp_path):
+    path = str(tmp_path / 'history.json')
+    first = OperationHistoryReader(admin, page_size=200, since=1546300800000 + 400 * 3600000, state_path=path)
+    assert len(list(first.read())) == 100
+    add_operation(server, 1546300800000 + 600 * 3600000)
+    second = OperationHistoryReader(admin, page_size=200, state_path=path)
+    assert [operation['id'] for operation in second.read()] == ['1500']
+
+
+def test_server_ignoring_skip_does_not_loop():
+    operations = [{'id': str(index), 'time': 1000 + index} for index in range(100)]
+    admin = FixedPageAdmin(operations)
+    reader = OperationHistoryReader(admin, page_size=100, server_filter=False)
+    assert len(list(reader.read())) == 100
+    assert admin.calls == 2
+    assert list(reader.read()) == []
+    operations.append({'id': '100', 'time': 1100})
+    assert [operation['id'] for operation in reader.read()] == ['100']
+
+
+def test_duplicates_across_pages_are_handed_out_once():
+    admin = FixedPageAdmin([{'id': '1', 'time': 5}, {'id': '2', 'time': 5}, {'id': '1', 'time': 5}])
+    reader = OperationHistoryReader(admin, page_size=3, server_filter=False)
+    assert [operation['id'] for operation in reader.read()] == ['1', '2']
+
+
+def test_ids_with_unicode_digits():
+    admin = FixedPageAdmin([{'id': '²', 'time': None}, {'id': '7', 'time': None}])
+    reader = OperationHistoryReader(admin, page_size=100, server_filter=False)
+    assert [operation['id'] for operation in reader.read()] == ['²', '7']
+    assert reader.checkpoint()[2] == 7
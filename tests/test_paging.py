@@ -0,0 +1,55 @@
+import pytest
+from smax import SmaxError
+
+
+def ids(entities):
+    return [entity['properties']['Id'] for entity in entities]
+
+
+def test_paginate_yields_every_record_once(tenant):
+    entities = list(tenant.get_incidents('Id,Status', paginate=True, page_size=300))
+    assert ids(entities) == [str(10000 + index) for index in range(2000)]
+
+
+def test_paginate_applies_filter(server, tenant):
+    expected = sorted(int(row['Id']) for row in server.table('Incident').values()
+                      if row['Status'] == 'RequestStatusReady')
+    entities = tenant.get_incidents('Id', "Status = 'RequestStatusReady'", paginate=True, page_size=100)
+    assert [int(entity_id) for entity_id in ids(entities)] == expected
+
+
+def test_pages_are_fetched_lazily(server, tenant):
+    entities = tenant.get_incidents('Id', paginate=True, page_size=100)
+    next(entities)
+    requests = server.stats['requests']
+    for _ in range(99):
+        next(entities)
+    assert server.stats['requests'] == requests
+    next(entities)
+    assert server.stats['requests'] == requests + 1
+
+
+def test_failed_page_raises(tenant, monkeypatch):
+    monkeypatch.setattr(tenant, 'get_json', lambda url, **kwargs: {'meta': {'completion_status': 'FAILED'}})
+    with pytest.raises(SmaxError):
+        list(tenant.get_incidents('Id', paginate=True))
+
+
+def test_parallel_paginate_keeps_order(tenant):
+    entities = tenant.get_incidents('Id', paginate=True, page_size=150, parallel=True, max_in_flight=4)
+    assert ids(entities) == [str(10000 + index) for index in range(2000)]
+
+
+def test_parallel_paginate_unordered_yields_every_record(tenant):
+    entities = tenant.get_incidents('Id', paginate=True, page_size=150, parallel=True, max_in_flight=4,
+                                    ordered=False)
+    assert sorted(ids(entities)) == [str(10000 + index) for index in range(2000)]
+
+
+def test_parallel_paginate_limits_pages_in_flight(server, tenant):
+    tenant.get_cookie()
+    server.max_concurrency = 3
+    server.latency = 0.01
+    entities = list(tenant.get_incidents('Id', paginate=True, page_size=100, parallel=True, max_in_flight=3))
+    assert len(entities) == 2000
+    assert server.stats['throttled'] == 0
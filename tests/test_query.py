@@ -0,0 +1,55 @@
+import pytest
+from smax import Q, Condition
+
+
+def test_filter_rendering():
+    status = Q.field('Status')
+    condition = (status == "It's open") & (Q.field('Priority').in_(['HighPriority', 'CriticalPriority']) |
+                                           Q.field('EmsCreationTime').btw(1, 2))
+    assert str(condition) == "Status = 'It\\'s open' and (Priority in ('HighPriority','CriticalPriority') or " \
+                             "EmsCreationTime btw (1,2))"
+    assert condition.fields == ('Status', 'Priority', 'EmsCreationTime')
+    assert str(Q.field('Active') == True) == 'Active = true'  # noqa: E712
+
+
+def test_encoded_template_is_reused():
+    first, second = Q.field('Id') == '10001', Q.field('Id') == '10002'
+    assert first.template == second.template
+    assert first.encode() == "Id+%3D+%2710001%27"
+    assert second.encode() == "Id+%3D+%2710002%27"
+    assert Condition('Id in ?', (('1', '2'),)).encode() == "Id+in+(%271%27,%272%27)"
+
+
+def test_queries_are_immutable():
+    base = Q('Incident').layout('Id, Status')
+    open_query = base.where(Q.field('Status') == 'RequestStatusReady').order('Id asc').size(10)
+    assert base.condition is None and base.limit is None
+    assert open_query.fields == ('Id', 'Status')
+    assert open_query.referenced_fields() == {'Id', 'Status'}
+
+
+def test_invalid_names():
+    with pytest.raises(AssertionError):
+        Q.field('Status; drop')
+    with pytest.raises(AssertionError):
+        Q('Incident').layout('Id', 'Bad-Field')
+
+
+def test_split_covers_range():
+    queries = Q('Incident').layout('Id').split('EmsCreationTime', 0, 99, 3)
+    assert [query.condition.params for query in queries] == [(0, 32), (33, 65), (66, 99)]
+
+
+def test_query_matches_filter(server, tenant):
+    query = Q('Incident').layout('Id', 'Priority').where(Q.field('Priority') == 'HighPriority')
+    ids = [entity['properties']['Id'] for entity in tenant.query(query, paginate=True, page_size=250)]
+    assert ids == sorted((row['Id'] for row in server.table('Incident').values()
+                          if row['Priority'] == 'HighPriority'), key=int)
+    assert len(tenant.query(query.size(5))['entities']) == 5
+
+
+def test_validate_rejects_unknown_fields(tenant):
+    with pytest.raises(AssertionError, match='Unknown fields of Incident: Missing'):
+        tenant.query(Q('Incident').layout('Id').where(Q.field('Missing') == 1))
+    assert 'entities' in tenant.query(Q('Incident').layout('Id').where(Q.field('Missing') == 1).size(1),
+                                      validate=False)
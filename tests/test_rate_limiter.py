@@ -0,0 +1,67 @@
+import time
+from smax import Run, SmaxTransport
+from smax.smax_rate_limiter import ConcurrencyController, RateLimiter, TokenBucket
+from tests.mock_server import MockSmaxServer
+
+
+def test_token_bucket_paces_calls():
+    bucket = TokenBucket(50, burst=1)
+    started = time.monotonic()
+    for _ in range(11):
+        bucket.acquire()
+    assert time.monotonic() - started >= 0.18
+
+
+def test_token_bucket_pause():
+    bucket = TokenBucket(None)
+    bucket.pause(0.1)
+    started = time.monotonic()
+    bucket.acquire()
+    assert time.monotonic() - started >= 0.09
+
+
+def test_concurrency_is_cut_on_throttling_and_grows_back():
+    controller = ConcurrencyController(initial=8, latency_factor=None)
+    controller.acquire()
+    controller.release(0.01, True)
+    assert controller.limit == 4
+    for _ in range(20):
+        controller.acquire()
+        controller.release(0.01, False)
+    assert 4 < controller.limit <= 32
+    assert controller.in_flight == 0
+
+
+def test_budgets():
+    assert RateLimiter.budget('GET', 'https://smax/rest/1/ems/Incident') == 'read'
+    assert RateLimiter.budget('POST', 'https://smax/rest/1/ems/bulk') == 'write'
+    assert RateLimiter.budget('GET', 'https://smax/bo/rest/tenant') == 'admin'
+
+
+def test_throttled_calls_are_sent_again_by_limiter_only():
+    with MockSmaxServer(records=100, error_status=503, retry_after=0, seed=2) as server:
+        limiter = RateLimiter(read_rate=None, default_retry_after=0)
+        transport = SmaxTransport(retries=20, backoff_factor=0, rate_limiter=limiter)
+        tenant = Run(server.url, 'user', 'password', 1, transport=transport)
+        tenant.get_cookie()
+        server.error_rate = 0.5
+        statuses = [tenant.session.get('{}/rest/1/ems/Incident?layout=Id&size=1'.format(server.url)).status_code
+                    for _ in range(20)]
+        transport.close()
+    assert statuses == [200] * 20
+    assert server.stats['errors'] > 0
+    # every 503 reached limiter, none was swallowed by retry of connection pool
+    assert limiter.throttled == server.stats['errors']
+    assert server.stats['requests'] == 21 + server.stats['errors']
+
+
+def test_throttled_post_is_not_sent_again():
+    with MockSmaxServer(records=100, error_status=503, retry_after=0) as server:
+        transport = SmaxTransport(retries=5, rate_limiter=RateLimiter(write_rate=None, default_retry_after=0))
+        tenant = Run(server.url, 'user', 'password', 1, transport=transport)
+        tenant.get_cookie()
+        server.error_rate = 1.0
+        response = tenant.session.post('{}/rest/1/ems/bulk'.format(server.url), json={'entities': []})
+        transport.close()
+    assert response.status_code == 503
+    assert server.stats['errors'] == 1
@@ -0,0 +1,60 @@
+import pytest
+from smax import ResultSet
+
+
+def test_numeric_string_ids_round_trip():
+    result_set = ResultSet('Id,Status', [{'properties': {'Id': '10001', 'Status': 'Open'}},
+                                         {'properties': {'Id': '10002', 'Status': 'Closed'}}])
+    assert result_set.column('Id') == ['10001', '10002']
+    assert result_set.to_dicts() == [{'Id': '10001', 'Status': 'Open'}, {'Id': '10002', 'Status': 'Closed'}]
+    assert result_set[-1]['Status'] == 'Closed'
+
+
+def test_column_falls_back_to_list():
+    result_set = ResultSet('Category', [{'Category': '500'}, {'Category': 'Other'}, {'Category': None}])
+    assert result_set.column('Category') == ['500', 'Other', None]
+
+
+def test_append_after_to_numpy():
+    numpy = pytest.importorskip('numpy')
+    result_set = ResultSet('Id,EmsCreationTime', [{'Id': str(10000 + index), 'EmsCreationTime': index}
+                                                  for index in range(10)])
+    ids = result_set.to_numpy('Id')
+    result_set.append({'Id': '10010', 'EmsCreationTime': 10})
+    result_set.extend({'Id': str(10000 + index), 'EmsCreationTime': index} for index in range(11, 100))
+    assert len(result_set) == 100
+    assert ids.tolist() == list(range(10000, 10010))
+    assert numpy.array_equal(result_set.to_numpy('EmsCreationTime'), numpy.arange(100))
+
+
+def test_to_numpy_missing_values_are_nan():
+    numpy = pytest.importorskip('numpy')
+    result_set = ResultSet('CloseTime', [{'CloseTime': 5}, {'CloseTime': None}])
+    values = result_set.to_numpy('CloseTime')
+    assert values[0] == 5 and numpy.isnan(values[1])
+
+
+def test_append_after_to_pandas():
+    pytest.importorskip('pandas')
+    result_set = ResultSet('Id,CloseTime', [{'Id': '10000', 'CloseTime': 5}, {'Id': '10001', 'CloseTime': None}])
+    frame = result_set.to_pandas()
+    result_set.append({'Id': '10002', 'CloseTime': 7})
+    assert str(frame['CloseTime'].dtype) == 'Int64'
+    assert frame['CloseTime'].isna().tolist() == [False, True]
+    assert result_set.to_pandas()['CloseTime'].tolist()[2] == 7
+
+
+def test_compact_query(server, tenant):
+    entities = tenant.get_entities('Incident', 'Id,Status,LastUpdateTime', paginate=True, page_size=500,
+                                   compact=True)
+    assert isinstance(entities, ResultSet)
+    assert entities.column('Id') == sorted(server.table('Incident'), key=int)
+    dicts = list(tenant.get_entities('Incident', 'Id,Status,LastUpdateTime', paginate=True, page_size=500))
+    assert entities.to_dicts() == [entity['properties'] for entity in dicts]
+    assert entities.nbytes() < sum(len(str(entity)) for entity in dicts)
+
+
+def test_unicode_digits_are_kept_as_strings():
+    result_set = ResultSet('Id,DisplayLabel', [{'Id': '10001', 'DisplayLabel': '²'},
+                                                {'Id': '٣', 'DisplayLabel': '10'}])
+    assert result_set.to_dicts() == [{'Id': '10001', 'DisplayLabel': '²'}, {'Id': '٣', 'DisplayLabel': '10'}]
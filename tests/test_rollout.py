@@ -0,0 +1,51 @@
+import json
+import os
+from smax.smax_rollout import Rollout
+
+
+def test_users_are_attached_in_chunks(server, admin):
+    admin.get_admin_cookie()
+    requests = server.stats['requests']
+    assignments = {'1000': ['{}'.format(2000 + index) for index in range(250)], '1001': ['3000', '3001']}
+    results = admin.attach_users_to_tenants(assignments, chunk_size=100, max_in_flight=2)
+    assert server.stats['requests'] - requests == 4
+    assert len(results) == 252
+    assert all(result['completion_status'] == 'OK' for result in results)
+    assert results[-1] == {'user_id': '3001', 'tenant_id': '1001', 'completion_status': 'OK', 'error': None}
+
+
+def test_interrupted_rollout_resumes(admin, tmp_path, monkeypatch):
+    path = str(tmp_path / 'attach.progress')
+    attach_chunk = admin._attach_chunk
+
+    def failing_attach_chunk(tenant_id, users):
+        if tenant_id == '1001':
+            raise ConnectionError('connection lost')
+        return attach_chunk(tenant_id, users)
+    monkeypatch.setattr(admin, '_attach_chunk', failing_attach_chunk)
+    assignments = [(str(2000 + index), '1000' if index % 2 else '1001') for index in range(20)]
+    results = admin.attach_users_to_tenants(assignments, chunk_size=5, progress_path=path)
+    assert sorted(result['completion_status'] for result in results) == ['FAILED'] * 10 + ['OK'] * 10
+    assert len(Rollout(path).completed) == 10
+    monkeypatch.setattr(admin, '_attach_chunk', attach_chunk)
+    results = admin.attach_users_to_tenants(assignments, chunk_size=5, progress_path=path)
+    assert sorted(result['user_id'] for result in results) == [str(2000 + index) for index in range(0, 20, 2)]
+    assert all(result['completion_status'] == 'OK' for result in results)
+    assert not os.path.exists(path)
+
+
+def test_settings_of_tenants(server, admin):
+    admin.get_admin_cookie()
+    results = admin.change_settings_of_tenants({'1000': {'name': 'first'}, '1001': {'name': 'second'}})
+    assert [(result['tenant_id'], result['completion_status']) for result in results] == \
+        [('1000', 'OK'), ('1001', 'OK')]
+    server.error_status = 500
+    server.error_rate = 1.0
+    results = admin.change_settings_of_tenants({'1002': {'name': 'third'}})
+    assert results[0]['completion_status'] == 'FAILED' and results[0]['error'] == 'HTTP 500'
+
+
+def test_cut_progress_line_is_ignored(tmp_path):
+    path = tmp_path / 'settings.progress'
+    path.write_text(json.dumps(['settings/1000']) + '\n["settings/10')
+    assert Rollout(str(path)).completed == {'settings/1000'}
@@ -0,0 +1,39 @@
+import threading
+import time
+from smax import Run
+from tests.mock_server import MockSmaxServer
+
+
+def test_logs_in_once(server, tenant):
+    for _ in range(5):
+        tenant.get_incidents('Id', size=1)
+    assert server.stats['logins'] == 1
+
+
+def test_concurrent_calls_share_login(server, tenant):
+    threads = [threading.Thread(target=tenant.get_incidents, args=('Id',), kwargs={'size': 1}) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert server.stats['logins'] == 1
+
+
+def test_rejected_token_is_refreshed_once():
+    with MockSmaxServer(records=10, token_lifetime=0.2) as server:
+        tenant = Run(server.url, 'user', 'password', 1)
+        tenant.get_incidents('Id', size=1)
+        time.sleep(0.3)
+        result = tenant.get_incidents('Id', size=1)
+    assert result['meta']['completion_status'] == 'OK'
+    assert server.stats['logins'] == 2
+    assert server.stats['unauthorized'] == 1
+
+
+def test_token_is_refreshed_before_expiry(server):
+    tenant = Run(server.url, 'user', 'password', 1, token_lifetime=0.2, refresh_margin=0.1)
+    tenant.get_incidents('Id', size=1)
+    time.sleep(0.15)
+    tenant.get_incidents('Id', size=1)
+    assert server.stats['logins'] == 2
+    assert server.stats['unauthorized'] == 0
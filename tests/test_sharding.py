@@ -0,0 +1,45 @@
+from smax import Q
+from smax.smax_sharding import ShardPlanner
+
+
+def ids(entities):
+    return [entity['properties']['Id'] for entity in entities]
+
+
+def test_windows_are_adjacent_and_cover_all(tenant):
+    windows = ShardPlanner(tenant, shard_size=300).plan('Incident')
+    assert sum(count for _, _, count in windows) == 2000
+    assert all(previous[1] + 1 == window[0] for previous, window in zip(windows, windows[1:]))
+    assert all(count <= 450 for _, _, count in windows)
+
+
+def test_sharded_query_returns_every_record_once(server, tenant):
+    entities = tenant.get_entities('Incident', 'Id,EmsCreationTime', paginate=True, page_size=100,
+                                   shard_by='EmsCreationTime', shard_size=300)
+    # mock creates records in Id order, so windows in time order give Ids in ascending order
+    assert ids(entities) == sorted(server.table('Incident'), key=int)
+    sharded = ids(ShardPlanner(tenant, 'LastUpdateTime', shard_size=300).iter_entities('Incident', 'Id',
+                                                                                        ordered=False))
+    assert sorted(sharded, key=int) == sorted(server.table('Incident'), key=int)
+
+
+def test_sharding_keeps_filter(server, tenant):
+    condition = Q.field('Priority') == 'LowPriority'
+    sharded = ids(ShardPlanner(tenant, shard_size=100).iter_entities('Incident', 'Id', condition))
+    expected = [row['Id'] for row in server.table('Incident').values() if row['Priority'] == 'LowPriority']
+    assert sorted(sharded, key=int) == sorted(expected, key=int)
+    assert ids(ShardPlanner(tenant).iter_entities('Incident', 'Id', "Priority = 'None'")) == []
+
+
+def test_probes_are_capped(tenant, monkeypatch):
+    planner = ShardPlanner(tenant, shard_size=10, max_probes=20)
+    counts = []
+    count = planner._count
+
+    def counting(*args):
+        counts.append(1)
+        return count(*args)
+    monkeypatch.setattr(planner, '_count', counting)
+    windows = planner.plan('Incident')
+    assert len(counts) + 2 <= 20
+    assert sum(window[2] for window in windows) == 2000
@@ -0,0 +1,73 @@
+import threading
+import time
+from smax import Run, SingleFlight
+
+
+def test_concurrent_callers_share_call():
+    single_flight = SingleFlight()
+    started = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return 'result'
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(single_flight.do('url', fetch)))
+    leader.start()
+    started.wait()
+    followers = [threading.Thread(target=lambda: results.append(single_flight.do('url', fetch))) for _ in range(4)]
+    for thread in followers:
+        thread.start()
+    for thread in [leader] + followers:
+        thread.join()
+    assert results == ['result'] * 5
+    assert len(calls) == 1
+    assert single_flight.shared == 4
+
+
+def test_errors_are_shared_and_not_kept():
+    single_flight = SingleFlight(recent_ttl=60)
+
+    def fail():
+        raise ValueError('failed')
+
+    for _ in range(2):
+        try:
+            single_flight.do('url', fail)
+        except ValueError:
+            pass
+    assert single_flight.calls == 2
+    assert single_flight.do('url', lambda: 'ok') == 'ok'
+
+
+def test_recent_results_are_reused_then_expire():
+    single_flight = SingleFlight(recent_ttl=0.05)
+    assert single_flight.do('url', lambda: 1) == 1
+    assert single_flight.do('url', lambda: 2) == 1
+    time.sleep(0.06)
+    assert single_flight.do('url', lambda: 3) == 3
+
+
+def test_expired_results_of_other_keys_are_dropped():
+    single_flight = SingleFlight(recent_ttl=0.01)
+    for index in range(100):
+        single_flight.do('url/{}'.format(index), lambda: index)
+    time.sleep(0.02)
+    single_flight.do('other', lambda: None)
+    assert list(single_flight._recent) == ['other']
+
+
+def test_tenant_coalesces_identical_gets(server):
+    tenant = Run(server.url, 'user', 'password', 1, single_flight=SingleFlight())
+    tenant.get_cookie()
+    server.latency = 0.1
+    requests = server.stats['requests']
+    threads = [threading.Thread(target=tenant.get_incident_by_id, args=(10000,)) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert server.stats['requests'] - requests < 5
@@ -0,0 +1,52 @@
+import pytest
+from smax import Run, TenantPool
+from tests.mock_server import MockSmaxServer
+
+
+@pytest.fixture
+def other_server():
+    with MockSmaxServer(records=100, retry_after=0) as mock:
+        yield mock
+
+
+def build_pool(server, other_server):
+    return TenantPool([1, 2, {'base_url': other_server.url, 'tenant_id': 1}], tenant_class=Run, max_per_host=2,
+                      base_url=server.url, user_name='user', password='password')
+
+
+def test_same_tenant_id_on_two_hosts(server, other_server):
+    with build_pool(server, other_server) as pool:
+        assert len(pool) == 3
+        counts = {key: result['meta']['total_count'] for key, result, error in
+                  pool.get_entities('Incident', 'Id', size=1)}
+        assert pool.login() == {}
+    assert counts == {(server.url, '1'): 2000, (server.url, '2'): 2000, (other_server.url, '1'): 100}
+
+
+def test_tenant_lookup(server, other_server):
+    with build_pool(server, other_server) as pool:
+        assert pool[(other_server.url + '/', 1)].base_url == other_server.url
+        assert pool[2].base_url == server.url
+        with pytest.raises(KeyError):
+            pool[1]
+        with pytest.raises(KeyError):
+            pool.keys([3])
+        assert pool.keys([1]) == [(server.url, '1'), (other_server.url, '1')]
+        assert sorted(key for key, _, _ in pool.map(lambda tenant: None, [1])) == \
+            sorted([(server.url, '1'), (other_server.url, '1')])
+
+
+def test_duplicate_tenant_is_rejected(server):
+    with pytest.raises(AssertionError):
+        TenantPool([1, '1'], tenant_class=Run, base_url=server.url, user_name='user', password='password')
+
+
+def test_failing_tenant_does_not_stop_others(server, other_server, monkeypatch):
+    def failing_get_entities(*args, **kwargs):
+        raise ConnectionError('connection lost')
+    with build_pool(server, other_server) as pool:
+        monkeypatch.setattr(pool[(other_server.url, 1)], 'get_entities', failing_get_entities)
+        entities = list(pool.iter_entities('Incident', 'Id', page_size=500))
+    assert len(entities) == 4000
+    assert {key for key, _ in entities} == {(server.url, '1'), (server.url, '2')}
+    assert list(pool.errors) == [(other_server.url, '1')]
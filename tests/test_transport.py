@@ -0,0 +1,25 @@
+from smax import Run, SmaxAdmin, SmaxTransport
+from tests.mock_server import MockSmaxServer
+
+
+def test_idempotent_calls_are_retried():
+    with MockSmaxServer(records=100, error_status=502, retry_after=0, seed=1) as server:
+        transport = SmaxTransport(retries=10, backoff_factor=0)
+        tenant = Run(server.url, 'user', 'password', 1, transport=transport)
+        tenant.get_cookie()
+        # login is POST and is not retried, errors are injected once session holds token
+        server.error_rate = 0.3
+        statuses = [tenant.session.get('{}/rest/1/ems/Incident?layout=Id&size=1'.format(server.url)).status_code
+                    for _ in range(20)]
+    assert statuses == [200] * 20
+    assert server.stats['errors'] > 0
+
+
+def test_transport_is_shared(server):
+    transport = SmaxTransport(pool_size=2)
+    tenant = Run(server.url, 'user', 'password', 1, transport=transport)
+    admin = SmaxAdmin(server.url, 'admin', 'password', 1, transport=transport)
+    assert tenant.session.transport is admin.session.transport
+    assert tenant.get_incidents('Id', size=1)['meta']['completion_status'] == 'OK'
+    assert admin.get_tenants()['meta']['total_count'] == 20
+    transport.close()